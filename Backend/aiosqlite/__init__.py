@@ -1,15 +1,24 @@
 """Lightweight fallback implementation of aiosqlite for offline testing.
 
-This minimal subset wraps the standard ``sqlite3`` driver with asyncio
-executors so SQLAlchemy's async SQLite dialect can run in environments
-where the real ``aiosqlite`` package is unavailable.
+This minimal subset wraps the standard ``sqlite3`` driver so SQLAlchemy's async
+SQLite dialect can run in environments where the real ``aiosqlite`` package is
+unavailable. Like the real package, every connection is a thread of its own that
+owns the ``sqlite3`` connection and works through a request queue, so all calls
+for one connection run in order on the same thread.
+
+Round-trips to that thread are kept to one per statement: ``execute`` already
+brings back the first ``iter_chunk_size`` rows, later fetches are served from
+that buffer or pulled in whole chunks, and closing a cursor does not wait.
 """
 from __future__ import annotations
 
 import asyncio
+import queue
 import sqlite3
+import threading
+from collections import deque
 from functools import partial
-from typing import Any, Iterable, Optional
+from typing import Any, Callable, Iterable, Optional
 
 __all__ = ["connect", "Connection", "Cursor", "Row"]
 
@@ -35,11 +44,25 @@ Binary = sqlite3.Binary
 
 Row = sqlite3.Row
 
+_STOP = object()
+
+
+def _resolve(future: asyncio.Future, result: Any, error: BaseException | None) -> None:
+    if future.done():  # the awaiting task was cancelled
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
 
 class Cursor:
-    def __init__(self, cursor: sqlite3.Cursor, loop: asyncio.AbstractEventLoop):
+    def __init__(self, connection: "Connection", cursor: sqlite3.Cursor):
+        self._connection = connection
         self._cursor = cursor
-        self._loop = loop
+        self._rows: deque = deque()
+        self._exhausted = True
+        self.arraysize = connection.iter_chunk_size
 
     @property
     def description(self):
@@ -53,28 +76,56 @@ class Cursor:
     def lastrowid(self):
         return self._cursor.lastrowid
 
+    # runs on the connection thread: the statement plus the first chunk of rows
+    def _run(self, method: Callable, *args: Any) -> tuple[list, bool]:
+        method(*args)
+        if self._cursor.description is None:
+            return [], True
+        return self._fetch_chunk(self.arraysize)
+
+    def _fetch_chunk(self, size: int) -> tuple[list, bool]:
+        rows = self._cursor.fetchmany(size)
+        return rows, len(rows) < size
+
     async def execute(self, sql: str, parameters: Iterable[Any] | None = None):
-        func = partial(self._cursor.execute, sql, parameters or [])
-        await self._loop.run_in_executor(None, func)
+        rows, self._exhausted = await self._connection._execute(self._run, self._cursor.execute, sql, parameters or [])
+        self._rows = deque(rows)
         return self
 
     async def executemany(self, sql: str, seq_of_parameters: Iterable[Iterable[Any]]):
-        func = partial(self._cursor.executemany, sql, seq_of_parameters)
-        await self._loop.run_in_executor(None, func)
+        rows, self._exhausted = await self._connection._execute(self._run, self._cursor.executemany, sql, seq_of_parameters)
+        self._rows = deque(rows)
         return self
 
-    async def fetchone(self):
-        return await self._loop.run_in_executor(None, self._cursor.fetchone)
+    async def _fill(self, size: int) -> None:
+        while len(self._rows) < size and not self._exhausted:
+            rows, self._exhausted = await self._connection._execute(
+                self._fetch_chunk, max(size - len(self._rows), self.arraysize)
+            )
+            self._rows.extend(rows)
 
-    async def fetchall(self):
-        return await self._loop.run_in_executor(None, self._cursor.fetchall)
+    async def fetchone(self):
+        await self._fill(1)
+        return self._rows.popleft() if self._rows else None
 
     async def fetchmany(self, size: int | None = None):
-        func = partial(self._cursor.fetchmany, size) if size else self._cursor.fetchmany
-        return await self._loop.run_in_executor(None, func)
+        size = size or self.arraysize
+        await self._fill(size)
+        return [self._rows.popleft() for _ in range(min(size, len(self._rows)))]
+
+    async def fetchall(self):
+        rows = list(self._rows)
+        self._rows.clear()
+        if not self._exhausted:
+            rows.extend(await self._connection._execute(self._cursor.fetchall))
+            self._exhausted = True
+        return rows
 
     async def close(self):
-        await self._loop.run_in_executor(None, self._cursor.close)
+        self._rows.clear()
+        self._exhausted = True
+        # nothing to report back: queue it behind pending work without waiting
+        self._connection._post(self._cursor.close)
 
     async def __aenter__(self):
         return self
@@ -89,34 +140,91 @@ class Cursor:
         return _return_self().__await__()
 
 
-class Connection:
-    def __init__(self, connection: sqlite3.Connection, loop: asyncio.AbstractEventLoop):
-        self._connection = connection
-        self._loop = loop
-        self.daemon = False
+class Connection(threading.Thread):
+    """A ``sqlite3`` connection owned by its own worker thread.
+
+    Requests are ``(future, function)`` pairs on ``_tx``, the same shape the real
+    package (and SQLAlchemy's adapter, which uses it directly) relies on.
+    """
+
+    def __init__(self, connector: Callable[[], sqlite3.Connection], *, iter_chunk_size: int):
+        super().__init__(name="aiosqlite", daemon=True)
+        self._connector = connector
+        self._conn: sqlite3.Connection | None = None
+        self._tx: queue.SimpleQueue = queue.SimpleQueue()
+        self._running = True
+        self.iter_chunk_size = iter_chunk_size
+
+    def run(self) -> None:
+        while True:
+            future, function = self._tx.get()
+            if function is _STOP:
+                break
+            result, error = None, None
+            try:
+                result = function()
+            except BaseException as exc:  # handed back to the awaiting task
+                error = exc
+            if future is not None:
+                future.get_loop().call_soon_threadsafe(_resolve, future, result, error)
+
+    async def _execute(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        if not self._running or self._conn is None:
+            raise ValueError("no active connection")
+        future = asyncio.get_running_loop().create_future()
+        self._tx.put_nowait((future, partial(fn, *args, **kwargs)))
+        return await future
+
+    def _post(self, fn: Callable) -> None:
+        if self._running:
+            self._tx.put_nowait((None, fn))
+
+    async def _connect(self) -> "Connection":
+        if self._conn is None:
+            self.start()
+            future = asyncio.get_running_loop().create_future()
+            self._tx.put_nowait((future, self._connector))
+            try:
+                self._conn = await future
+            except BaseException:
+                self._stop()
+                raise
+        return self
+
+    def _stop(self) -> None:
+        self._running = False
+        self._tx.put_nowait((None, _STOP))
 
     @property
     def total_changes(self) -> int:
-        return self._connection.total_changes
+        return self._conn.total_changes
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.in_transaction
+
+    @property
+    def isolation_level(self):
+        return self._conn.isolation_level
 
     @property
     def row_factory(self):
-        return self._connection.row_factory
+        return self._conn.row_factory
 
     @row_factory.setter
     def row_factory(self, value):
-        self._connection.row_factory = value
+        self._conn.row_factory = value
 
     @property
     def text_factory(self):
-        return self._connection.text_factory
+        return self._conn.text_factory
 
     @text_factory.setter
     def text_factory(self, value):
-        self._connection.text_factory = value
+        self._conn.text_factory = value
 
     def cursor(self, *args, **kwargs) -> Cursor:
-        return Cursor(self._connection.cursor(*args, **kwargs), self._loop)
+        return Cursor(self, self._conn.cursor(*args, **kwargs))
 
     async def execute(self, sql: str, parameters: Iterable[Any] | None = None):
         cursor = self.cursor()
@@ -129,25 +237,28 @@ class Connection:
         return cursor
 
     async def executescript(self, script: str):
-        func = partial(self._connection.executescript, script)
-        await self._loop.run_in_executor(None, func)
+        await self._execute(self._conn.executescript, script)
         return self
 
     async def create_function(self, *args, **kwargs):
-        func = partial(self._connection.create_function, *args, **kwargs)
-        await self._loop.run_in_executor(None, func)
+        await self._execute(self._conn.create_function, *args, **kwargs)
 
     async def commit(self):
-        await self._loop.run_in_executor(None, self._connection.commit)
+        await self._execute(self._conn.commit)
 
     async def rollback(self):
-        await self._loop.run_in_executor(None, self._connection.rollback)
+        await self._execute(self._conn.rollback)
 
     async def close(self):
-        await self._loop.run_in_executor(None, self._connection.close)
+        if not self._running or self._conn is None:
+            return
+        try:
+            await self._execute(self._conn.close)
+        finally:
+            self._stop()
 
     async def __aenter__(self):
-        return self
+        return await self
 
     async def __aexit__(self, exc_type, exc, tb):
         if exc is None:
@@ -157,43 +268,45 @@ class Connection:
         await self.close()
 
     def __await__(self):
-        async def _return_self():
-            return self
-
-        return _return_self().__await__()
+        return self._connect().__await__()
 
     def __getattr__(self, item: str) -> Any:
-        return getattr(self._connection, item)
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return getattr(self._conn, item)
 
 
 def connect(
     database: str,
     timeout: float = 5.0,
     detect_types: int = 0,
-    isolation_level: Optional[str] = None,
+    isolation_level: Optional[str] = "",
     check_same_thread: bool = False,
     factory: type[sqlite3.Connection] | None = None,
     cached_statements: int = 128,
     uri: bool = False,
+    *,
+    iter_chunk_size: int = 256,
     loop: asyncio.AbstractEventLoop | None = None,
     **kwargs: Any,
 ) -> Connection:
-    loop = loop or asyncio.get_event_loop()
+    """Create a connection; it is opened on its own thread when first awaited.
+
+    ``cached_statements`` sizes sqlite3's per-connection cache of prepared
+    statements, keyed by SQL text, so repeated ORM statements skip re-parsing.
+    """
     connect_kwargs = dict(
         database=database,
         timeout=timeout,
         detect_types=detect_types,
         isolation_level=isolation_level,
-        check_same_thread=check_same_thread,
-        factory=factory,
+        # statements run on the connection thread, but attributes such as
+        # row_factory are set from the event loop thread
+        check_same_thread=False,
         cached_statements=cached_statements,
         uri=uri,
         **kwargs,
     )
-    if factory is None:
-        connect_kwargs.pop("factory")
-    connection = sqlite3.connect(**connect_kwargs)
-    # This fallback uses run_in_executor -> DB work can happen in a different thread.
-    connect_kwargs["check_same_thread"] = False
-    connection = sqlite3.connect(**connect_kwargs)
-    return Connection(connection, loop)
+    if factory is not None:
+        connect_kwargs["factory"] = factory
+    return Connection(partial(sqlite3.connect, **connect_kwargs), iter_chunk_size=iter_chunk_size)
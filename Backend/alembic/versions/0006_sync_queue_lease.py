@@ -0,0 +1,23 @@
+"""sync queue lease
+
+Revision ID: 0006_sync_queue_lease
+Revises: 0005_idempotency_snapshot
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_sync_queue_lease"
+down_revision = "0005_idempotency_snapshot"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("sync_operations", sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("sync_operations", "locked_until")
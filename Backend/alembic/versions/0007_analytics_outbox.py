@@ -0,0 +1,34 @@
+"""analytics outbox
+
+Revision ID: 0007_analytics_outbox
+Revises: 0006_sync_queue_lease
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007_analytics_outbox"
+down_revision = "0006_sync_queue_lease"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("request_id", sa.String(length=128), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False, server_default=sa.text("'{}'::json")),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+    )
+    op.create_index("ix_analytics_outbox_created_at", "analytics_outbox", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analytics_outbox_created_at", table_name="analytics_outbox")
+    op.drop_table("analytics_outbox")
@@ -0,0 +1,34 @@
+"""idempotency expiry
+
+Revision ID: 0008_idempotency_expiry
+Revises: 0007_analytics_outbox
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_idempotency_expiry"
+down_revision = "0007_analytics_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing rows get one more day before the reaper picks them up
+    op.add_column(
+        "idempotency_keys",
+        sa.Column(
+            "expires_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.text("NOW() + INTERVAL '1 day'"),
+        ),
+    )
+    op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_expires_at", table_name="idempotency_keys")
+    op.drop_column("idempotency_keys", "expires_at")
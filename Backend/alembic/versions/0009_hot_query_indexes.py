@@ -0,0 +1,55 @@
+"""hot query indexes
+
+Revision ID: 0009_hot_query_indexes
+Revises: 0008_idempotency_expiry
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_hot_query_indexes"
+down_revision = "0008_idempotency_expiry"
+branch_labels = None
+depends_on = None
+
+_LIVE = sa.text("deleted = false")
+
+# (name, table, columns, partial on live rows) -- one per list query in the repositories/routes:
+# equality columns first, then the ORDER BY column and id as the keyset tie-breaker.
+_INDEXES = [
+    ("ix_tasks_user_live_updated", "tasks", ["user_id", "updated_at", "id"], True),
+    ("ix_tasks_user_live_due", "tasks", ["user_id", "due_at"], True),
+    ("ix_goals_user_live_created", "goals", ["user_id", "created_at", "id"], True),
+    ("ix_calendar_events_user_live_start", "calendar_events", ["user_id", "start_at", "id"], True),
+    ("ix_finance_transactions_user_live_occurred", "finance_transactions", ["user_id", "occurred_at", "id"], True),
+    ("ix_subtasks_task_live_updated", "subtasks", ["task_id", "user_id", "updated_at", "id"], True),
+    (
+        "ix_notification_triggers_entity",
+        "notification_triggers",
+        ["user_id", "entity", "entity_id", "updated_at", "id"],
+        False,
+    ),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction; it keeps the tables writable meanwhile
+    with op.get_context().autocommit_block():
+        for name, table, columns, live_only in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=_LIVE if live_only else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _live_only in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
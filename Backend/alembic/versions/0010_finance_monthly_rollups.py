@@ -0,0 +1,46 @@
+"""finance monthly rollups
+
+Revision ID: 0010_finance_monthly_rollups
+Revises: 0009_hot_query_indexes
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010_finance_monthly_rollups"
+down_revision = "0009_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "finance_monthly_rollups",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("type", sa.String(length=16), nullable=False),
+        sa.Column("category", sa.String(length=120), nullable=False),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("tx_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_finance_monthly_rollups_user_id_users"),
+        sa.PrimaryKeyConstraint("user_id", "month", "type", "category", name="pk_finance_monthly_rollups"),
+    )
+
+    # backfill from the live transactions, bucketed by UTC month like the application does
+    op.execute(
+        """
+        INSERT INTO finance_monthly_rollups (user_id, month, type, category, amount, tx_count, updated_at)
+        SELECT user_id, to_char(occurred_at AT TIME ZONE 'UTC', 'YYYY-MM'), type, category, SUM(amount), COUNT(*), NOW()
+        FROM finance_transactions
+        WHERE deleted = false
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("finance_monthly_rollups")
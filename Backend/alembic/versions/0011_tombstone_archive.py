@@ -0,0 +1,72 @@
+"""tombstone archive and sync horizons
+
+Revision ID: 0011_tombstone_archive
+Revises: 0010_finance_monthly_rollups
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0011_tombstone_archive"
+down_revision = "0010_finance_monthly_rollups"
+branch_labels = None
+depends_on = None
+
+# tables whose tombstones the archival job scans oldest-first
+_TOMBSTONE_TABLES = (
+    "tasks",
+    "subtasks",
+    "goals",
+    "calendar_events",
+    "finance_transactions",
+    "inbox_items",
+    "ai_plan_runs",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tombstone_archive",
+        sa.Column("source_table", sa.String(length=64), nullable=False),
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.PrimaryKeyConstraint("source_table", "id", name="pk_tombstone_archive"),
+    )
+    op.create_index("ix_tombstone_archive_user_id", "tombstone_archive", ["user_id"], unique=False)
+
+    op.create_table(
+        "sync_horizons",
+        sa.Column("entity", sa.String(length=32), nullable=False),
+        sa.Column("horizon", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("NOW()")),
+        sa.PrimaryKeyConstraint("entity", name="pk_sync_horizons"),
+    )
+
+    # CONCURRENTLY cannot run inside the migration transaction; it keeps the tables writable meanwhile
+    with op.get_context().autocommit_block():
+        for table in _TOMBSTONE_TABLES:
+            op.create_index(
+                f"ix_{table}_tombstones_updated",
+                table,
+                ["updated_at"],
+                unique=False,
+                postgresql_where=sa.text("deleted = true"),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in reversed(_TOMBSTONE_TABLES):
+            op.drop_index(f"ix_{table}_tombstones_updated", table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.drop_table("sync_horizons")
+    op.drop_index("ix_tombstone_archive_user_id", table_name="tombstone_archive")
+    op.drop_table("tombstone_archive")
@@ -0,0 +1,42 @@
+"""reminder dispatch lease and due index
+
+Revision ID: 0012_reminder_dispatch
+Revises: 0011_tombstone_archive
+Create Date: 2026-10-19
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012_reminder_dispatch"
+down_revision = "0011_tombstone_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("notification_triggers", sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True))
+
+    # CONCURRENTLY cannot run inside the migration transaction; it keeps the table writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_notification_triggers_due",
+            "notification_triggers",
+            ["remind_at"],
+            unique=False,
+            postgresql_where=sa.text("sent = false"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_notification_triggers_due",
+            table_name="notification_triggers",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("notification_triggers", "locked_until")
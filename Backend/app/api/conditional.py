@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+
+from fastapi import Request, Response
+
+from app.services.response_cache import response_cache
+
+
+async def collection_etag(request: Request, *, user_id: uuid.UUID, entity: str) -> str:
+    """Weak ETag of one user's ``entity`` list as selected by this request's query string.
+
+    The collection version is the user's response-cache version of ``entity``,
+    which every committed write moves, whatever ``updated_at`` it stores (batch
+    sync keeps the client's). No database query: a revalidation that ends in a
+    304 costs one Redis read (or none, with in-process versions).
+    """
+    version = await response_cache.version_tag(user_id, (entity,))
+    # filters, cursor and limit select different pages of the same collection
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{entity}|{version}|{query}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    """A 304 for ``etag`` if the client's ``If-None-Match`` already has it."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return None
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" not in candidates and etag.removeprefix("W/") not in candidates:
+        return None
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # per-user data: private caches only, and always revalidated
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
@@ -11,6 +11,7 @@ from app.core.response import err
 from app.core.security import decode_token
 from app.db.session import get_db
 from app.models.user import User
+from app.services.principal_cache import principal_cache
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
@@ -40,9 +41,14 @@ async def get_current_user(
     except Exception:
         raise HTTPException(status_code=401, detail=err(request, "unauthorized", "Invalid token payload"))
 
-    res = await db.execute(select(User).where(User.id == uid, User.deleted == False))  # noqa: E712
-    user = res.scalar_one_or_none()
-    if not user:
+    user = await principal_cache.get(uid)
+    if user is None:
+        res = await db.execute(select(User).where(User.id == uid, User.deleted == False))  # noqa: E712
+        user = res.scalar_one_or_none()
+        if not user:
+            raise HTTPException(status_code=401, detail=err(request, "unauthorized", "User not found"))
+        await principal_cache.put(user)
+    elif user.deleted:
         raise HTTPException(status_code=401, detail=err(request, "unauthorized", "User not found"))
 
     request.state.user_id = str(user.id)
@@ -22,12 +22,24 @@ async def enforce_idempotency(
     if not key:
         raise HTTPException(status_code=400, detail=err(request, "validation_error", "request_id or X-Idempotency-Key is required"))
 
+    claimed = getattr(request.state, "idempotency", None)
+    if (
+        claimed is not None
+        and not claimed.record_in_db
+        and claimed.scope.key == key
+        and claimed.scope.user_id == str(current_user.id)
+    ):
+        # already claimed by IdempotencySnapshotMiddleware in the snapshot store
+        return
+
     rec = IdempotencyKey(user_id=current_user.id, key=key, method=request.method, path=request.url.path)
     db.add(rec)
     try:
         await db.flush()
     except IntegrityError:
-        # repeated request; in full impl we'd return stored response
+        # repeated request; in full impl we'd return stored response.
+        # The snapshot middleware must not store this 409 over the first request's answer
+        request.state.idempotency_duplicate = True
         raise HTTPException(status_code=409, detail=err(request, "idempotency_conflict", "Duplicate request_id/X-Idempotency-Key"))
 
 
@@ -6,7 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.core.logging import log
 from app.core.response import err, ok
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.schemas.ai_rules import AiRulesOut, AiRulesUpsertIn, AiRulesBase
 from app.services.ai_rules_service import get_rules, upsert_rules
 
@@ -24,7 +24,7 @@ def _serialize_rules(rules_model) -> AiRulesBase:
 
 
 @router.get("", response_model=AiRulesOut)
-async def get_ai_rules(request: Request, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_ai_rules(request: Request, current_user=Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
     rules = await get_rules(db, user_id=current_user.id)
     payload = _serialize_rules(rules).model_dump()
 
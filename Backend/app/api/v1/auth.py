@@ -5,6 +5,7 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.response import err, ok
+from app.core.security import PasswordHasherBusy
 from app.core.logging import log
 from app.db.session import get_db
 from app.middleware.rate_limit import forgot_rate_limit, login_rate_limit, signup_rate_limit
@@ -25,6 +26,14 @@ from app.api.deps import get_current_user
 router = APIRouter(prefix="/auth")
 
 
+def _auth_busy(request: Request) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=err(request, "auth_busy", "Too many authentication requests, retry shortly", details={"retry_after_seconds": 1}),
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=AuthOut, dependencies=[signup_rate_limit])
 async def signup(
     request: Request,
@@ -40,17 +49,19 @@ async def signup(
         user = await create_user(db, body.email, body.password, body.full_name, body.timezone)
         device_id = x_device_id or "default"
         access, refresh = await issue_tokens(db, user, device_id)
+        publish_event(
+            name="User_SignUp",
+            request_id=request.state.request_id,
+            user_id=str(user.id),
+            payload={"device_id": device_id},
+            db=db,
+        )
         await db.commit()
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail=err(request, "user_exists", "User already exists"))
-
-    publish_event(
-        name="User_SignUp",
-        request_id=request.state.request_id,
-        user_id=str(user.id),
-        payload={"device_id": device_id},
-    )
+    except PasswordHasherBusy:
+        raise _auth_busy(request)
 
     log.info(
         "auth_signup",
@@ -72,7 +83,10 @@ async def signup(
 
 @router.post("/login", response_model=AuthOut, dependencies=[login_rate_limit])
 async def login(request: Request, body: LoginIn, db: AsyncSession = Depends(get_db)):
-    user = await authenticate_user(db, body.email, body.password)
+    try:
+        user = await authenticate_user(db, body.email, body.password)
+    except PasswordHasherBusy:
+        raise _auth_busy(request)
     if not user:
         raise HTTPException(status_code=401, detail=err(request, "invalid_credentials", "Invalid email or password"))
 
@@ -6,7 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
 from app.core.response import ok, err
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.services.response_cache import response_cache
 from app.schemas.planner import (
     PlannerDecisionIn,
     PlannerDecisionOut,
@@ -129,57 +130,63 @@ async def get_ai_plan(
     request: Request,
     plan_request_id: uuid.UUID,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Получение плана через use-case"""
     
     try:
-        # Выполняем use-case
-        use_case = get_get_plan_use_case(db)
-        plan = await use_case.execute(
-            plan_request_id=plan_request_id,
-            user_id=current_user.id
-        )
-        
-        if not plan:
-            raise HTTPException(
-                status_code=404,
-                detail=err(request, "not_found", "Plan not found")
+        async def load() -> dict:
+            # Выполняем use-case
+            use_case = get_get_plan_use_case(db)
+            plan = await use_case.execute(
+                plan_request_id=plan_request_id,
+                user_id=current_user.id
             )
         
-        # Конвертируем доменную модель в DTO
-        slots = [
-            PlannerSlot(
-                slot_id=slot.slot_id,
-                task_id=slot.task_id,
-                title=slot.title,
-                description=slot.description,
-                start_at=slot.start_at,
-                end_at=slot.end_at
-            )
-            for slot in plan.slots
-        ]
+            if not plan:
+                raise HTTPException(
+                    status_code=404,
+                    detail=err(request, "not_found", "Plan not found")
+                )
         
-        conflicts = [
-            PlannerConflict(
-                slot_id=conflict.slot_id,
-                reason=conflict.reason,
-                severity=conflict.severity,
-                details=conflict.details,
-                related_task_id=conflict.related_task_id
-            )
-            for conflict in plan.conflicts
-        ]
+            # Конвертируем доменную модель в DTO
+            slots = [
+                PlannerSlot(
+                    slot_id=slot.slot_id,
+                    task_id=slot.task_id,
+                    title=slot.title,
+                    description=slot.description,
+                    start_at=slot.start_at,
+                    end_at=slot.end_at
+                )
+                for slot in plan.slots
+            ]
         
-        return ok(request, {
-            "plan_request_id": plan.plan_request_id,
-            "status": plan.status,
-            "version": plan.version,
-            "source": plan.source,
-            "slots": slots,
-            "conflicts": conflicts,
-            "request_id": request.state.request_id
-        })
+            conflicts = [
+                PlannerConflict(
+                    slot_id=conflict.slot_id,
+                    reason=conflict.reason,
+                    severity=conflict.severity,
+                    details=conflict.details,
+                    related_task_id=conflict.related_task_id
+                )
+                for conflict in plan.conflicts
+            ]
+        
+            return {
+                "plan_request_id": plan.plan_request_id,
+                "status": plan.status,
+                "version": plan.version,
+                "source": plan.source,
+                "slots": slots,
+                "conflicts": conflicts,
+            }
+
+        # план кэшируется до следующего изменения планов пользователя
+        payload = await response_cache.get_or_compute(
+            request, user_id=current_user.id, entities=("plan",), compute=load
+        )
+        return ok(request, payload)
         
     except Exception as exc:
         raise HTTPException(
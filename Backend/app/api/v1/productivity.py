@@ -3,30 +3,36 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import and_, delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.conditional import cache_headers, collection_etag, not_modified
 from app.api.deps import get_current_user
 from app.core.response import err, ok
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.calendar_event import CalendarEvent
 from app.models.finance import Budget, FinanceTransaction
 from app.models.goal import Goal
 from app.models.inbox_item import InboxItem
 from app.models.notification import NotificationTrigger
+from app.repositories import calendar_repo, finance_repo, goals_repo
+from app.services import finance_rollups, tombstones
 from app.schemas.productivity import (
     BudgetIn,
     BudgetOut,
     CalendarEventIn,
+    CalendarEventListOut,
     CalendarEventOut,
     CalendarEventUpdateIn,
     DigestPreviewOut,
     FinanceSummaryOut,
     FinanceTransactionIn,
+    FinanceTransactionListOut,
     FinanceTransactionOut,
     FinanceTransactionUpdateIn,
     GoalCreateIn,
+    GoalListOut,
     GoalOut,
     GoalProgressOut,
     GoalUpdateIn,
@@ -38,6 +44,7 @@ from app.schemas.productivity import (
     SyncStatusOut,
 )
 from app.schemas.subscription import SubscriptionStatusOut
+from app.services.response_cache import response_cache
 from app.services.subscription_service import activate_trial, subscription_status
 
 router = APIRouter(prefix="/productivity")
@@ -49,6 +56,23 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+async def _require_sync_horizon(request: Request, db: AsyncSession, entity: str, updated_from: datetime | None) -> None:
+    # deletions older than the horizon may be archived: deltas from before it would be incomplete
+    if updated_from is None:
+        return
+    horizon = await tombstones.get_horizon(db, entity)
+    if tombstones.predates_horizon(updated_from, horizon):
+        raise HTTPException(
+            status_code=410,
+            detail=err(
+                request,
+                "full_resync_required",
+                "updated_from is older than the sync horizon; resync without updated_from",
+                {"entity": entity, "horizon": horizon.isoformat()},
+            ),
+        )
+
+
 def _get_plan(user) -> SubscriptionStatusOut:
     return subscription_status(user)
 
@@ -67,35 +91,53 @@ async def activate_trial_plan(request: Request, current_user=Depends(get_current
 # ----------------------
 # Goals
 # ----------------------
-@router.get("/goals", response_model=list[GoalOut])
+@router.get("/goals", response_model=GoalListOut)
 async def list_goals(
     request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     updated_from: datetime | None = None,
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=100),
 ):
-    q = select(Goal).where(Goal.user_id == current_user.id)
-    if hasattr(Goal, "deleted"):
-        q = q.where(Goal.deleted == False)  # noqa: E712
-    if updated_from is not None and hasattr(Goal, "updated_at"):
-        q = q.where(Goal.updated_at >= updated_from)
-    res = await db.execute(q.order_by(Goal.created_at.desc() if hasattr(Goal, "created_at") else Goal.id))
-    goals = list(res.scalars())
-
-    items: list[GoalOut] = []
-    for g in goals:
-        items.append(
-            GoalOut(
-                id=g.id,
-                title=g.title,
-                description=getattr(g, "description", None),
-                target_date=getattr(g, "target_date", None),
-                progress=float(getattr(g, "progress", 0.0) or 0.0),
-                tasks_total=int(getattr(g, "tasks_total", 0) or 0),
-                tasks_completed=int(getattr(g, "tasks_completed", 0) or 0),
-            )
+    await _require_sync_horizon(request, db, "goal", updated_from)
+    etag = await collection_etag(request, user_id=current_user.id, entity="goal")
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(cache_headers(etag))
+
+    async def load() -> dict:
+        # clients that do not page still get every goal, streamed from the DB in chunks
+        if cursor is None and limit is None:
+            items = [
+                _goal_out(g).model_dump()
+                async for g in goals_repo.stream_by_created(db, user_id=current_user.id, updated_from=updated_from)
+            ]
+            return {"items": items, "next_cursor": None}
+
+        goals, next_cursor = await goals_repo.list_by_created(
+            db, user_id=current_user.id, updated_from=updated_from, cursor=cursor, limit=limit or 50
         )
-    return ok(request, [i.model_dump() for i in items])
+        return {"items": [_goal_out(g).model_dump() for g in goals], "next_cursor": next_cursor}
+
+    payload = await response_cache.get_or_compute(
+        request, user_id=current_user.id, entities=("goal",), compute=load
+    )
+    return ok(request, payload)
+
+
+def _goal_out(g: Goal) -> GoalOut:
+    return GoalOut(
+        id=g.id,
+        title=g.title,
+        description=getattr(g, "description", None),
+        target_date=getattr(g, "target_date", None),
+        progress=float(getattr(g, "progress", 0.0) or 0.0),
+        tasks_total=int(getattr(g, "tasks_total", 0) or 0),
+        tasks_completed=int(getattr(g, "tasks_completed", 0) or 0),
+    )
 
 
 @router.post("/goals", response_model=GoalOut)
@@ -173,7 +215,7 @@ async def goal_progress(
     request: Request,
     goal_id: uuid.UUID,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     res = await db.execute(select(Goal).where(Goal.id == goal_id, Goal.user_id == current_user.id))
     g = res.scalar_one_or_none()
@@ -198,34 +240,45 @@ async def goal_progress(
 # ----------------------
 # Calendar
 # ----------------------
-@router.get("/calendar/events", response_model=list[CalendarEventOut])
+@router.get("/calendar/events", response_model=CalendarEventListOut)
 async def list_events(
     request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     updated_from: datetime | None = None,
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=100),
 ):
-    q = select(CalendarEvent).where(CalendarEvent.user_id == current_user.id)
-    if hasattr(CalendarEvent, "deleted"):
-        q = q.where(CalendarEvent.deleted == False)  # noqa: E712
-    if updated_from is not None and hasattr(CalendarEvent, "updated_at"):
-        q = q.where(CalendarEvent.updated_at >= updated_from)
-    res = await db.execute(q.order_by(CalendarEvent.start_at.desc() if hasattr(CalendarEvent, "start_at") else CalendarEvent.id))
-    events = list(res.scalars())
-
-    out: list[CalendarEventOut] = []
-    for e in events:
-        out.append(
-            CalendarEventOut(
-                id=e.id,
-                title=e.title,
-                start_at=e.start_at,
-                end_at=e.end_at,
-                recurrence=getattr(e, "recurrence", None),
-                parallel_with=getattr(e, "parallel_with", []) or [],
-            )
-        )
-    return ok(request, [i.model_dump() for i in out])
+    await _require_sync_horizon(request, db, "event", updated_from)
+    etag = await collection_etag(request, user_id=current_user.id, entity="event")
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(cache_headers(etag))
+
+    if cursor is None and limit is None:
+        items = [
+            _event_out(e).model_dump()
+            async for e in calendar_repo.stream_by_start(db, user_id=current_user.id, updated_from=updated_from)
+        ]
+        return ok(request, {"items": items, "next_cursor": None})
+
+    events, next_cursor = await calendar_repo.list_by_start(
+        db, user_id=current_user.id, updated_from=updated_from, cursor=cursor, limit=limit or 50
+    )
+    return ok(request, {"items": [_event_out(e).model_dump() for e in events], "next_cursor": next_cursor})
+
+
+def _event_out(e: CalendarEvent) -> CalendarEventOut:
+    return CalendarEventOut(
+        id=e.id,
+        title=e.title,
+        start_at=e.start_at,
+        end_at=e.end_at,
+        recurrence=getattr(e, "recurrence", None),
+        parallel_with=getattr(e, "parallel_with", []) or [],
+    )
 
 
 @router.post("/calendar/events", response_model=CalendarEventOut)
@@ -357,35 +410,48 @@ async def convert_inbox_note(
 # ----------------------
 # Finance
 # ----------------------
-@router.get("/finance/transactions", response_model=list[FinanceTransactionOut])
+@router.get("/finance/transactions", response_model=FinanceTransactionListOut)
 async def list_transactions(
     request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     updated_from: datetime | None = None,
+    cursor: str | None = Query(default=None),
+    limit: int | None = Query(default=None, ge=1, le=100),
 ):
-    q = select(FinanceTransaction).where(FinanceTransaction.user_id == current_user.id)
-    if hasattr(FinanceTransaction, "deleted"):
-        q = q.where(FinanceTransaction.deleted == False)  # noqa: E712
-    if updated_from is not None and hasattr(FinanceTransaction, "updated_at"):
-        q = q.where(FinanceTransaction.updated_at >= updated_from)
-    res = await db.execute(q.order_by(FinanceTransaction.occurred_at.desc() if hasattr(FinanceTransaction, "occurred_at") else FinanceTransaction.id))
-    txs = list(res.scalars())
-
-    out: list[FinanceTransactionOut] = []
-    for t in txs:
-        out.append(
-            FinanceTransactionOut(
-                id=t.id,
-                type=t.type,
-                amount=float(t.amount),
-                currency=t.currency,
-                category=t.category,
-                occurred_at=t.occurred_at,
-                recurring=bool(getattr(t, "recurring", False)),
+    await _require_sync_horizon(request, db, "finance", updated_from)
+    etag = await collection_etag(request, user_id=current_user.id, entity="finance")
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(cache_headers(etag))
+
+    if cursor is None and limit is None:
+        items = [
+            _transaction_out(t).model_dump()
+            async for t in finance_repo.stream_transactions_by_occurred(
+                db, user_id=current_user.id, updated_from=updated_from
             )
-        )
-    return ok(request, [i.model_dump() for i in out])
+        ]
+        return ok(request, {"items": items, "next_cursor": None})
+
+    txs, next_cursor = await finance_repo.list_transactions_by_occurred(
+        db, user_id=current_user.id, updated_from=updated_from, cursor=cursor, limit=limit or 50
+    )
+    return ok(request, {"items": [_transaction_out(t).model_dump() for t in txs], "next_cursor": next_cursor})
+
+
+def _transaction_out(t: FinanceTransaction) -> FinanceTransactionOut:
+    return FinanceTransactionOut(
+        id=t.id,
+        type=t.type,
+        amount=float(t.amount),
+        currency=t.currency,
+        category=t.category,
+        occurred_at=t.occurred_at,
+        recurring=bool(getattr(t, "recurring", False)),
+    )
 
 
 @router.post("/finance/transactions", response_model=FinanceTransactionOut)
@@ -487,23 +553,19 @@ async def finance_summary(
     request: Request,
     month: str,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    q = select(FinanceTransaction).where(FinanceTransaction.user_id == current_user.id)
-    if hasattr(FinanceTransaction, "deleted"):
-        q = q.where(FinanceTransaction.deleted == False)  # noqa: E712
-    res = await db.execute(q)
-    txs = list(res.scalars())
-
-    income = sum(float(t.amount) for t in txs if t.type == "income")
-    expenses = sum(float(t.amount) for t in txs if t.type == "expense")
-
-    bq = select(Budget).where(Budget.user_id == current_user.id)
-    res2 = await db.execute(bq)
-    budgets_rows = list(res2.scalars())
-    budgets: dict[str, float] = {}
-    for b in budgets_rows:
-        budgets[getattr(b, "month")] = float(getattr(b, "amount"))
+    if not finance_rollups.is_valid_month(month):
+        raise HTTPException(status_code=400, detail=err(request, "validation_error", "month must be YYYY-MM"))
+
+    # UTC-month rollups maintained on every transaction write: cost does not grow with history
+    totals = await finance_rollups.month_totals(db, user_id=current_user.id, month=month)
+    income = float(totals.get("income", 0))
+    expenses = float(totals.get("expense", 0))
+
+    res = await db.execute(select(Budget.amount).where(Budget.user_id == current_user.id, Budget.month == month))
+    budget = res.scalar_one_or_none()
+    budgets: dict[str, float] = {month: float(budget)} if budget is not None else {}
 
     payload = FinanceSummaryOut(
         month=month,
@@ -606,7 +668,7 @@ async def digest_preview(request: Request, cadence: str = "daily", current_user=
 async def sync_status(
     request: Request,
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     pending_entities: list[str] = []
 
@@ -625,5 +687,6 @@ async def sync_status(
         last_synced_at=_now(),
         pending_entities=pending_entities,
         status="syncing" if pending_entities else "idle",
+        sync_horizons=await tombstones.get_horizons(db),
     )
     return ok(request, status.model_dump())
@@ -10,11 +10,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.api.idempotency import enforce_idempotency
 from app.core.response import err, ok
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.models.subtask import Subtask
 from app.models.task import Task
 from app.schemas.subtasks import SubtaskCreateIn, SubtaskListOut, SubtaskOut, SubtaskUpdateIn
 from app.application.services.subtask_service import create_subtask, list_subtasks, update_subtask
+from app.services.response_cache import response_cache
 
 router = APIRouter(prefix="/subtasks")
 
@@ -26,15 +27,21 @@ async def get_subtasks(
     cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=100),
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # verify parent task exists and belongs to user
     res = await db.execute(select(Task).where(Task.id == task_id, Task.user_id == current_user.id, Task.deleted == False))  # noqa: E712
     if not res.scalar_one_or_none():
         raise HTTPException(status_code=404, detail=err(request, "not_found", "Task not found"))
 
-    items, next_cursor = await list_subtasks(db, user_id=current_user.id, task_id=task_id, cursor=cursor, limit=limit)
-    return ok(request, {"items": [SubtaskOut.model_validate(x) for x in items], "next_cursor": next_cursor})
+    async def load() -> dict:
+        items, next_cursor = await list_subtasks(db, user_id=current_user.id, task_id=task_id, cursor=cursor, limit=limit)
+        return {"items": [SubtaskOut.model_validate(x) for x in items], "next_cursor": next_cursor}
+
+    payload = await response_cache.get_or_compute(
+        request, user_id=current_user.id, entities=("subtask",), compute=load
+    )
+    return ok(request, payload)
 
 
 @router.post("/tasks/{task_id}", response_model=SubtaskOut)
@@ -3,17 +3,31 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.conditional import cache_headers, collection_etag, not_modified
 from app.api.deps import get_current_user
 from app.application.services.task_service import TaskService
 from app.api.idempotency import enforce_idempotency
 from app.core.logging import log
 from app.core.response import err, ok
-from app.db.session import get_db
-from app.schemas.tasks import ALLOWED_STATUSES, TaskCreateIn, TaskDeleteIn, TaskListOut, TaskOut, TaskUpdateIn
+from app.db.session import get_db, get_read_db
+from app.models.task import Task
+from app.schemas.tasks import (
+    ALLOWED_STATUSES,
+    TaskBulkIn,
+    TaskBulkOut,
+    TaskCreateIn,
+    TaskDeleteIn,
+    TaskListOut,
+    TaskOut,
+    TaskUpdateIn,
+)
 from app.services.events import publish_event
-from app.infrastructure.di import get_task_service
+from app.services.response_cache import response_cache
+from app.services.task_bulk import apply_task_bulk
+from app.infrastructure.di import get_read_task_service, get_task_service
 from datetime import timezone
 from app.models.notification import NotificationTrigger
 from app.schemas.reminders import ReminderCreateIn, ReminderListOut, ReminderOut
@@ -26,8 +40,10 @@ router = APIRouter(prefix="/tasks")
 @router.get("", response_model=TaskListOut)
 async def get_tasks(
     request: Request,
+    response: Response,
     current_user=Depends(get_current_user),
-    task_service: TaskService = Depends(get_task_service),
+    db: AsyncSession = Depends(get_read_db),
+    task_service: TaskService = Depends(get_read_task_service),
     status: str | None = Query(default=None),
     goal_id: uuid.UUID | None = Query(default=None),
     due_from: datetime | None = Query(default=None),
@@ -38,27 +54,37 @@ async def get_tasks(
     if status and status not in ALLOWED_STATUSES:
         raise HTTPException(status_code=400, detail=err(request, "validation_error", "Unsupported status filter"))
 
-    items, next_cursor = await task_service.list_tasks(
-        current_user.id,
-        status=status,
-        goal_id=goal_id,
-        due_from=due_from,
-        due_to=due_to,
-        cursor=cursor,
-        limit=limit,
+    etag = await collection_etag(request, user_id=current_user.id, entity="task")
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(cache_headers(etag))
+
+    async def load() -> dict:
+        items, next_cursor = await task_service.list_tasks(
+            current_user.id,
+            status=status,
+            goal_id=goal_id,
+            due_from=due_from,
+            due_to=due_to,
+            cursor=cursor,
+            limit=limit,
+        )
+        return {
+            "items": [TaskOut.model_validate(t) for t in items],
+            "next_cursor": next_cursor,
+        }
+
+    payload = await response_cache.get_or_compute(
+        request, user_id=current_user.id, entities=("task",), compute=load
     )
 
-    payload = {
-        "items": [TaskOut.model_validate(t) for t in items],
-        "next_cursor": next_cursor,
-    }
-
     log.info(
         "tasks_list",
         request_id=request.state.request_id,
         user_id=str(current_user.id),
-        count=len(items),
-        next_cursor=next_cursor,
+        count=len(payload["items"]),
+        next_cursor=payload["next_cursor"],
     )
 
     return ok(request, payload)
@@ -76,14 +102,14 @@ async def post_task(
     await enforce_idempotency(request, current_user, db, request_id=body.request_id, idempotency_key=x_idempotency_key)
 
     task = await task_service.create_task(current_user.id, body.model_dump())
-    await db.commit()
-
     publish_event(
         name="Task_Created",
         request_id=request.state.request_id,
         user_id=str(current_user.id),
         payload={"task_id": str(task.id)},
+        db=db,
     )
+    await db.commit()
 
     log.info(
         "task_created",
@@ -95,6 +121,43 @@ async def post_task(
     return ok(request, TaskOut.model_validate(task).model_dump())
 
 
+@router.post("/bulk", response_model=TaskBulkOut)
+async def bulk_tasks(
+    request: Request,
+    body: TaskBulkIn,
+    current_user=Depends(get_current_user),
+    db=Depends(get_db),
+    x_idempotency_key: str | None = Header(default=None, alias="X-Idempotency-Key"),
+):
+    # one idempotency key and one transaction for the whole selection
+    await enforce_idempotency(request, current_user, db, request_id=body.request_id, idempotency_key=x_idempotency_key)
+
+    results = await apply_task_bulk(db, user_id=current_user.id, operations=body.operations)
+    applied = {"create": 0, "update": 0, "delete": 0}
+    for result in results:
+        if result.status == "applied":
+            applied[result.action] += 1
+    if any(applied.values()):
+        publish_event(
+            name="Tasks_Bulk_Applied",
+            request_id=request.state.request_id,
+            user_id=str(current_user.id),
+            payload={"created": applied["create"], "updated": applied["update"], "deleted": applied["delete"]},
+            db=db,
+        )
+    await db.commit()
+
+    log.info(
+        "tasks_bulk_applied",
+        request_id=request.state.request_id,
+        user_id=str(current_user.id),
+        operations=len(body.operations),
+        applied=sum(applied.values()),
+        conflicts=len([r for r in results if r.status == "conflict"]),
+    )
+    return ok(request, {"results": [r.model_dump() for r in results]})
+
+
 @router.patch("/{task_id}", response_model=TaskOut)
 async def patch_task(
     request: Request,
@@ -164,7 +227,7 @@ async def get_task_reminders(
     cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=100),
     current_user=Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     # verify task
     res = await db.execute(select(Task).where(Task.id == task_id, Task.user_id == current_user.id, Task.deleted == False))  # noqa: E712
@@ -209,14 +272,14 @@ async def create_task_reminder(
         deleted=False,
     )
     await notification_triggers_repo.create(db, trig)
-    await db.commit()
-    await db.refresh(trig)
-
     publish_event(
         name="Task_Reminder_Created",
         request_id=request.state.request_id,
         user_id=str(current_user.id),
         payload={"task_id": str(task_id), "trigger_id": str(trig.id)},
+        db=db,
     )
+    await db.commit()
+    await db.refresh(trig)
 
     return ok(request, ReminderOut.model_validate(trig).model_dump())
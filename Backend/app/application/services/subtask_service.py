@@ -50,13 +50,13 @@ async def update_subtask(
     values = {k: v for k, v in patch.items() if v is not None and k not in {"request_id", "updated_at"}}
     values["updated_at"] = datetime.now(timezone.utc)
 
-    await subtasks_repo.patch(db, subtask_id=subtask.id, values=values)
+    await subtasks_repo.patch(db, subtask_id=subtask.id, user_id=subtask.user_id, values=values)
     await db.refresh(subtask)
     return subtask
 
 
 async def soft_delete_subtask(db: AsyncSession, *, subtask: Subtask) -> Subtask:
     values = {"deleted": True, "updated_at": datetime.now(timezone.utc)}
-    await subtasks_repo.soft_delete(db, subtask_id=subtask.id, values=values)
+    await subtasks_repo.soft_delete(db, subtask_id=subtask.id, user_id=subtask.user_id, values=values)
     await db.refresh(subtask)
     return subtask
@@ -17,6 +17,33 @@ class Settings(BaseSettings):
 
     # DB
     DATABASE_URL: str = "postgresql+asyncpg://lifemerge:lifemerge@db:5432/lifemerge"
+    # Optional streaming replica for read-only routes; unset -> everything goes to DATABASE_URL
+    DATABASE_REPLICA_URL: str | None = None
+    # A user's reads stay on the primary this long after their last committed write
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # pre-ping costs a round-trip per checkout; recycle already retires stale connections
+    DB_POOL_PRE_PING: bool = False
+    # asyncpg / SQLAlchemy prepared statement caches per connection (set both to 0 behind pgbouncer
+    # in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    DB_POOL_WAIT_WARN_MS: int = 100
+    DB_POOL_METRIC_EVERY: int = 1000
+    # Per-request statement/row/DB-time accounting; one statement shape executed this many
+    # times in a request is logged as a likely N+1
+    DB_QUERY_STATS_ENABLED: bool = True
+    DB_REPEATED_STATEMENT_WARN: int = 10
+    # Local/single-node mode (sqlite+aiosqlite:///...): pragmas applied to every new connection
+    # (empty -> leave SQLite's default) and sqlite3's per-connection prepared statement cache
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHED_STATEMENTS: int = 256
+    # rows fetched per round-trip when a list endpoint is read without a page limit
+    LIST_STREAM_CHUNK_SIZE: int = 500
 
     # JWT
     JWT_SECRET_KEY: str = Field(default="CHANGE_ME_IN_STAGE_AND_PROD")
@@ -26,6 +53,8 @@ class Settings(BaseSettings):
 
     # Security
     PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     # HTTP & CORS Configuration
     # Important: When CORS_ALLOW_CREDENTIALS=True, CORS_ALLOW_ORIGINS must not contain "*"
@@ -45,6 +74,26 @@ class Settings(BaseSettings):
     # Background processing
     SYNC_QUEUE_BATCH_SIZE: int = 50
     SYNC_RETRY_MINUTES: int = 5
+    SYNC_RETRY_MAX_MINUTES: int = 360
+    SYNC_MAX_ATTEMPTS: int = 10
+    SYNC_WORKER_CONCURRENCY: int = 4
+    SYNC_LEASE_SECONDS: int = 300
+
+    # Reminder dispatcher (notification_triggers)
+    REMINDER_CLAIM_INTERVAL_SECONDS: float = 1.0
+    REMINDER_LOOKAHEAD_SECONDS: int = 180
+    REMINDER_LEASE_SECONDS: int = 120
+    REMINDER_CLAIM_BATCH_SIZE: int = 1000
+    REMINDER_SEND_CONCURRENCY: int = 32
+    REMINDER_MARK_BATCH_SIZE: int = 500
+    # triggers overdue by more than this are marked sent without a push
+    REMINDER_MAX_LATENESS_SECONDS: int = 900
+
+    # Analytics outbox
+    ANALYTICS_SINK: str = "log"  # log | ndjson
+    ANALYTICS_NDJSON_PATH: str = "var/analytics/events.ndjson"
+    ANALYTICS_OUTBOX_BATCH_SIZE: int = 500
+    ANALYTICS_EVENT_MAX_BYTES: int = 2048
 
     # AI planner service
     AI_SERVICE_URL: str = "http://ai-service:9000"
@@ -65,10 +114,48 @@ class Settings(BaseSettings):
     # REDIS
     REDIS_URL: str | None = None
 
+    # Principal cache (get_current_user)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = 300
+    PRINCIPAL_CACHE_METRIC_EVERY: int = 1000
+
+    # Response cache (read-heavy GET endpoints)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 5000
+    RESPONSE_CACHE_REDIS_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_LOCK_SECONDS: float = 2.0
+    RESPONSE_CACHE_METRIC_EVERY: int = 1000
+
+    # Idempotency snapshots
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_INFLIGHT_TTL_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_SNAPSHOT_MAX_BYTES: int = 1024 * 1024
+    IDEMPOTENCY_REAP_BATCH_SIZE: int = 1000
+    IDEMPOTENCY_REAP_MAX_BATCHES: int = 50
+    IDEMPOTENCY_REAP_PAUSE_SECONDS: float = 0.05
+
+    # Goal counter reconciliation
+    GOAL_RECONCILE_BATCH_SIZE: int = 1000
+    GOAL_RECONCILE_PAUSE_SECONDS: float = 0.05
+
+    # Tombstone archival (also the sync horizon: deltas older than this need a full resync)
+    TOMBSTONE_RETENTION_DAYS: int = 90
+    TOMBSTONE_ARCHIVE_BATCH_SIZE: int = 500
+    TOMBSTONE_ARCHIVE_MAX_BATCHES: int = 20
+    TOMBSTONE_ARCHIVE_PAUSE_SECONDS: float = 0.05
+
     AUTH_RL_WINDOW_SECONDS: int = 60
     AUTH_RL_SIGNUP_LIMIT: int = 10
     AUTH_RL_LOGIN_LIMIT: int = 20
     AUTH_RL_FORGOT_LIMIT: int = 10
+    # API-wide limit per user (per IP for anonymous callers)
+    API_RL_ENABLED: bool = True
+    API_RL_WINDOW_SECONDS: int = 60
+    API_RL_LIMIT: int = 600
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 50000
 
     # Значения по умолчанию, которые считаются небезопасными
     INSECURE_DEFAULT_VALUES: ClassVar[set[str]] = {
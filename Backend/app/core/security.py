@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable, TypeVar
 
-import hashlib
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.services.observability import record_password_hash_metric
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
 
 
 def hash_password(password: str) -> str:
@@ -21,6 +26,71 @@ def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+class PasswordHasherBusy(Exception):
+    """Too many password hash operations are already queued on this worker."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool instead of the event loop.
+
+    bcrypt releases the GIL, so other requests keep being served while a hash
+    is computed. ``max_pending`` caps queued + running operations; beyond it
+    callers get ``PasswordHasherBusy`` rather than an ever-growing queue.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._max_pending = max_pending
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run("verify", verify_password, password, password_hash)
+
+    async def _run(self, op: str, fn: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self._max_pending:
+            record_password_hash_metric(op=op, status="rejected", pending=self._pending)
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        queued_at = time.perf_counter()
+        started_at: float | None = None
+
+        def call() -> T:
+            nonlocal started_at
+            started_at = time.perf_counter()
+            return fn(*args)
+
+        status = "error"
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+            status = "ok"
+            return result
+        finally:
+            self._pending -= 1
+            finished_at = time.perf_counter()
+            started_at = started_at or finished_at
+            record_password_hash_metric(
+                op=op,
+                status=status,
+                pending=self._pending,
+                queue_ms=int((started_at - queued_at) * 1000),
+                run_ms=int((finished_at - started_at) * 1000),
+            )
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def create_access_token(subject: str, user_id: str) -> str:
     now = datetime.now(timezone.utc)
     exp = now + timedelta(seconds=settings.ACCESS_TOKEN_TTL_SECONDS)
@@ -52,6 +122,20 @@ def decode_token(token: str) -> dict[str, Any]:
     return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
 
 
+def access_token_uid(authorization: str | None) -> str | None:
+    """User id from a valid ``Authorization: Bearer <access token>`` header, without a DB lookup."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except Exception:
+        return None
+    if payload.get("type") != "access" or not payload.get("uid"):
+        return None
+    return str(payload["uid"])
+
+
 def token_hash(token: str) -> str:
     # store only hash of refresh token in DB
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
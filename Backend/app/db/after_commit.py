@@ -0,0 +1,50 @@
+"""Async follow-ups of a committed transaction.
+
+SQLAlchemy's ``after_commit`` hook is synchronous, so listeners that have to
+tell Redis about a commit hand the coroutine to ``defer``. Sessions handed out
+by ``get_db`` collect them and ``drain`` awaits them in the dependency teardown,
+before the response is sent: by the time a client sees its write acknowledged,
+every worker sees the follow-up too. Other sessions (background jobs) run them
+as tasks.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Coroutine
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.logging import log
+
+_COLLECT_KEY = "after_commit_collect"
+_PENDING_KEY = "after_commit_pending"
+_background: set[asyncio.Task] = set()
+
+
+def collect(session: AsyncSession) -> None:
+    """Keep this session's follow-ups for ``drain`` instead of running them in the background."""
+    session.info[_COLLECT_KEY] = True
+
+
+def defer(session: Session, coro: Coroutine) -> None:
+    if session.info.get(_COLLECT_KEY):
+        session.info.setdefault(_PENDING_KEY, []).append(coro)
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        coro.close()
+        return
+    task = loop.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def drain(session: AsyncSession) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for outcome in await asyncio.gather(*pending, return_exceptions=True):
+        if isinstance(outcome, Exception):
+            log.warning("after_commit_failed", error=str(outcome))
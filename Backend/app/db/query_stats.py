@@ -0,0 +1,98 @@
+"""Per-request accounting of the SQL a request sends.
+
+Cursor events on every engine add each statement, the rows the driver reports
+for it (rows returned on Postgres, rows affected by writes) and the time spent
+waiting on it to the ``QueryStats`` of the request being served, found through a
+context variable that ``QueryStatsMiddleware`` sets. Statements are grouped by
+shape, the SQL before parameters are bound: when one shape runs
+``DB_REPEATED_STATEMENT_WARN`` times in a request it is logged once as a likely
+N+1. An ``executemany`` counts as one statement.
+"""
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextvars import ContextVar, Token
+from typing import Any, MutableMapping
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging import log
+
+_STARTED_ATTR = "_query_stats_started"
+
+
+class QueryStats:
+    def __init__(self, *, request_id: str | None, scope: MutableMapping[str, Any]) -> None:
+        self.request_id = request_id
+        self.scope = scope
+        self.statements = 0
+        self.rows = 0
+        self.db_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str:
+        # the route template once the router has matched, the raw path before
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "")
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def record(self, shape: str, *, rows: int, elapsed_ms: float) -> int:
+        self.statements += 1
+        self.rows += rows
+        self.db_ms += elapsed_ms
+        self.shapes[shape] += 1
+        return self.shapes[shape]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def begin(*, request_id: str | None, scope: MutableMapping[str, Any]) -> Token:
+    return _current.set(QueryStats(request_id=request_id, scope=scope))
+
+
+def end(token: Token) -> QueryStats | None:
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None and _current.get() is not None:
+        setattr(context, _STARTED_ATTR, time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, _STARTED_ATTR, None)
+    if stats is None or started is None:
+        return
+    compiled = getattr(context, "compiled", None)
+    # compiled SQL before IN lists are expanded, so one query shape stays one key
+    shape = compiled.string if compiled is not None else statement
+    rowcount = getattr(cursor, "rowcount", -1)
+    count = stats.record(shape, rows=max(rowcount or 0, 0), elapsed_ms=(time.perf_counter() - started) * 1000)
+    if count == settings.DB_REPEATED_STATEMENT_WARN:
+        log.warning(
+            "db_repeated_statement",
+            request_id=stats.request_id,
+            route=stats.route,
+            count=count,
+            statement=" ".join(shape.split())[:300],
+        )
+
+
+def instrument(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,15 +1,232 @@
 from __future__ import annotations
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import time
+
+from fastapi import Request
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.logging import log
+from app.core.security import access_token_uid
+from app.db import after_commit, query_stats
+from app.infra.redis_client import get_redis
+from app.services.observability import record_db_pool_metric
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that measures how long callers wait to check a connection out.
+
+    Aggregates are logged every ``DB_POOL_METRIC_EVERY`` checkouts; a single wait
+    above ``DB_POOL_WAIT_WARN_MS`` is logged immediately.
+    """
+
+    metric_name = "primary"
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self._record_wait((time.perf_counter() - started) * 1000)
+
+    def _record_wait(self, wait_ms: float) -> None:
+        stats = self.__dict__.setdefault("_wait_stats", {"checkouts": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["checkouts"] += 1
+        stats["total_ms"] += wait_ms
+        stats["max_ms"] = max(stats["max_ms"], wait_ms)
+        if wait_ms >= settings.DB_POOL_WAIT_WARN_MS:
+            log.warning(
+                "db_pool_wait_slow",
+                pool=self.metric_name,
+                wait_ms=int(wait_ms),
+                checked_out=self.checkedout(),
+                overflow=self.overflow(),
+            )
+        if stats["checkouts"] >= settings.DB_POOL_METRIC_EVERY:
+            record_db_pool_metric(
+                pool=self.metric_name,
+                checkouts=stats["checkouts"],
+                wait_ms_max=int(stats["max_ms"]),
+                wait_ms_avg=round(stats["total_ms"] / stats["checkouts"], 3),
+                checked_out=self.checkedout(),
+                overflow=self.overflow(),
+            )
+            stats.update(checkouts=0, total_ms=0.0, max_ms=0.0)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL lets readers run alongside the writer; NORMAL only syncs at checkpoints in WAL mode
+        for pragma, value in (("journal_mode", settings.SQLITE_JOURNAL_MODE), ("synchronous", settings.SQLITE_SYNCHRONOUS)):
+            if value:
+                cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
 
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+def create_engine_for(url: str, *, name: str) -> AsyncEngine:
+    kwargs: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite" and parsed.database not in (None, "", ":memory:"):
+        # file databases default to a new connection (and driver thread) per checkout;
+        # pooling keeps connections, their threads and statement caches warm
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            connect_args={"cached_statements": settings.SQLITE_CACHED_STATEMENTS},
+        )
+    elif backend == "postgresql":
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            connect_args={
+                # asyncpg's own per-connection statement cache
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                # SQLAlchemy's asyncpg adapter cache of prepared statements
+                "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            },
+        )
+    new_engine = create_async_engine(url, **kwargs)
+    if backend == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    if isinstance(new_engine.pool, TimedQueuePool):
+        new_engine.pool.metric_name = name
+    if settings.DB_QUERY_STATS_ENABLED:
+        query_stats.instrument(new_engine)
+    return new_engine
+
+
+engine = create_engine_for(settings.DATABASE_URL, name="primary")
+read_engine = (
+    create_engine_for(settings.DATABASE_REPLICA_URL, name="replica") if settings.DATABASE_REPLICA_URL else engine
+)
 
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session_maker = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class RecentWriters:
+    """Users who committed a write within the read-your-writes window.
+
+    Marks are kept in-process and, when Redis is configured, mirrored there so
+    that other workers route the user's reads to the primary as well.
+    """
+
+    def __init__(self, *, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._until: dict[str, float] = {}
+
+    def mark(self, user_id: str) -> None:
+        now = time.monotonic()
+        self._until[user_id] = now + self.window_seconds
+        if len(self._until) > 10_000:
+            self._until = {uid: until for uid, until in self._until.items() if until > now}
+
+    async def is_recent(self, user_id: str) -> bool:
+        until = self._until.get(user_id)
+        if until is not None and until > time.monotonic():
+            return True
+        if not settings.REDIS_URL:
+            return False
+        try:
+            return bool(await get_redis().exists(_ryw_key(user_id)))
+        except RedisError as exc:
+            # cannot tell: the primary is always consistent
+            log.warning("read_your_writes_redis_unavailable", op="exists", error=str(exc))
+            return True
+
+    async def mark_remote(self, user_id: str) -> None:
+        try:
+            await get_redis().set(_ryw_key(user_id), "1", px=int(self.window_seconds * 1000))
+        except RedisError as exc:
+            log.warning("read_your_writes_redis_unavailable", op="set", error=str(exc))
+
 
+def _ryw_key(user_id: str) -> str:
+    return f"ryw:{user_id}"
 
-async def get_db() -> AsyncSession:
+
+recent_writers = RecentWriters(window_seconds=settings.DB_READ_YOUR_WRITES_SECONDS)
+
+_WRITER_KEY = "writer_user_id"
+_WROTE_KEY = "wrote"
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_write(session: Session, flush_context) -> None:
+    if session.info.get(_WRITER_KEY):
+        session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state) -> None:
+    # bulk update()/delete() and textual writes bypass the flush
+    if not orm_execute_state.is_select and orm_execute_state.session.info.get(_WRITER_KEY):
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_writer(session: Session) -> None:
+    if session.info.pop(_WROTE_KEY, False):
+        user_id = session.info[_WRITER_KEY]
+        recent_writers.mark(user_id)
+        if settings.REDIS_URL:
+            # awaited by get_db before the response: the user's next read may land on another worker
+            after_commit.defer(session, recent_writers.mark_remote(user_id))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+def register_listeners() -> None:
+    """Attach the service listeners that keep derived state in step with session writes.
+
+    Runs when this module is imported, so API requests and background jobs are
+    covered alike; registering twice is a no-op.
+    """
+    from app.services import finance_rollups, goal_counters, principal_cache, response_cache
+
+    finance_rollups.register_listeners()
+    goal_counters.register_listeners()
+    principal_cache.register_listeners()
+    response_cache.register_listeners()
+
+
+register_listeners()
+
+
+async def get_db(request: Request) -> AsyncSession:
     async with async_session_maker() as session:
+        after_commit.collect(session)
+        user_id = access_token_uid(request.headers.get("Authorization"))
+        if user_id and read_engine is not engine:
+            session.info[_WRITER_KEY] = user_id
+        try:
+            yield session
+        finally:
+            await after_commit.drain(session)
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Session for read-only routes: the replica, unless the caller wrote recently."""
+    maker = async_read_session_maker
+    if read_engine is not engine:
+        user_id = access_token_uid(request.headers.get("Authorization"))
+        if user_id is not None and await recent_writers.is_recent(user_id):
+            maker = async_session_maker
+    async with maker() as session:
         yield session
@@ -4,7 +4,7 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.application.services.task_service import TaskService
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.infrastructure.repositories.task_repository import SQLTaskRepository
 
 
@@ -15,3 +15,7 @@ def create_task_service(db: AsyncSession) -> TaskService:
 
 def get_task_service(db: AsyncSession = Depends(get_db)) -> TaskService:
     return create_task_service(db)
+
+
+def get_read_task_service(db: AsyncSession = Depends(get_read_db)) -> TaskService:
+    return create_task_service(db)
@@ -3,14 +3,16 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import and_, delete, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.domain.models.planner import DomainPlannerPlan
 from app.domain.repositories.planner_repository import PlannerRepository
 from app.infrastructure.mappers.planner_domain_mapper import PlannerDomainMapper
-from app.infrastructure.models.planner_models import SQLPlannerPlan
+from app.infrastructure.models.planner_models import SQLPlannerConflict, SQLPlannerPlan, SQLPlannerSlot
+from app.services.response_cache import mark_changed
 
 
 class SQLPlannerRepository(PlannerRepository):
@@ -21,21 +23,46 @@ class SQLPlannerRepository(PlannerRepository):
         self.mapper = PlannerDomainMapper()
     
     async def save(self, plan: DomainPlannerPlan) -> None:
-        """Сохранить или обновить план"""
-        
-        # Проверяем существование плана
-        existing = await self._get_sql_plan_by_id(plan.plan_id)
-        
-        if existing:
-            # Обновляем существующий план
-            self.mapper.update_sql_from_domain(existing, plan)
-            self.session.add(existing)
-        else:
-            # Создаем новый план
-            sql_plan = self.mapper.from_domain(plan)
-            self.session.add(sql_plan)
-        
-        await self.session.flush()
+        """Сохранить или обновить план.
+
+        Слоты и конфликты версии плана заменяются целиком: upsert строки плана,
+        удаление по plan_id и по одному многострочному INSERT на слоты и
+        конфликты, то есть пять statement-ов при любом числе слотов.
+        """
+        values = self.mapper.plan_values(plan)
+        dialect = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+        upsert = dialect.insert(SQLPlannerPlan.__table__).values(values)
+        await self.session.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[SQLPlannerPlan.__table__.c.id],
+                set_={
+                    key: upsert.excluded[key]
+                    for key in values
+                    if key not in ("id", "user_id", "plan_request_id", "created_at")
+                },
+            )
+        )
+
+        await self.session.execute(
+            delete(SQLPlannerConflict.__table__).where(SQLPlannerConflict.__table__.c.plan_id == plan.plan_id)
+        )
+        await self.session.execute(
+            delete(SQLPlannerSlot.__table__).where(SQLPlannerSlot.__table__.c.plan_id == plan.plan_id)
+        )
+        # executemany через insertmanyvalues: один INSERT ... VALUES (...), (...) на пачку строк
+        slot_rows = self.mapper.slot_rows(plan)
+        if slot_rows:
+            await self.session.execute(insert(SQLPlannerSlot.__table__), slot_rows)
+        conflict_rows = self.mapper.conflict_rows(plan)
+        if conflict_rows:
+            await self.session.execute(insert(SQLPlannerConflict.__table__), conflict_rows)
+
+        # план, уже загруженный в эту сессию, перечитается со свежими слотами и конфликтами
+        loaded = self.session.identity_map.get(inspect(SQLPlannerPlan).identity_key_from_primary_key((plan.plan_id,)))
+        if loaded is not None:
+            self.session.expire(loaded)
+        # Core-запросы не проходят через flush: кэш ответов сбрасывается явно
+        mark_changed(self.session.sync_session, plan.user_id, "plan")
     
     async def get_by_id(self, plan_id: uuid.UUID) -> Optional[DomainPlannerPlan]:
         """Получить план по ID"""
@@ -101,14 +128,17 @@ class SQLPlannerRepository(PlannerRepository):
         status: str
     ) -> None:
         """Обновить статус плана"""
-        await self.session.execute(
+        result = await self.session.execute(
             update(SQLPlannerPlan)
             .where(SQLPlannerPlan.id == plan_id)
             .values(
                 status=status,
                 updated_at=datetime.now(timezone.utc)
             )
+            .returning(SQLPlannerPlan.user_id)
         )
+        for user_id in result.scalars():
+            mark_changed(self.session.sync_session, user_id, "plan")
         await self.session.flush()
     
     async def increment_version(
@@ -116,14 +146,17 @@ class SQLPlannerRepository(PlannerRepository):
         plan_id: uuid.UUID
     ) -> None:
         """Увеличить версию плана"""
-        await self.session.execute(
+        result = await self.session.execute(
             update(SQLPlannerPlan)
             .where(SQLPlannerPlan.id == plan_id)
             .values(
                 version=SQLPlannerPlan.version + 1,
                 updated_at=datetime.now(timezone.utc)
             )
+            .returning(SQLPlannerPlan.user_id)
         )
+        for user_id in result.scalars():
+            mark_changed(self.session.sync_session, user_id, "plan")
         await self.session.flush()
     
     async def soft_delete(
@@ -131,14 +164,17 @@ class SQLPlannerRepository(PlannerRepository):
         plan_id: uuid.UUID
     ) -> None:
         """Мягкое удаление плана"""
-        await self.session.execute(
+        result = await self.session.execute(
             update(SQLPlannerPlan)
             .where(SQLPlannerPlan.id == plan_id)
             .values(
                 deleted=True,
                 updated_at=datetime.now(timezone.utc)
             )
+            .returning(SQLPlannerPlan.user_id)
         )
+        for user_id in result.scalars():
+            mark_changed(self.session.sync_session, user_id, "plan")
         await self.session.flush()
     
     async def exists_by_request_id(
@@ -14,6 +14,8 @@ from app.db.session import engine
 from app.middleware.request_context import RequestContextMiddleware
 from app.db.schema_check import ensure_schema_up_to_date
 from app.middleware.idempotency_snapshot import IdempotencySnapshotMiddleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
 from app.infra.redis_client import get_redis
 
 configure_logging()
@@ -107,6 +109,17 @@ app.add_middleware(CORSMiddleware, **cors_kwargs)
 # Adds request_id + timezone context, returns request_id in all responses
 app.add_middleware(RequestContextMiddleware)
 app.add_middleware(IdempotencySnapshotMiddleware)
+# Counts the SQL each request sends, including the idempotency middleware's
+if settings.DB_QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+# Outermost: floods are rejected before any other middleware does work
+if settings.API_RL_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limit=settings.API_RL_LIMIT,
+        window_seconds=settings.API_RL_WINDOW_SECONDS,
+        path_prefix=settings.API_V1_PREFIX,
+    )
 
 
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
@@ -173,4 +186,5 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     }
     # hard-enforce request_id
     payload.setdefault("request_id", request_id)
-    return JSONResponse(status_code=exc.status_code, content=payload, headers={"X-Request-Id": request_id})
\ No newline at end of file
+    # keep headers the route set on the exception (e.g. Retry-After on 429)
+    return JSONResponse(status_code=exc.status_code, content=payload, headers={**(exc.headers or {}), "X-Request-Id": request_id})
\ No newline at end of file
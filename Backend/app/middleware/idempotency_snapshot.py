@@ -1,90 +1,205 @@
 from __future__ import annotations
 
-import json
-from typing import Any
+import asyncio
+import time
 
 from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.response import err
-from app.db.session import async_session_maker
-from app.repositories import idempotency_repo
+from app.core.security import access_token_uid
+from app.services.idempotency_store import (
+    IdempotencyContext,
+    IdempotencyScope,
+    IdempotencySnapshot,
+    get_idempotency_store,
+)
 
 
 _MUTATING = {"POST", "PATCH", "DELETE"}
 
 
-class IdempotencySnapshotMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method not in _MUTATING:
-            return await call_next(request)
+def _user_id(request: Request) -> str | None:
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
 
+    # auth dependencies run after middlewares: identify the caller from the access token
+    return access_token_uid(request.headers.get("Authorization"))
+
+
+def _replay(request: Request, snapshot: IdempotencySnapshot) -> Response:
+    headers = dict(snapshot.headers)
+    headers["X-Request-Id"] = request.headers.get("X-Request-Id", headers.get("X-Request-Id", ""))
+    if "X-Idempotency-Key" in request.headers:
+        headers["X-Idempotency-Key"] = request.headers["X-Idempotency-Key"]
+    if "X-Timezone" in request.headers:
+        headers["X-Timezone"] = request.headers["X-Timezone"]
+    return Response(
+        content=snapshot.body,
+        status_code=snapshot.status_code,
+        headers=headers,
+        media_type=snapshot.media_type,
+    )
+
+
+class IdempotencySnapshotMiddleware:
+    """Replays stored responses for repeated mutating requests.
+
+    A duplicate that arrives while the first request is still running waits for
+    its snapshot instead of executing the handler again: in-process through a
+    shared future, across processes by polling the store.
+
+    Plain ASGI: response messages are forwarded as they are produced and their
+    body chunks are teed into a list that is joined once at the end.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._inflight: dict[IdempotencyScope, asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _MUTATING:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        # RequestContextMiddleware runs inside this one; err() needs the id for early responses
+        request.state.request_id = request.headers.get("X-Request-Id")
         # key source: prefer X-Idempotency-Key, fallback X-Request-Id
         key = request.headers.get("X-Idempotency-Key") or request.headers.get("X-Request-Id")
         if not key:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content=err(request, "missing_request_id", "X-Request-Id or X-Idempotency-Key is required"),
             )
+            await response(scope, receive, send)
+            return
 
-        # user_id needed: we only do snapshot AFTER auth runs for protected routes.
-        # For public auth routes you can still snapshot by user_id=None, but requirement is for Tasks.
-        user_id = getattr(request.state, "user_id", None)
+        user_id = _user_id(request)
         if user_id is None:
             # If endpoint is public, just pass through (Auth endpoints can have their own strategy).
-            return await call_next(request)
-
-        method = request.method
-        path = request.url.path
-
-        async with async_session_maker() as db:
-            existing = await idempotency_repo.get(db, user_id=user_id, key=key, method=method, path=path)
-            if existing and existing.status_code is not None and existing.response_body is not None:
-                headers = dict(existing.response_headers or {})
-                headers.setdefault("X-Request-Id", request.headers.get("X-Request-Id", ""))
-                headers.setdefault("X-Idempotency-Key", request.headers.get("X-Idempotency-Key", ""))
-                return JSONResponse(status_code=existing.status_code, content=existing.response_body, headers=headers)
-
-            # claim (insert stub)
-            claimed = await idempotency_repo.claim(db, user_id=user_id, key=key, method=method, path=path)
-            # If duplicate but no snapshot yet -> allow one in-flight request to finish.
-            # For MVP: we don't block; second request will run and store same snapshot.
-            await db.commit()
-
-        # execute handler
-        response = await call_next(request)
-
-        # capture JSON response bodies only (project responses are JSON via ok/err)
-        body_bytes = b""
-        async for chunk in response.body_iterator:
-            body_bytes += chunk
-
-        # re-create response because body_iterator is consumed
+            await self.app(scope, receive, send)
+            return
+
+        idem_scope = IdempotencyScope(user_id=user_id, key=key, method=request.method, path=request.url.path)
+
+        while (pending := self._inflight.get(idem_scope)) is not None:
+            snapshot = await self._await_local(pending)
+            if snapshot is not None:
+                await _replay(request, snapshot)(scope, receive, send)
+                return
+            if not pending.done():
+                await _in_flight(request)(scope, receive, send)
+                return
+            # the first request ended without a snapshot: the first duplicate to wake claims the key
+
+        # registered before the first await, so same-process duplicates always find it
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[idem_scope] = future
+        snapshot = None
+        try:
+            snapshot = await self._claim_and_run(request, idem_scope, scope, receive, send)
+        finally:
+            self._inflight.pop(idem_scope, None)
+            if not future.done():
+                future.set_result(snapshot)
+
+    async def _claim_and_run(
+        self, request: Request, idem_scope: IdempotencyScope, scope: Scope, receive: Receive, send: Send
+    ) -> IdempotencySnapshot | None:
+        store = get_idempotency_store()
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        delay = 0.02
+        while True:
+            claim = await store.claim_or_fetch(idem_scope)
+            if claim.snapshot is not None:
+                await _replay(request, claim.snapshot)(scope, receive, send)
+                return claim.snapshot
+            if claim.claimed:
+                break
+            # another process is running the same request: poll until it stores a snapshot
+            # (or gives the key up, in which case this request claims it on the next round)
+            if time.monotonic() >= deadline:
+                await _in_flight(request)(scope, receive, send)
+                return None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+        # enforce_idempotency sees the claim and skips its own insert unless the store needs the row
+        request.state.idempotency = IdempotencyContext(scope=idem_scope, record_in_db=claim.record_in_db)
+        capture = _ResponseCapture(send, limit=settings.IDEMPOTENCY_SNAPSHOT_MAX_BYTES)
+        snapshot: IdempotencySnapshot | None = None
         try:
-            body_obj: Any = json.loads(body_bytes.decode("utf-8")) if body_bytes else {}
-        except Exception:
-            body_obj = {}
-
-        new_headers = dict(response.headers)
-        # keep request_id echo
-        if "X-Request-Id" in request.headers:
-            new_headers["X-Request-Id"] = request.headers["X-Request-Id"]
-
-        async with async_session_maker() as db:
-            await idempotency_repo.store_response(
-                db,
-                user_id=user_id,
-                key=key,
-                method=method,
-                path=path,
-                status_code=response.status_code,
-                response_body=body_obj if isinstance(body_obj, dict) else {"data": body_obj},
-                response_headers={
+            await self.app(scope, receive, capture.send)
+
+            # server errors are not snapshotted: a retry should run the handler again. Neither is the
+            # 409 of a duplicate that lost the idempotency_keys insert: the key belongs to the winner
+            if (
+                capture.status_code is not None
+                and capture.status_code < 500
+                and not capture.overflow
+                and not getattr(request.state, "idempotency_duplicate", False)
+            ):
+                snapshot = IdempotencySnapshot(
+                    status_code=capture.status_code,
+                    body=capture.body().decode("utf-8", errors="replace"),
                     # store only safe headers needed for clients (extend if needed)
-                    "X-Request-Id": new_headers.get("X-Request-Id", ""),
-                },
-            )
-            await db.commit()
-
-        return Response(content=body_bytes, status_code=response.status_code, headers=new_headers, media_type=response.media_type)
+                    headers={"X-Request-Id": request.headers.get("X-Request-Id", "")},
+                    media_type=capture.content_type,
+                )
+                await store.store(idem_scope, snapshot, token=claim.token)
+            else:
+                await store.release(idem_scope, token=claim.token)
+        except BaseException:
+            await store.release(idem_scope, token=claim.token)
+            raise
+        return snapshot
+
+    async def _await_local(self, pending: asyncio.Future) -> IdempotencySnapshot | None:
+        try:
+            return await asyncio.wait_for(asyncio.shield(pending), timeout=settings.IDEMPOTENCY_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+
+class _ResponseCapture:
+    """Forwards response messages unchanged while keeping the status and body chunks."""
+
+    def __init__(self, send: Send, *, limit: int) -> None:
+        self._send = send
+        self._limit = limit
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self.status_code: int | None = None
+        self.content_type: str | None = None
+        self.overflow = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.status_code = message["status"]
+            self.content_type = Headers(raw=message.get("headers", [])).get("content-type")
+        elif message["type"] == "http.response.body" and not self.overflow:
+            chunk = message.get("body", b"")
+            self._size += len(chunk)
+            if self._size > self._limit:
+                # too large to snapshot: stop buffering, the response still streams through
+                self.overflow = True
+                self._chunks.clear()
+            elif chunk:
+                self._chunks.append(chunk)
+        await self._send(message)
+
+    def body(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def _in_flight(request: Request) -> Response:
+    return JSONResponse(
+        status_code=409,
+        content=err(request, "idempotency_in_flight", "A request with this idempotency key is still being processed"),
+        headers={"X-Request-Id": request.headers.get("X-Request-Id", "")},
+    )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db import query_stats
+from app.services.observability import record_request_db_metric
+
+
+class QueryStatsMiddleware:
+    """Collects the SQL statements, rows and DB time of each request.
+
+    Totals are reported with ``record_request_db_metric`` once the response is
+    sent, tagged with the request id and the matched route template. Placed
+    outside the idempotency middleware so its queries are counted too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: int | None = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = query_stats.begin(request_id=Headers(scope=scope).get("X-Request-Id"), scope=scope)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            stats = query_stats.end(token)
+            if stats is not None and stats.statements:
+                record_request_db_metric(
+                    request_id=stats.request_id,
+                    route=stats.route,
+                    method=scope["method"],
+                    status_code=status_code,
+                    statements=stats.statements,
+                    rows=stats.rows,
+                    db_ms=round(stats.db_ms, 3),
+                    max_repeats=stats.max_repeats,
+                )
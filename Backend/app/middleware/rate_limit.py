@@ -1,49 +1,191 @@
 from __future__ import annotations
 
+import math
 import time
-from typing import Callable
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterable
 
 from fastapi import Depends, HTTPException, Request
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.logging import log
 from app.core.response import err
+from app.core.security import access_token_uid
 from app.infra.redis_client import get_redis
 
 
+# Token bucket refilled continuously at limit/window, i.e. a smoothed sliding
+# window. Decides and updates in one round-trip using the Redis server clock.
+_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after_ms = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) + 1000)
+return {allowed, retry_after_ms}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after_seconds: int = 0
+    source: str = "redis"
+
+
+class _LocalBuckets:
+    """Per-process token buckets with the same limits as the shared ones.
+
+    A key that exhausts its bucket in this process alone has certainly exhausted
+    it globally, so such requests can be rejected without asking Redis.
+    """
+
+    def __init__(self, *, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, *, capacity: int, rate_per_s: float) -> float:
+        """Consume a token; returns 0 when allowed, otherwise seconds until one is available."""
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (float(capacity), now))
+        tokens = min(float(capacity), tokens + (now - ts) * rate_per_s)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate_per_s
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class RateLimiter:
+    def __init__(self, *, limit: int, window_seconds: int) -> None:
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.stats = {"allowed": 0, "rejected_local": 0, "rejected_redis": 0}
+        self._script = None
+
+    async def hit(self, key: str) -> RateLimitDecision:
+        rate_per_s = self.limit / self.window_seconds
+        wait = _local.take(key, capacity=self.limit, rate_per_s=rate_per_s)
+        if wait:
+            self.stats["rejected_local"] += 1
+            return RateLimitDecision(allowed=False, retry_after_seconds=math.ceil(wait), source="local")
+
+        if settings.REDIS_URL:
+            try:
+                if self._script is None:
+                    self._script = get_redis().register_script(_TOKEN_BUCKET)
+                allowed, retry_after_ms = await self._script(keys=[key], args=[self.limit, rate_per_s / 1000])
+            except RedisError as exc:
+                # fail open to the local decision; the process-local bucket still bounds floods
+                log.warning("rate_limit_redis_unavailable", error=str(exc))
+            else:
+                if not int(allowed):
+                    self.stats["rejected_redis"] += 1
+                    return RateLimitDecision(allowed=False, retry_after_seconds=math.ceil(int(retry_after_ms) / 1000))
+
+        self.stats["allowed"] += 1
+        return RateLimitDecision(allowed=True, source="redis" if settings.REDIS_URL else "local")
+
+
+_local = _LocalBuckets(max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
 def _client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def _rl_key(prefix: str, request: Request) -> str:
-    # Optional: include endpoint-specific salt and ip
-    return f"rl:{prefix}:{_client_ip(request)}"
+def _rl_key(prefix: str, request: Request, key_by: Iterable[str] = ("ip",)) -> str:
+    parts = [f"rl:{prefix}"]
+    for part in key_by:
+        if part == "ip":
+            parts.append(_client_ip(request))
+        elif part == "user":
+            user_id = getattr(request.state, "user_id", None) or access_token_uid(request.headers.get("Authorization"))
+            # anonymous callers share the limit of their IP
+            parts.append(f"u:{user_id}" if user_id else f"ip:{_client_ip(request)}")
+        elif part == "route":
+            parts.append(f"{request.method}:{request.url.path}")
+    return ":".join(parts)
 
 
-def redis_rate_limit(*, key_prefix: str, limit: int, window_seconds: int) -> Callable:
-    async def _dep(request: Request):
-        redis = get_redis()
-        key = _rl_key(key_prefix, request)
+def _rate_limited(request: Request, decision: RateLimitDecision) -> dict:
+    return err(
+        request,
+        "rate_limited",
+        "Too many requests",
+        details={"retry_after_seconds": max(0, decision.retry_after_seconds)},
+    )
+
 
-        # INCR + EXPIRE (atomic enough for MVP; for strict atomicity use LUA, but this is standard pattern)
-        cnt = await redis.incr(key)
-        if cnt == 1:
-            await redis.expire(key, window_seconds)
+def redis_rate_limit(
+    *, key_prefix: str, limit: int, window_seconds: int, key_by: Iterable[str] = ("ip",)
+) -> Callable:
+    limiter = RateLimiter(limit=limit, window_seconds=window_seconds)
+    key_by = tuple(key_by)
 
-        if cnt > limit:
-            ttl = await redis.ttl(key)
+    async def _dep(request: Request):
+        decision = await limiter.hit(_rl_key(key_prefix, request, key_by))
+        if not decision.allowed:
             raise HTTPException(
                 status_code=429,
-                detail=err(
-                    request,
-                    "rate_limited",
-                    "Too many requests",
-                    details={"retry_after_seconds": max(0, int(ttl if ttl is not None else window_seconds))},
-                ),
+                detail=_rate_limited(request, decision),
+                headers={"Retry-After": str(decision.retry_after_seconds)},
             )
 
     return Depends(_dep)
 
 
+class RateLimitMiddleware:
+    """API-wide limit per user (or per IP for anonymous callers) in front of every route."""
+
+    def __init__(self, app: ASGIApp, *, limit: int, window_seconds: int, path_prefix: str = "") -> None:
+        self.app = app
+        self.path_prefix = path_prefix
+        self.limiter = RateLimiter(limit=limit, window_seconds=window_seconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        decision = await self.limiter.hit(_rl_key("api", request, ("user",)))
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request.headers.get("X-Request-Id")
+        request.state.request_id = request_id
+        response = JSONResponse(
+            status_code=429,
+            content=_rate_limited(request, decision),
+            headers={"X-Request-Id": request_id or "", "Retry-After": str(decision.retry_after_seconds)},
+        )
+        await response(scope, receive, send)
+
+
 signup_rate_limit = redis_rate_limit(
     key_prefix="auth:signup",
     limit=settings.AUTH_RL_SIGNUP_LIMIT,
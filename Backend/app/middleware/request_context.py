@@ -3,13 +3,14 @@ from __future__ import annotations
 from zoneinfo import ZoneInfo
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.response import err
 
 
-class RequestContextMiddleware(BaseHTTPMiddleware):
+class RequestContextMiddleware:
     """
     Injects:
       - request.state.request_id
@@ -19,37 +20,59 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
       - X-Request-Id is REQUIRED (no server-side generation)
       - X-Timezone is REQUIRED and must be valid IANA
       - Both headers are echoed back in every response
+
+    Plain ASGI: headers are added to the ``http.response.start`` message, the
+    body is passed through untouched.
     """
 
-    async def dispatch(self, request: Request, call_next):
-        req_id = request.headers.get("X-Request-Id")
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request = Request(scope)
+        req_id = headers.get("X-Request-Id")
+        request.state.request_id = req_id
         if not req_id:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content=err(request, "missing_request_id", "X-Request-Id header is required"),
             )
+            await response(scope, receive, send)
+            return
 
-        tz = request.headers.get("X-Timezone")
+        tz = headers.get("X-Timezone")
         if not tz:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content=err(request, "invalid_timezone", "X-Timezone header is required"),
                 headers={"X-Request-Id": req_id},
             )
+            await response(scope, receive, send)
+            return
 
         try:
             ZoneInfo(tz)
         except Exception:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=400,
                 content=err(request, "invalid_timezone", "Invalid X-Timezone header"),
                 headers={"X-Request-Id": req_id},
             )
+            await response(scope, receive, send)
+            return
 
-        request.state.request_id = req_id
         request.state.client_timezone = tz
 
-        response: Response = await call_next(request)
-        response.headers["X-Request-Id"] = req_id
-        response.headers["X-Timezone"] = tz
-        return response
+        async def send_with_context(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-Id"] = req_id
+                response_headers["X-Timezone"] = tz
+            await send(message)
+
+        await self.app(scope, receive, send_with_context)
@@ -9,7 +9,9 @@ from app.models.idempotency import IdempotencyKey  # noqa: F401
 from app.models.goal import Goal  # noqa: F401
 from app.models.calendar_event import CalendarEvent  # noqa: F401
 from app.models.inbox_item import InboxItem  # noqa: F401
-from app.models.finance import FinanceAccount, FinanceTransaction, Budget  # noqa: F401
+from app.models.finance import FinanceAccount, FinanceTransaction, Budget, FinanceMonthlyRollup  # noqa: F401
 from app.models.notification import NotificationTrigger, DigestSchedule  # noqa: F401
 from app.models.subscription_state import SubscriptionState  # noqa: F401
 from app.models.sync_operation import SyncOperation  # noqa: F401
+from app.models.analytics_event import AnalyticsOutboxEvent  # noqa: F401
+from app.models.tombstone import SyncHorizon, TombstoneArchive  # noqa: F401
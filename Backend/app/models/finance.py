@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Numeric, String, Text
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, Numeric, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -32,21 +32,37 @@ class FinanceAccount(Base):
 class FinanceTransaction(Base):
     __tablename__ = "finance_transactions"
 
+    __table_args__ = (
+        Index(
+            "ix_finance_transactions_user_live_occurred",
+            "user_id", "occurred_at", "id",
+            postgresql_where=text("deleted = false"),
+            sqlite_where=text("deleted = 0"),
+        ),
+        Index(
+            "ix_finance_transactions_tombstones_updated",
+            "updated_at",
+            postgresql_where=text("deleted = true"),
+            sqlite_where=text("deleted = 1"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     account_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("finance_accounts.id"), nullable=False)
 
-    type: Mapped[str] = mapped_column(String(16), nullable=False)
-    amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    # active_history: the previous values are needed to move amounts between monthly rollups
+    type: Mapped[str] = mapped_column(String(16), nullable=False, active_history=True)
+    amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, active_history=True)
     currency: Mapped[str] = mapped_column(String(3), nullable=False)
-    category: Mapped[str] = mapped_column(String(120), nullable=False)
-    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    category: Mapped[str] = mapped_column(String(120), nullable=False, active_history=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, active_history=True)
     recurring: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
-    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, active_history=True)
 
 
 class Budget(Base):
@@ -60,3 +76,22 @@ class Budget(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+
+class FinanceMonthlyRollup(Base):
+    """Live transaction totals per user, UTC month, type and category.
+
+    Maintained in the same flush as the transaction writes by
+    ``app.services.finance_rollups``.
+    """
+
+    __tablename__ = "finance_monthly_rollups"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    type: Mapped[str] = mapped_column(String(16), primary_key=True)
+    category: Mapped[str] = mapped_column(String(120), primary_key=True)
+
+    amount: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    tx_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime, timezone
 
-from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -17,6 +17,21 @@ def _utcnow() -> datetime:
 class Goal(Base):
     __tablename__ = "goals"
 
+    __table_args__ = (
+        Index(
+            "ix_goals_user_live_created",
+            "user_id", "created_at", "id",
+            postgresql_where=text("deleted = false"),
+            sqlite_where=text("deleted = 0"),
+        ),
+        Index(
+            "ix_goals_tombstones_updated",
+            "updated_at",
+            postgresql_where=text("deleted = true"),
+            sqlite_where=text("deleted = 1"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
 
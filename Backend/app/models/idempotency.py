@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.config import settings
 from app.db.base import Base
 
 
+def _default_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+
+
 class IdempotencyKey(Base):
     __tablename__ = "idempotency_keys"
 
@@ -29,3 +34,4 @@ class IdempotencyKey(Base):
     response_headers: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_default_expiry, index=True)
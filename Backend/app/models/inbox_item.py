@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -17,6 +17,15 @@ def _utcnow() -> datetime:
 class InboxItem(Base):
     __tablename__ = "inbox_items"
 
+    __table_args__ = (
+        Index(
+            "ix_inbox_items_tombstones_updated",
+            "updated_at",
+            postgresql_where=text("deleted = true"),
+            sqlite_where=text("deleted = 1"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
 
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -17,6 +17,17 @@ def _utcnow() -> datetime:
 class NotificationTrigger(Base):
     __tablename__ = "notification_triggers"
 
+    __table_args__ = (
+        Index("ix_notification_triggers_entity", "user_id", "entity", "entity_id", "updated_at", "id"),
+        # the reminder dispatcher's claim scan: only unsent triggers, oldest first
+        Index(
+            "ix_notification_triggers_due",
+            "remind_at",
+            postgresql_where=text("sent = false"),
+            sqlite_where=text("sent = 0"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
 
@@ -26,6 +37,8 @@ class NotificationTrigger(Base):
     remind_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     channel: Mapped[str] = mapped_column(String(16), nullable=False, default="push")
     sent: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # lease held by the reminder dispatcher that has this trigger on its timer wheel
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -13,6 +13,21 @@ from app.db.base import Base
 class Subtask(Base):
     __tablename__ = "subtasks"
 
+    __table_args__ = (
+        Index(
+            "ix_subtasks_task_live_updated",
+            "task_id", "user_id", "updated_at", "id",
+            postgresql_where=text("deleted = false"),
+            sqlite_where=text("deleted = 0"),
+        ),
+        Index(
+            "ix_subtasks_tombstones_updated",
+            "updated_at",
+            postgresql_where=text("deleted = true"),
+            sqlite_where=text("deleted = 1"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -13,19 +13,41 @@ from app.db.base import Base
 class Task(Base):
     __tablename__ = "tasks"
 
+    __table_args__ = (
+        Index(
+            "ix_tasks_user_live_updated",
+            "user_id", "updated_at", "id",
+            postgresql_where=text("deleted = false"),
+            sqlite_where=text("deleted = 0"),
+        ),
+        Index(
+            "ix_tasks_user_live_due",
+            "user_id", "due_at",
+            postgresql_where=text("deleted = false"),
+            sqlite_where=text("deleted = 0"),
+        ),
+        Index(
+            "ix_tasks_tombstones_updated",
+            "updated_at",
+            postgresql_where=text("deleted = true"),
+            sqlite_where=text("deleted = 1"),
+        ),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
 
     title: Mapped[str] = mapped_column(String(300), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
-    status: Mapped[str] = mapped_column(String(32), nullable=False, default="todo")
+    # active_history: the previous values are needed to move tasks between goal counters
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="todo", active_history=True)
     priority: Mapped[int | None] = mapped_column(Integer, nullable=True)
     estimated_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
     energy_level: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
-    goal_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True, index=True)
+    goal_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True, index=True, active_history=True)
     due_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
-    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, active_history=True)
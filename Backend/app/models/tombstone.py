@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, DateTime, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TombstoneArchive(Base):
+    """Soft-deleted rows moved out of the hot tables by ``archive_tombstones``.
+
+    One row per archived source row (children such as subtasks or planner slots
+    included), keyed by the source table and the row's id; ``payload`` keeps the
+    full row as it was.
+    """
+
+    __tablename__ = "tombstone_archive"
+
+    source_table: Mapped[str] = mapped_column(String(64), primary_key=True)
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+
+class SyncHorizon(Base):
+    """Oldest ``updated_from`` per sync entity that still yields complete deltas.
+
+    Tombstones last updated before ``horizon`` may already be archived, so a
+    client syncing from an earlier point has to resync from scratch.
+    """
+
+    __tablename__ = "sync_horizons"
+
+    entity: Mapped[str] = mapped_column(String(32), primary_key=True)
+    horizon: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=_utcnow)
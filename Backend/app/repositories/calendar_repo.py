@@ -1,12 +1,26 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
+from app.core.config import settings
 from app.models.calendar_event import CalendarEvent
+from app.repositories import keyset
+from app.services.response_cache import mark_changed
+
+
+def _live(*, user_id: uuid.UUID, updated_from: datetime | None) -> StatementLambdaElement:
+    stmt = lambda_stmt(
+        lambda: select(CalendarEvent).where(CalendarEvent.user_id == user_id, CalendarEvent.deleted == False)  # noqa: E712
+    )
+    if updated_from:
+        stmt += lambda s: s.where(CalendarEvent.updated_at >= updated_from)
+    return stmt
 
 
 async def list(
@@ -19,39 +33,46 @@ async def list(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[CalendarEvent], str | None]:
-    q = select(CalendarEvent).where(CalendarEvent.user_id == user_id, CalendarEvent.deleted == False)  # noqa: E712
-    if updated_from:
-        q = q.where(CalendarEvent.updated_at >= updated_from)
+    stmt = _live(user_id=user_id, updated_from=updated_from)
     if start_from:
-        q = q.where(CalendarEvent.start_at >= start_from)
+        stmt += lambda s: s.where(CalendarEvent.start_at >= start_from)
     if start_to:
-        q = q.where(CalendarEvent.start_at <= start_to)
+        stmt += lambda s: s.where(CalendarEvent.start_at <= start_to)
 
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((CalendarEvent.updated_at, CalendarEvent.id) < (ts, cid))
-        except Exception:
-            pass
+    return await keyset.fetch_page(db, stmt, CalendarEvent.updated_at, CalendarEvent.id, cursor=cursor, limit=limit)
 
-    q = q.order_by(CalendarEvent.updated_at.desc(), CalendarEvent.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
 
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
+async def list_by_start(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[CalendarEvent], str | None]:
+    stmt = _live(user_id=user_id, updated_from=updated_from)
+    return await keyset.fetch_page(db, stmt, CalendarEvent.start_at, CalendarEvent.id, cursor=cursor, limit=limit)
+
 
-    return rows, next_cursor
+async def stream_by_start(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+) -> AsyncIterator[CalendarEvent]:
+    stmt = keyset.ordered(_live(user_id=user_id, updated_from=updated_from), CalendarEvent.start_at, CalendarEvent.id)
+    rows = await db.stream_scalars(stmt, execution_options={"yield_per": settings.LIST_STREAM_CHUNK_SIZE})
+    async for row in rows:
+        yield row
 
 
 async def get_by_id(db: AsyncSession, *, user_id: uuid.UUID, event_id: uuid.UUID) -> CalendarEvent | None:
     res = await db.execute(
-        select(CalendarEvent).where(CalendarEvent.id == event_id, CalendarEvent.user_id == user_id, CalendarEvent.deleted == False)  # noqa: E712
+        lambda_stmt(
+            lambda: select(CalendarEvent).where(
+                CalendarEvent.id == event_id, CalendarEvent.user_id == user_id, CalendarEvent.deleted == False  # noqa: E712
+            )
+        )
     )
     return res.scalar_one_or_none()
 
@@ -62,5 +83,7 @@ async def create(db: AsyncSession, event: CalendarEvent) -> CalendarEvent:
     return event
 
 
-async def patch(db: AsyncSession, *, event_id: uuid.UUID, values: dict) -> None:
-    await db.execute(update(CalendarEvent).where(CalendarEvent.id == event_id).values(**values))
+async def patch(db: AsyncSession, *, event_id: uuid.UUID, user_id: uuid.UUID, values: dict) -> None:
+    await db.execute(update(CalendarEvent).where(CalendarEvent.id == event_id, CalendarEvent.user_id == user_id).values(**values))
+    # Core UPDATEs bypass the flush that moves the list version
+    mark_changed(db.sync_session, user_id, "event")
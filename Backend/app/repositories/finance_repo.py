@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
+from app.core.config import settings
 from app.models.finance import Budget, FinanceAccount, FinanceTransaction
+from app.repositories import keyset
+from app.services.response_cache import mark_changed
 
 
 async def list_accounts(
@@ -17,30 +22,24 @@ async def list_accounts(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[FinanceAccount], str | None]:
-    q = select(FinanceAccount).where(FinanceAccount.user_id == user_id, FinanceAccount.deleted == False)  # noqa: E712
+    stmt = lambda_stmt(
+        lambda: select(FinanceAccount).where(FinanceAccount.user_id == user_id, FinanceAccount.deleted == False)  # noqa: E712
+    )
     if updated_from:
-        q = q.where(FinanceAccount.updated_at >= updated_from)
+        stmt += lambda s: s.where(FinanceAccount.updated_at >= updated_from)
 
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((FinanceAccount.updated_at, FinanceAccount.id) < (ts, cid))
-        except Exception:
-            pass
+    return await keyset.fetch_page(db, stmt, FinanceAccount.updated_at, FinanceAccount.id, cursor=cursor, limit=limit)
 
-    q = q.order_by(FinanceAccount.updated_at.desc(), FinanceAccount.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
 
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
-
-    return rows, next_cursor
+def _live_transactions(*, user_id: uuid.UUID, updated_from: datetime | None) -> StatementLambdaElement:
+    stmt = lambda_stmt(
+        lambda: select(FinanceTransaction).where(
+            FinanceTransaction.user_id == user_id, FinanceTransaction.deleted == False  # noqa: E712
+        )
+    )
+    if updated_from:
+        stmt += lambda s: s.where(FinanceTransaction.updated_at >= updated_from)
+    return stmt
 
 
 async def list_transactions(
@@ -52,40 +51,51 @@ async def list_transactions(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[FinanceTransaction], str | None]:
-    q = select(FinanceTransaction).where(FinanceTransaction.user_id == user_id, FinanceTransaction.deleted == False)  # noqa: E712
+    stmt = _live_transactions(user_id=user_id, updated_from=updated_from)
     if account_id:
-        q = q.where(FinanceTransaction.account_id == account_id)
-    if updated_from:
-        q = q.where(FinanceTransaction.updated_at >= updated_from)
+        stmt += lambda s: s.where(FinanceTransaction.account_id == account_id)
 
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((FinanceTransaction.updated_at, FinanceTransaction.id) < (ts, cid))
-        except Exception:
-            pass
+    return await keyset.fetch_page(
+        db, stmt, FinanceTransaction.updated_at, FinanceTransaction.id, cursor=cursor, limit=limit
+    )
 
-    q = q.order_by(FinanceTransaction.updated_at.desc(), FinanceTransaction.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
 
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
+async def list_transactions_by_occurred(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[FinanceTransaction], str | None]:
+    stmt = _live_transactions(user_id=user_id, updated_from=updated_from)
+    return await keyset.fetch_page(
+        db, stmt, FinanceTransaction.occurred_at, FinanceTransaction.id, cursor=cursor, limit=limit
+    )
 
-    return rows, next_cursor
+
+async def stream_transactions_by_occurred(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+) -> AsyncIterator[FinanceTransaction]:
+    stmt = keyset.ordered(
+        _live_transactions(user_id=user_id, updated_from=updated_from), FinanceTransaction.occurred_at, FinanceTransaction.id
+    )
+    rows = await db.stream_scalars(stmt, execution_options={"yield_per": settings.LIST_STREAM_CHUNK_SIZE})
+    async for row in rows:
+        yield row
 
 
 async def patch_account(db: AsyncSession, *, account_id: uuid.UUID, values: dict) -> None:
     await db.execute(update(FinanceAccount).where(FinanceAccount.id == account_id).values(**values))
 
 
-async def patch_transaction(db: AsyncSession, *, tx_id: uuid.UUID, values: dict) -> None:
-    await db.execute(update(FinanceTransaction).where(FinanceTransaction.id == tx_id).values(**values))
+async def patch_transaction(db: AsyncSession, *, tx_id: uuid.UUID, user_id: uuid.UUID, values: dict) -> None:
+    await db.execute(update(FinanceTransaction).where(FinanceTransaction.id == tx_id, FinanceTransaction.user_id == user_id).values(**values))
+    # Core UPDATEs bypass the flush that moves the list version
+    mark_changed(db.sync_session, user_id, "finance")
 
 
 async def patch_budget(db: AsyncSession, *, budget_id: uuid.UUID, values: dict) -> None:
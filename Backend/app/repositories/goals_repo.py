@@ -1,12 +1,24 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncIterator
 from datetime import datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
+from app.core.config import settings
 from app.models.goal import Goal
+from app.repositories import keyset
+from app.services.response_cache import mark_changed
+
+
+def _live(*, user_id: uuid.UUID, updated_from: datetime | None) -> StatementLambdaElement:
+    stmt = lambda_stmt(lambda: select(Goal).where(Goal.user_id == user_id, Goal.deleted == False))  # noqa: E712
+    if updated_from:
+        stmt += lambda s: s.where(Goal.updated_at >= updated_from)
+    return stmt
 
 
 async def list(
@@ -17,34 +29,38 @@ async def list(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[Goal], str | None]:
-    q = select(Goal).where(Goal.user_id == user_id, Goal.deleted == False)  # noqa: E712
-    if updated_from:
-        q = q.where(Goal.updated_at >= updated_from)
+    stmt = _live(user_id=user_id, updated_from=updated_from)
+    return await keyset.fetch_page(db, stmt, Goal.updated_at, Goal.id, cursor=cursor, limit=limit)
 
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((Goal.updated_at, Goal.id) < (ts, cid))
-        except Exception:
-            pass
 
-    q = q.order_by(Goal.updated_at.desc(), Goal.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
+async def list_by_created(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[Goal], str | None]:
+    stmt = _live(user_id=user_id, updated_from=updated_from)
+    return await keyset.fetch_page(db, stmt, Goal.created_at, Goal.id, cursor=cursor, limit=limit)
 
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
 
-    return rows, next_cursor
+async def stream_by_created(
+    db: AsyncSession,
+    *,
+    user_id: uuid.UUID,
+    updated_from: datetime | None,
+) -> AsyncIterator[Goal]:
+    stmt = keyset.ordered(_live(user_id=user_id, updated_from=updated_from), Goal.created_at, Goal.id)
+    rows = await db.stream_scalars(stmt, execution_options={"yield_per": settings.LIST_STREAM_CHUNK_SIZE})
+    async for row in rows:
+        yield row
 
 
 async def get_by_id(db: AsyncSession, *, user_id: uuid.UUID, goal_id: uuid.UUID) -> Goal | None:
-    res = await db.execute(select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id, Goal.deleted == False))  # noqa: E712
+    res = await db.execute(
+        lambda_stmt(lambda: select(Goal).where(Goal.id == goal_id, Goal.user_id == user_id, Goal.deleted == False))  # noqa: E712
+    )
     return res.scalar_one_or_none()
 
 
@@ -54,5 +70,7 @@ async def create(db: AsyncSession, goal: Goal) -> Goal:
     return goal
 
 
-async def patch(db: AsyncSession, *, goal_id: uuid.UUID, values: dict) -> None:
-    await db.execute(update(Goal).where(Goal.id == goal_id).values(**values))
+async def patch(db: AsyncSession, *, goal_id: uuid.UUID, user_id: uuid.UUID, values: dict) -> None:
+    await db.execute(update(Goal).where(Goal.id == goal_id, Goal.user_id == user_id).values(**values))
+    # Core UPDATEs bypass the flush that moves the list version
+    mark_changed(db.sync_session, user_id, "goal")
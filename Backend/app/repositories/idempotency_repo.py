@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
 from sqlalchemy import select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,6 +23,7 @@ async def get(
             IdempotencyKey.key == key,
             IdempotencyKey.method == method,
             IdempotencyKey.path == path,
+            IdempotencyKey.expires_at > datetime.now(timezone.utc),
         )
     )
     return res.scalar_one_or_none()
@@ -67,6 +70,8 @@ async def store_response(
             IdempotencyKey.key == key,
             IdempotencyKey.method == method,
             IdempotencyKey.path == path,
+            # first answer wins: a late duplicate never replaces a stored snapshot
+            IdempotencyKey.status_code.is_(None),
         )
         .values(
             status_code=status_code,
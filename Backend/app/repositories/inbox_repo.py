@@ -3,10 +3,11 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.inbox_item import InboxItem
+from app.repositories import keyset
 
 
 async def list(
@@ -17,30 +18,13 @@ async def list(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[InboxItem], str | None]:
-    q = select(InboxItem).where(InboxItem.user_id == user_id, InboxItem.deleted == False)  # noqa: E712
+    stmt = lambda_stmt(
+        lambda: select(InboxItem).where(InboxItem.user_id == user_id, InboxItem.deleted == False)  # noqa: E712
+    )
     if updated_from:
-        q = q.where(InboxItem.updated_at >= updated_from)
-
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((InboxItem.updated_at, InboxItem.id) < (ts, cid))
-        except Exception:
-            pass
-
-    q = q.order_by(InboxItem.updated_at.desc(), InboxItem.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
-
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
-
-    return rows, next_cursor
+        stmt += lambda s: s.where(InboxItem.updated_at >= updated_from)
+
+    return await keyset.fetch_page(db, stmt, InboxItem.updated_at, InboxItem.id, cursor=cursor, limit=limit)
 
 
 async def get_by_id(db: AsyncSession, *, user_id: uuid.UUID, item_id: uuid.UUID) -> InboxItem | None:
@@ -0,0 +1,87 @@
+"""Shared statement building for the repositories' keyset-paginated lists.
+
+Statements are built with ``lambda_stmt`` so SQLAlchemy caches them by the code
+location of each lambda: a repeat call skips constructing the ``select()`` and
+computing its cache key, and only extracts the new bound parameter values before
+reusing the compiled SQL. Cursors are opaque ``"<sort value iso>|<id>"`` strings
+over a descending (sort column, id) order; an unreadable cursor starts from the
+first page.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+MAX_PAGE_SIZE = 100
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(value: datetime, row_id: uuid.UUID) -> str:
+    return f"{value.isoformat()}|{row_id}"
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, uuid.UUID] | None:
+    if not cursor:
+        return None
+    try:
+        ts_str, id_str = cursor.split("|")
+        return datetime.fromisoformat(ts_str), uuid.UUID(id_str)
+    except ValueError:
+        return None
+
+
+def ordered(
+    stmt: StatementLambdaElement, sort_col: InstrumentedAttribute, id_col: InstrumentedAttribute
+) -> StatementLambdaElement:
+    return stmt + (lambda s: s.order_by(sort_col.desc(), id_col.desc()))
+
+
+def page(
+    stmt: StatementLambdaElement,
+    sort_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    *,
+    cursor: str | None,
+    limit: int,
+) -> StatementLambdaElement:
+    """Rows after ``cursor`` in (sort_col, id) descending order, one more than ``limit``."""
+    fetch = clamp_limit(limit) + 1
+    after = decode_cursor(cursor)
+    # one lambda per shape: every link re-extracts the bound values of the chain
+    if after is None:
+        return stmt + (lambda s: s.order_by(sort_col.desc(), id_col.desc()).limit(fetch))
+    ts, cid = after
+    return stmt + (
+        lambda s: s.where(tuple_(sort_col, id_col) < tuple_(ts, cid)).order_by(sort_col.desc(), id_col.desc()).limit(fetch)
+    )
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: StatementLambdaElement,
+    sort_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    *,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[Any], str | None]:
+    limit = clamp_limit(limit)
+    res = await db.execute(page(stmt, sort_col, id_col, cursor=cursor, limit=limit))
+    rows = res.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(getattr(last, sort_col.key), getattr(last, id_col.key))
+        rows = rows[:limit]
+
+    return rows, next_cursor
@@ -3,15 +3,16 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, insert, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.task import Task
+from app.repositories import keyset
 
 
 async def get_by_id(db: AsyncSession, *, task_id: uuid.UUID, user_id: uuid.UUID) -> Task | None:
     res = await db.execute(
-        select(Task).where(Task.id == task_id, Task.user_id == user_id, Task.deleted == False)  # noqa: E712
+        lambda_stmt(lambda: select(Task).where(Task.id == task_id, Task.user_id == user_id, Task.deleted == False))  # noqa: E712
     )
     return res.scalar_one_or_none()
 
@@ -27,43 +28,92 @@ async def list(
     cursor: str | None,
     limit: int,
 ) -> tuple[list[Task], str | None]:
-    q = select(Task).where(Task.user_id == user_id, Task.deleted == False)  # noqa: E712
+    stmt = lambda_stmt(lambda: select(Task).where(Task.user_id == user_id, Task.deleted == False))  # noqa: E712
 
     if status:
-        q = q.where(Task.status == status)
+        stmt += lambda s: s.where(Task.status == status)
     if goal_id:
-        q = q.where(Task.goal_id == goal_id)
+        stmt += lambda s: s.where(Task.goal_id == goal_id)
     if due_from:
-        q = q.where(Task.due_at >= due_from)
+        stmt += lambda s: s.where(Task.due_at >= due_from)
     if due_to:
-        q = q.where(Task.due_at <= due_to)
+        stmt += lambda s: s.where(Task.due_at <= due_to)
 
-    if cursor:
-        try:
-            ts_str, id_str = cursor.split("|")
-            ts = datetime.fromisoformat(ts_str)
-            cid = uuid.UUID(id_str)
-            q = q.where((Task.updated_at, Task.id) < (ts, cid))
-        except Exception:
-            pass
+    return await keyset.fetch_page(db, stmt, Task.updated_at, Task.id, cursor=cursor, limit=limit)
 
-    q = q.order_by(Task.updated_at.desc(), Task.id.desc()).limit(max(1, min(limit, 100)) + 1)
-    res = await db.execute(q)
-    rows = res.scalars().all()
 
-    next_cursor = None
-    if len(rows) > limit:
-        last = rows[limit - 1]
-        next_cursor = f"{last.updated_at.isoformat()}|{last.id}"
-        rows = rows[:limit]
-
-    return rows, next_cursor
+async def create(db: AsyncSession, task: Task) -> Task:
+    db.add(task)
+    await db.flush()
+    return task
 
 
 async def patch(db: AsyncSession, *, task_id: uuid.UUID, values: dict) -> None:
-    await db.execute(update(Task).where(Task.id == task_id).values(**values))
+    # written through the ORM (the task is normally already in the identity map)
+    # so flush listeners such as the goal counters see the change
+    task = await db.get(Task, task_id)
+    if task is None:
+        return
+    for key, value in values.items():
+        setattr(task, key, value)
+    await db.flush()
 
 
 async def soft_delete(db: AsyncSession, *, task_id: uuid.UUID, values: dict) -> None:
     # values must include: deleted=True, updated_at=...
-    await db.execute(update(Task).where(Task.id == task_id).values(**values))
+    await patch(db, task_id=task_id, values=values)
+
+
+# --- bulk writes --------------------------------------------------------------
+# Plain row dicts through Core statements: one INSERT for any number of new tasks
+# and one executemany UPDATE for changed ones. Every changed row carries all of
+# these columns so they share a single UPDATE shape.
+
+_BULK_UPDATE_COLUMNS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "estimated_minutes",
+    "energy_level",
+    "goal_id",
+    "due_at",
+    "updated_at",
+    "deleted",
+)
+
+
+async def get_rows_for_update(
+    db: AsyncSession, *, user_id: uuid.UUID, task_ids: set[uuid.UUID]
+) -> dict[uuid.UUID, dict]:
+    if not task_ids:
+        return {}
+    tasks = Task.__table__
+    # id order: concurrent bulk writers lock rows in the same order
+    stmt = (
+        select(tasks)
+        .where(tasks.c.id.in_(task_ids), tasks.c.user_id == user_id, tasks.c.deleted == False)  # noqa: E712
+        .order_by(tasks.c.id)
+    )
+    if db.bind.dialect.name == "postgresql":
+        stmt = stmt.with_for_update()
+    res = await db.execute(stmt)
+    return {row["id"]: dict(row) for row in res.mappings()}
+
+
+async def insert_rows(db: AsyncSession, rows: list[dict]) -> None:
+    if rows:
+        await db.execute(insert(Task.__table__), rows)
+
+
+async def update_rows(db: AsyncSession, rows: list[dict]) -> None:
+    if not rows:
+        return
+    tasks = Task.__table__
+    await db.execute(
+        update(tasks).where(tasks.c.id == bindparam("b_id"), tasks.c.user_id == bindparam("b_user_id")),
+        [
+            {"b_id": row["id"], "b_user_id": row["user_id"], **{name: row[name] for name in _BULK_UPDATE_COLUMNS}}
+            for row in rows
+        ],
+    )
@@ -29,6 +29,12 @@ class GoalOut(BaseModel):
     tasks_completed: int
 
 
+class GoalListOut(BaseModel):
+    items: list[GoalOut]
+    next_cursor: str | None = None
+    request_id: str
+
+
 class GoalProgressOut(BaseModel):
     id: uuid.UUID
     percent_complete: float = Field(ge=0, le=100)
@@ -78,6 +84,12 @@ class CalendarEventOut(BaseModel):
     parallel_with: list[uuid.UUID] = Field(default_factory=list)
 
 
+class CalendarEventListOut(BaseModel):
+    items: list[CalendarEventOut]
+    next_cursor: str | None = None
+    request_id: str
+
+
 class InboxCreateIn(BaseModel):
     note: str = Field(min_length=1, max_length=500)
 
@@ -120,6 +132,12 @@ class FinanceTransactionOut(BaseModel):
     recurring: bool = False
 
 
+class FinanceTransactionListOut(BaseModel):
+    items: list[FinanceTransactionOut]
+    next_cursor: str | None = None
+    request_id: str
+
+
 class FinanceSummaryOut(BaseModel):
     month: str
     income_total: float
@@ -165,4 +183,6 @@ class SyncStatusOut(BaseModel):
     last_synced_at: datetime | None
     pending_entities: list[str]
     status: Literal["idle", "syncing", "error"]
+    # per entity: an ``updated_from`` before this gets ``full_resync_required``
+    sync_horizons: dict[str, datetime] = Field(default_factory=dict)
 
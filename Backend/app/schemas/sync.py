@@ -8,7 +8,7 @@ from pydantic import BaseModel, Field
 
 
 class BatchSyncOperation(BaseModel):
-    entity: Literal["task", "event", "finance"]
+    entity: Literal["task", "event", "finance", "goal", "subtask"]
     action: Literal["upsert", "delete"]
     id: uuid.UUID | None = None
     data: dict | None = None
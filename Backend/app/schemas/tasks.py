@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field, field_validator
 
 ALLOWED_STATUSES = {"todo", "in_progress", "done", "deferred"}
 
+TASK_BULK_MAX_OPERATIONS = 200
+
 
 class TaskOut(BaseModel):
     id: uuid.UUID
@@ -79,3 +82,56 @@ class TaskListOut(BaseModel):
     items: list[TaskOut]
     next_cursor: str | None = None
     request_id: str
+
+
+class TaskBulkFields(BaseModel):
+    """Task fields of a bulk create or update; ``None`` leaves a field unchanged."""
+
+    title: str | None = Field(default=None, min_length=1, max_length=300)
+    description: str | None = None
+    goal_id: uuid.UUID | None = None
+    due_at: datetime | None = None
+    priority: int | None = None
+    estimated_minutes: int | None = None
+    energy_level: int | None = None
+    status: str | None = None
+
+    @field_validator("priority", "estimated_minutes", "energy_level")
+    @classmethod
+    def non_negative(cls, value: int | None) -> int | None:
+        if value is not None and value < 0:
+            raise ValueError("Value must be non-negative")
+        return value
+
+    @field_validator("status")
+    @classmethod
+    def validate_status(cls, value: str | None) -> str | None:
+        if value is not None and value not in ALLOWED_STATUSES:
+            raise ValueError("Unsupported status")
+        return value
+
+
+class TaskBulkOperation(BaseModel):
+    action: Literal["create", "update", "delete"]
+    # update/delete: the task and the updated_at the client last saw
+    id: uuid.UUID | None = None
+    updated_at: datetime | None = None
+    data: TaskBulkFields | None = None
+
+
+class TaskBulkIn(BaseModel):
+    operations: list[TaskBulkOperation] = Field(min_length=1, max_length=TASK_BULK_MAX_OPERATIONS)
+    request_id: str = Field(min_length=1, max_length=128)
+
+
+class TaskBulkResult(BaseModel):
+    action: str
+    id: uuid.UUID | None = None
+    status: Literal["applied", "conflict", "not_found", "invalid"]
+    reason: str | None = None
+    task: TaskOut | None = None  # applied: the task as written; conflict: the stored task
+
+
+class TaskBulkOut(BaseModel):
+    results: list[TaskBulkResult]
+    request_id: str
@@ -10,9 +10,8 @@ from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
+    password_hasher,
     token_hash,
-    verify_password,
 )
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
@@ -25,7 +24,7 @@ async def create_user(
     user = await users_repo.create(
         db,
         email=email,
-        password_hash=hash_password(password),
+        password_hash=await password_hasher.hash(password),
         full_name=full_name,
         timezone=timezone_name,
     )
@@ -51,7 +50,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> User
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await password_hasher.verify(password, user.password_hash):
         return None
     return user
 
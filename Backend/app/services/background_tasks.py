@@ -1,67 +1,375 @@
 from __future__ import annotations
 
+import asyncio
+import time
+import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import and_, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.config import settings
+from app.models.analytics_event import AnalyticsOutboxEvent
+from app.models.idempotency import IdempotencyKey
 from app.models.notification import DigestSchedule
 from app.models.sync_operation import SyncOperation
 from app.services.batch_sync_service import process_batch_operations
-from app.services.observability import log_sync_error, record_sync_metric
+from app.services.events import EventSink, get_event_sink
+from app.services.goal_counters import reconcile_batch
+from app.services.observability import (
+    log_sync_error,
+    record_goal_reconcile_metric,
+    record_idempotency_reaper_metric,
+    record_outbox_metric,
+    record_sync_metric,
+    record_tombstone_archive_metric,
+)
 from app.services.push_service import push_service
+from app.services.reminders import ReminderDispatcher
+from app.services.sync_handlers import normalize_to_utc
+from app.services.tombstones import ARCHIVED, advance_horizon, archive_batch
 from app.schemas.sync import BatchSyncOperation
 
 
-async def process_sync_queue(db: AsyncSession) -> None:
+_CLAIMABLE_STATUSES = ("pending", "error")
+
+
+async def process_sync_queue(db: AsyncSession, *, session_factory: async_sessionmaker | None = None) -> None:
+    """Claim due sync operations and apply them with a bounded worker pool.
+
+    Rows are leased with ``FOR UPDATE SKIP LOCKED`` (a single atomic
+    UPDATE ... RETURNING on SQLite), so concurrent workers never pick up the same
+    operation and a crashed worker's rows become claimable again once
+    ``locked_until`` passes. Claimed rows targeting the same entity are compacted
+    into one batch and applied in their own transaction; failed ones are
+    rescheduled with exponential backoff until ``SYNC_MAX_ATTEMPTS``.
+    """
     now = datetime.now(timezone.utc)
-    retry_cutoff = now - timedelta(minutes=settings.SYNC_RETRY_MINUTES)
+    claimed = await _claim_sync_operations(db, now=now, limit=settings.SYNC_QUEUE_BATCH_SIZE)
+    if not claimed:
+        record_sync_metric(queue_depth=0, processed=0, status="idle")
+        return
+
+    lag_ms = max(int((now - normalize_to_utc(op.scheduled_at)).total_seconds() * 1000) for op in claimed)
+    factory = session_factory or async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(max(1, settings.SYNC_WORKER_CONCURRENCY))
+
+    async def worker(group: list[Row]) -> list[bool]:
+        async with semaphore:
+            return await _run_sync_group(factory, group)
+
+    outcomes = [ok for group in await asyncio.gather(*map(worker, _group_claimed(claimed))) for ok in group]
+    failed = outcomes.count(False)
+    record_sync_metric(
+        queue_depth=await _ready_queue_depth(db, now=datetime.now(timezone.utc)),
+        processed=len(outcomes) - failed,
+        failed=failed,
+        lag_ms=lag_ms,
+        status="processed",
+    )
+
+
+def _claimable(now: datetime):
+    return and_(
+        SyncOperation.status.in_(_CLAIMABLE_STATUSES),
+        SyncOperation.scheduled_at <= now,
+        or_(
+            SyncOperation.locked.is_(False),
+            SyncOperation.locked_until.is_(None),
+            SyncOperation.locked_until < now,
+        ),
+    )
+
+
+async def _claim_sync_operations(db: AsyncSession, *, now: datetime, limit: int) -> list[Row]:
+    candidates = (
+        select(SyncOperation.id).where(_claimable(now)).order_by(SyncOperation.scheduled_at).limit(limit)
+    )
+    if db.bind.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    # SQLite has no row locks: the UPDATE ... RETURNING itself is atomic under the database write lock
 
     res = await db.execute(
-        select(SyncOperation)
-        .where(
-            and_(
-                SyncOperation.status.in_(["pending", "error"]),
-                SyncOperation.scheduled_at <= now,
-                SyncOperation.locked.is_(False),
-                SyncOperation.updated_at <= retry_cutoff,
-            )
+        update(SyncOperation)
+        .where(SyncOperation.id.in_(candidates))
+        .values(
+            locked=True,
+            locked_until=now + timedelta(seconds=settings.SYNC_LEASE_SECONDS),
+            attempts=SyncOperation.attempts + 1,
+            updated_at=now,
         )
-        .limit(settings.SYNC_QUEUE_BATCH_SIZE)
+        .returning(
+            SyncOperation.id,
+            SyncOperation.user_id,
+            SyncOperation.entity,
+            SyncOperation.action,
+            SyncOperation.payload,
+            SyncOperation.attempts,
+            SyncOperation.scheduled_at,
+            SyncOperation.created_at,
+            SyncOperation.locked_until,
+        )
+        .execution_options(synchronize_session=False)
     )
-    ops = list(res.scalars())
-    if not ops:
-        record_sync_metric(queue_depth=0, processed=0, status="idle")
-        return
-
-    processed = 0
-    for op in ops:
-        op.locked = True
-        op.updated_at = now
-        await db.flush()
-        try:
-            payload = BatchSyncOperation(
-                entity=op.payload.get("entity", op.entity),
-                action=op.payload.get("action", op.action),
-                id=op.payload.get("id"),
-                updated_at=op.payload.get("updated_at", now),
-                data=op.payload.get("data"),
-            )
-            await process_batch_operations(db, user_id=op.user_id, operations=[payload])
-            op.status = "done"
-            op.last_error = None
-        except Exception as exc:  # noqa: BLE001
-            op.status = "error"
-            op.last_error = str(exc)
-            log_sync_error(user_id=str(op.user_id), entity=op.entity, action=op.action, reason=str(exc))
-        finally:
-            op.locked = False
-            op.attempts += 1
-            op.updated_at = datetime.now(timezone.utc)
-            processed += 1
+    claimed = list(res.all())
     await db.commit()
-    record_sync_metric(queue_depth=max(len(ops) - processed, 0), processed=processed, status="processed")
+    return claimed
+
+
+def _group_claimed(claimed: list[Row]) -> list[list[Row]]:
+    groups: dict[tuple, list[Row]] = defaultdict(list)
+    for op in claimed:
+        target = op.payload.get("id") or op.id
+        groups[(op.user_id, op.payload.get("entity", op.entity), str(target))].append(op)
+    return [sorted(group, key=lambda op: op.created_at) for group in groups.values()]
+
+
+async def _run_sync_group(factory: async_sessionmaker, group: list[Row]) -> list[bool]:
+    """Apply queued operations for one entity in a single transaction."""
+    now = datetime.now(timezone.utc)
+    outcomes: dict[uuid.UUID, bool] = {}
+    payloads: list[BatchSyncOperation] = []
+    valid: list[Row] = []
+    async with factory() as session:
+        for op in group:
+            try:
+                payloads.append(
+                    BatchSyncOperation(
+                        entity=op.payload.get("entity", op.entity),
+                        action=op.payload.get("action", op.action),
+                        id=op.payload.get("id"),
+                        updated_at=op.payload.get("updated_at", now),
+                        data=op.payload.get("data"),
+                    )
+                )
+                valid.append(op)
+            except ValueError as exc:
+                outcomes[op.id] = await _fail(session, op, exc, now=now)
+        await session.commit()
+
+        if valid:
+            try:
+                await process_batch_operations(session, user_id=valid[0].user_id, operations=payloads)
+                released = [await _release(session, op, status="done", last_error=None) for op in valid]
+                if all(released):
+                    await session.commit()
+                    outcomes.update((op.id, True) for op in valid)
+                else:
+                    await session.rollback()
+                    for op in valid:
+                        log_sync_error(user_id=str(op.user_id), entity=op.entity, action=op.action, reason="lease_lost")
+                        outcomes[op.id] = False
+            except Exception as exc:  # noqa: BLE001
+                await session.rollback()
+                for op in valid:
+                    outcomes[op.id] = await _fail(session, op, exc, now=now)
+                await session.commit()
+
+    return [outcomes[op.id] for op in group]
+
+
+async def _fail(db: AsyncSession, op: Row, exc: Exception, *, now: datetime) -> bool:
+    log_sync_error(user_id=str(op.user_id), entity=op.entity, action=op.action, reason=str(exc))
+    exhausted = op.attempts >= settings.SYNC_MAX_ATTEMPTS
+    await _release(
+        db,
+        op,
+        status="failed" if exhausted else "error",
+        last_error=str(exc),
+        scheduled_at=None if exhausted else now + _retry_delay(op.attempts),
+    )
+    return False
+
+
+async def _release(
+    db: AsyncSession, op: Row, *, status: str, last_error: str | None, scheduled_at: datetime | None = None
+) -> bool:
+    values = {
+        "status": status,
+        "last_error": last_error,
+        "locked": False,
+        "locked_until": None,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    if scheduled_at is not None:
+        values["scheduled_at"] = scheduled_at
+    # fenced by the lease: if it expired and another worker re-claimed the row, leave it alone
+    res = await db.execute(
+        update(SyncOperation)
+        .where(SyncOperation.id == op.id, SyncOperation.locked_until == op.locked_until)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return res.rowcount == 1
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    minutes = settings.SYNC_RETRY_MINUTES * 2 ** min(max(attempts - 1, 0), 16)
+    return timedelta(minutes=min(minutes, settings.SYNC_RETRY_MAX_MINUTES))
+
+
+async def _ready_queue_depth(db: AsyncSession, *, now: datetime) -> int:
+    res = await db.execute(select(func.count()).select_from(SyncOperation).where(_claimable(now)))
+    return int(res.scalar_one())
+
+
+async def ship_analytics_events(db: AsyncSession, *, sink: EventSink | None = None) -> int:
+    """Drain the analytics outbox to ``sink`` in batches (at-least-once delivery)."""
+    sink = sink or get_event_sink()
+    batch_size = settings.ANALYTICS_OUTBOX_BATCH_SIZE
+    shipped = 0
+    while True:
+        stmt = select(AnalyticsOutboxEvent).order_by(AnalyticsOutboxEvent.created_at).limit(batch_size)
+        if db.bind.dialect.name == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+        events = list((await db.execute(stmt)).scalars())
+        if not events:
+            break
+
+        await sink.write(
+            [
+                {
+                    "id": str(event.id),
+                    "name": event.name,
+                    "request_id": event.request_id,
+                    "user_id": str(event.user_id) if event.user_id else None,
+                    "payload": event.payload,
+                    "created_at": event.created_at.isoformat(),
+                }
+                for event in events
+            ]
+        )
+        await db.execute(delete(AnalyticsOutboxEvent).where(AnalyticsOutboxEvent.id.in_([e.id for e in events])))
+        await db.commit()
+        shipped += len(events)
+        if len(events) < batch_size:
+            break
+
+    record_outbox_metric(shipped=shipped, status="shipped" if shipped else "idle")
+    return shipped
+
+
+async def reap_idempotency_keys(db: AsyncSession) -> int:
+    """Delete expired idempotency keys in short chunks.
+
+    Each chunk is its own transaction and the run stops after
+    ``IDEMPOTENCY_REAP_MAX_BATCHES`` chunks, pausing between them, so the reaper
+    never holds long locks or saturates the database; leftovers go to the next run.
+    """
+    started = time.monotonic()
+    batch_size = settings.IDEMPOTENCY_REAP_BATCH_SIZE
+    deleted = 0
+    batches = 0
+    while batches < settings.IDEMPOTENCY_REAP_MAX_BATCHES:
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+            .limit(batch_size)
+        )
+        if db.bind.dialect.name == "postgresql":
+            expired = expired.with_for_update(skip_locked=True)
+        res = await db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        batches += 1
+        deleted += res.rowcount or 0
+        if (res.rowcount or 0) < batch_size:
+            break
+        await asyncio.sleep(settings.IDEMPOTENCY_REAP_PAUSE_SECONDS)
+
+    record_idempotency_reaper_metric(
+        deleted=deleted,
+        batches=batches,
+        duration_ms=int((time.monotonic() - started) * 1000),
+        status="reaped" if deleted else "idle",
+    )
+    return deleted
+
+
+async def reconcile_goal_counters(db: AsyncSession) -> int:
+    """Repair drifted goal counters (e.g. after bulk task updates) in keyset batches.
+
+    Each batch is one grouped aggregate over the goals' live tasks and commits on
+    its own; goals are read in id order so the whole table is covered once per run.
+    """
+    started = time.monotonic()
+    batch_size = settings.GOAL_RECONCILE_BATCH_SIZE
+    after = None
+    scanned = 0
+    repaired = 0
+    batches = 0
+    while True:
+        seen, fixed, after = await reconcile_batch(db, after=after, limit=batch_size)
+        await db.commit()
+        batches += 1
+        scanned += seen
+        repaired += fixed
+        if seen < batch_size:
+            break
+        await asyncio.sleep(settings.GOAL_RECONCILE_PAUSE_SECONDS)
+
+    record_goal_reconcile_metric(
+        scanned=scanned,
+        repaired=repaired,
+        batches=batches,
+        duration_ms=int((time.monotonic() - started) * 1000),
+        status="repaired" if repaired else "clean",
+    )
+    return repaired
+
+
+async def archive_tombstones(db: AsyncSession) -> int:
+    """Move tombstones older than ``TOMBSTONE_RETENTION_DAYS`` into ``tombstone_archive``.
+
+    Each entity's sync horizon is raised to the cutoff and committed before any of
+    its rows move, so no client is served deltas with archived deletions missing.
+    Batches commit on their own with a pause in between, at most
+    ``TOMBSTONE_ARCHIVE_MAX_BATCHES`` per entity and run; leftovers go to the next run.
+    """
+    started = time.monotonic()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    batch_size = settings.TOMBSTONE_ARCHIVE_BATCH_SIZE
+    by_entity: dict[str, int] = {}
+    batches = 0
+    for spec in ARCHIVED:
+        await advance_horizon(db, spec.entity, cutoff)
+        await db.commit()
+        moved_total = 0
+        for _ in range(settings.TOMBSTONE_ARCHIVE_MAX_BATCHES):
+            moved = await archive_batch(db, spec, cutoff=cutoff, limit=batch_size)
+            await db.commit()
+            batches += 1
+            moved_total += moved
+            if moved < batch_size:
+                break
+            await asyncio.sleep(settings.TOMBSTONE_ARCHIVE_PAUSE_SECONDS)
+        by_entity[spec.entity] = moved_total
+
+    archived = sum(by_entity.values())
+    record_tombstone_archive_metric(
+        archived=archived,
+        by_entity=by_entity,
+        batches=batches,
+        duration_ms=int((time.monotonic() - started) * 1000),
+        status="archived" if archived else "idle",
+    )
+    return archived
+
+
+async def dispatch_reminders(
+    db: AsyncSession, *, stop: asyncio.Event, session_factory: async_sessionmaker | None = None
+) -> None:
+    """Fire notification trigger reminders on time until ``stop`` is set.
+
+    Long-running, unlike the other jobs: start it once per worker. Several
+    workers can run it side by side; their claims never overlap.
+    """
+    factory = session_factory or async_sessionmaker(db.bind, class_=AsyncSession, expire_on_commit=False)
+    await ReminderDispatcher(factory).run(stop)
 
 
 async def dispatch_digests(db: AsyncSession) -> None:
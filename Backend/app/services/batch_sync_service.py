@@ -1,227 +1,267 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Any
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.task import Task
 from app.schemas.sync import BatchSyncOperation, BatchSyncResult
-from app.schemas.tasks import ALLOWED_STATUSES, TaskOut
-from app.services.observability import log_sync_error
+from app.services.observability import log_sync_error, record_sync_compaction
+from app.services.sync_handlers import SyncEntityHandler, get_sync_handler, normalize_to_utc
+
+
+@dataclass
+class OperationGroup:
+    """Operations of one batch that target the same ``(entity, id)``, in batch order."""
+
+    entity: str
+    id: uuid.UUID | None
+    items: list[tuple[int, BatchSyncOperation]] = field(default_factory=list)
+
+
+def compact_operations(operations: list[BatchSyncOperation]) -> list[OperationGroup]:
+    """Fold a batch into one group per ``(entity, id)`` ordered by first appearance.
+
+    Operations without an id cannot be matched to each other and stay on their own.
+    """
+    groups: list[OperationGroup] = []
+    by_key: dict[tuple[str, uuid.UUID], OperationGroup] = {}
+    for idx, op in enumerate(operations):
+        if op.id is None:
+            groups.append(OperationGroup(entity=op.entity, id=None, items=[(idx, op)]))
+            continue
+        group = by_key.get((op.entity, op.id))
+        if group is None:
+            group = by_key[(op.entity, op.id)] = OperationGroup(entity=op.entity, id=op.id)
+            groups.append(group)
+        group.items.append((idx, op))
+    return groups
 
 
 async def process_batch_operations(
     db: AsyncSession, *, user_id: uuid.UUID, operations: list[BatchSyncOperation]
 ) -> list[BatchSyncResult]:
-    results: list[BatchSyncResult] = []
+    """Apply a batch of offline operations with last-write-wins semantics.
 
-    for op in operations:
-        if op.entity == "task":
-            result = await _process_task_operation(db, user_id=user_id, op=op)
-        else:
-            result = BatchSyncResult(
-                entity=op.entity,
-                action=op.action,
-                id=op.id,
-                status="unsupported",
-                reason="Unsupported entity type",
-            )
-            log_sync_error(user_id=str(user_id), entity=op.entity, action=op.action, reason="unsupported_entity")
-        results.append(result)
+    Operations are first compacted per ``(entity, id)``: each group is folded
+    into a single effective change, while results are still reported for every
+    original operation. Existing rows and referenced parents are loaded with one
+    query per entity type and the session is flushed once at the end.
+    """
+    results: list[BatchSyncResult | None] = [None] * len(operations)
+    groups = compact_operations(operations)
+    record_sync_compaction(operations=len(operations), compacted=len(groups))
 
-    return results
+    rows = await _prefetch_rows(db, operations=operations)
+    owned_refs = await _prefetch_references(db, user_id=user_id, operations=operations)
+    resolved: list[tuple[OperationGroup, SyncEntityHandler, Any]] = []
+    dirty = False
 
+    for group in groups:
+        handler = get_sync_handler(group.entity)
+        if handler is None:
+            for idx, op in group.items:
+                log_sync_error(user_id=str(user_id), entity=op.entity, action=op.action, reason="unsupported_entity")
+                results[idx] = _result(op, status="unsupported", reason="Unsupported entity type")
+            continue
 
-async def _process_task_operation(db: AsyncSession, *, user_id: uuid.UUID, op: BatchSyncOperation) -> BatchSyncResult:
-    normalized_updated_at = _normalize_to_utc(op.updated_at)
+        obj, changed = _apply_group(
+            handler,
+            user_id=user_id,
+            group=group,
+            rows=rows[handler.entity],
+            owned_refs=owned_refs,
+            results=results,
+        )
+        if changed:
+            db.add(obj)
+            dirty = True
+        if obj is not None:
+            resolved.append((group, handler, obj))
 
-    task: Task | None = None
-    if op.id:
-        res = await db.execute(select(Task).where(Task.id == op.id, Task.user_id == user_id))
-        task = res.scalar_one_or_none()
+    if dirty:
+        await db.flush()
+    # serialized after the flush: defaults are populated and ``current`` reports
+    # the row as it stands once the whole batch has been applied
+    for group, handler, obj in resolved:
+        current = handler.serialize(obj)
+        for idx, _ in group.items:
+            if results[idx].status in ("applied", "skipped"):
+                results[idx].current = current
 
-    if op.action == "delete":
-        return await _apply_task_delete(db, task=task, op=op, updated_at=normalized_updated_at)
+    return results
 
-    if op.action == "upsert":
-        return await _apply_task_upsert(db, user_id=user_id, task=task, op=op, updated_at=normalized_updated_at)
 
-    log_sync_error(
-        user_id=str(user_id),
-        entity=op.entity,
-        action=op.action,
-        reason="unsupported_action",
-    )
-    return BatchSyncResult(
-        entity=op.entity,
-        action=op.action,
-        id=op.id,
-        status="error",
-        reason="Unsupported action",
-    )
+async def _prefetch_rows(db: AsyncSession, *, operations: list[BatchSyncOperation]) -> dict[str, dict[uuid.UUID, Any]]:
+    ids_by_entity: dict[str, set[uuid.UUID]] = defaultdict(set)
+    for op in operations:
+        if op.id is not None and get_sync_handler(op.entity) is not None:
+            ids_by_entity[op.entity].add(op.id)
 
+    rows: dict[str, dict[uuid.UUID, Any]] = defaultdict(dict)
+    for entity, ids in ids_by_entity.items():
+        model = get_sync_handler(entity).model
+        # no user filter: ids owned by someone else must be rejected, not re-inserted
+        res = await db.execute(select(model).where(model.id.in_(ids)))
+        rows[entity] = {obj.id: obj for obj in res.scalars()}
+    return rows
 
 
-async def _apply_task_upsert(
-    db: AsyncSession,
+async def _prefetch_references(
+    db: AsyncSession, *, user_id: uuid.UUID, operations: list[BatchSyncOperation]
+) -> dict[type, set[uuid.UUID]]:
+    wanted: dict[type, set[uuid.UUID]] = defaultdict(set)
+    for op in operations:
+        handler = get_sync_handler(op.entity)
+        if handler is None or not handler.references or not op.data:
+            continue
+        for field_name, model in handler.references.items():
+            try:
+                ref = handler.coerce({field_name: op.data[field_name]})[field_name] if field_name in op.data else None
+            except ValueError:
+                continue
+            if ref is not None:
+                wanted[model].add(ref)
+
+    owned: dict[type, set[uuid.UUID]] = defaultdict(set)
+    for model, ids in wanted.items():
+        res = await db.execute(
+            select(model.id).where(model.id.in_(ids), model.user_id == user_id, model.deleted == False)  # noqa: E712
+        )
+        owned[model] = set(res.scalars())
+    return owned
+
+
+def _apply_group(
+    handler: SyncEntityHandler,
     *,
     user_id: uuid.UUID,
-    task: Task | None,
-    op: BatchSyncOperation,
-    updated_at: datetime,
-) -> BatchSyncResult:
-    if op.data is None:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=op.id,
-            status="error",
-            reason="Missing data for upsert",
-        )
+    group: OperationGroup,
+    rows: dict[uuid.UUID, Any],
+    owned_refs: dict[type, set[uuid.UUID]],
+    results: list[BatchSyncResult | None],
+) -> tuple[Any | None, bool]:
+    """Fold one group into a single change; returns the row and whether it was modified."""
+    obj = rows.get(group.id) if group.id else None
 
-    status = op.data.get("status", task.status if task else "todo")
-    if status and status not in ALLOWED_STATUSES:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=op.id,
-            status="error",
-            reason="Unsupported status value",
-        )
+    if obj is not None and obj.user_id != user_id:
+        for idx, op in group.items:
+            log_sync_error(user_id=str(user_id), entity=op.entity, action=op.action, reason="foreign_id")
+            results[idx] = _result(op, status="error", reason="Entity id is not available")
+        return None, False
 
-    if task and _normalize_to_utc(task.updated_at) >= updated_at:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=task.id,
-            status="skipped",
-            reason="Conflict: existing version is newer",
-            current=TaskOut.model_validate(task).model_dump(),
-        )
+    # Replays the sequential rules without touching the row: an operation only
+    # wins if it is newer than everything applied before it, is valid against the
+    # values accumulated so far, and deleting a row that does not exist yet is a
+    # no-op. A rejected operation does not affect the ones around it.
+    chain: list[tuple[int, BatchSyncOperation]] = []
+    values: dict[str, Any] = {}
+    latest = normalize_to_utc(obj.updated_at) if obj is not None else None
+    for idx, op in group.items:
+        op_values, error = _check_operation(handler, op=op, owned_refs=owned_refs)
+        if error is not None:
+            results[idx] = error
+            continue
+        updated_at = normalize_to_utc(op.updated_at)
+        if latest is not None and updated_at <= latest:
+            results[idx] = _result(op, status="skipped", reason="Conflict: existing version is newer", id=group.id)
+            continue
+        if obj is None and not chain and op.action == "delete":
+            results[idx] = _result(op, status="skipped", reason=f"{op.entity.capitalize()} not found")
+            continue
+        if op.action == "upsert":
+            reason = _validate_step(handler, {**values, **op_values}, obj=obj, creating=obj is None and not chain)
+            if reason:
+                results[idx] = _result(op, status="error", reason=reason)
+                continue
+            values.update(op_values)
+        else:
+            values["deleted"] = True
+        chain.append((idx, op))
+        latest = updated_at
 
-    if task is None:
-        title = op.data.get("title")
-        if not title:
-            return BatchSyncResult(
-                entity=op.entity,
-                action=op.action,
-                id=op.id,
-                status="error",
-                reason="Title is required for creating tasks",
-            )
-
-        task = Task(
-            id=op.id or uuid.uuid4(),
-            user_id=user_id,
-            title=title,
-            description=op.data.get("description"),
-            goal_id=op.data.get("goal_id"),
-            due_at=_normalize_optional_dt(op.data.get("due_at")),
-            priority=op.data.get("priority"),
-            estimated_minutes=op.data.get("estimated_minutes"),
-            energy_level=op.data.get("energy_level"),
-            status=status or "todo",
-            created_at=_normalize_to_utc(op.data.get("created_at") or updated_at),
-            updated_at=updated_at,
-            deleted=bool(op.data.get("deleted", False)),
-        )
-        db.add(task)
-        await db.flush()
+    if not chain:
+        return obj, False
+
+    first, last = chain[0][1], chain[-1][1]
+    updated_at = normalize_to_utc(last.updated_at)
+
+    if obj is None:
+        created_at = _created_at((first.data or {}).get("created_at"), fallback=normalize_to_utc(first.updated_at))
+        obj = handler.build(user_id=user_id, obj_id=group.id, values=values, created_at=created_at, updated_at=updated_at)
+        rows[obj.id] = obj
+        # later groups in the same batch may reference this row
+        if handler.model in owned_refs:
+            owned_refs[handler.model].add(obj.id)
     else:
-        for field in [
-            "title",
-            "description",
-            "goal_id",
-            "due_at",
-            "priority",
-            "estimated_minutes",
-            "energy_level",
-            "status",
-            "deleted",
-        ]:
-            if field in op.data:
-                value: Any = op.data.get(field)
-                if field == "status" and value and value not in ALLOWED_STATUSES:
-                    return BatchSyncResult(
-                        entity=op.entity,
-                        action=op.action,
-                        id=task.id,
-                        status="error",
-                        reason="Unsupported status value",
-                    )
-                if field == "due_at":
-                    value = _normalize_optional_dt(value)
-                setattr(task, field, value)
-        task.updated_at = updated_at
-
-    await db.flush()
-    return BatchSyncResult(
-        entity=op.entity,
-        action=op.action,
-        id=task.id,
-        status="applied",
-        current=TaskOut.model_validate(task).model_dump(),
-    )
+        handler.apply(obj, values, updated_at=updated_at)
+
+    for idx, op in chain:
+        results[idx] = _result(op, status="applied", id=obj.id)
+    return obj, True
+
 
+def _validate_step(handler: SyncEntityHandler, values: dict[str, Any], *, obj: Any | None, creating: bool) -> str | None:
+    """Why the row would be invalid after this operation, or None."""
+    reason = handler.validate(values, obj)
+    if reason or not creating:
+        return reason
+    missing = [f for f in handler.required_on_create if values.get(f) is None]
+    if missing:
+        return f"Missing required fields for create: {', '.join(missing)}"
+    return None
 
-async def _apply_task_delete(
-    db: AsyncSession,
+
+def _check_operation(
+    handler: SyncEntityHandler,
     *,
-    task: Task | None,
     op: BatchSyncOperation,
-    updated_at: datetime,
-) -> BatchSyncResult:
-    if op.id is None:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=None,
-            status="error",
-            reason="Task id is required for delete",
-        )
+    owned_refs: dict[type, set[uuid.UUID]],
+) -> tuple[dict[str, Any], BatchSyncResult | None]:
+    if op.action == "delete":
+        if op.id is None:
+            return {}, _result(op, status="error", reason=f"{op.entity.capitalize()} id is required for delete")
+        return {}, None
 
-    if task is None:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=op.id,
-            status="skipped",
-            reason="Task not found",
-        )
+    if op.action != "upsert":
+        return {}, _result(op, status="error", reason="Unsupported action")
 
-    if _normalize_to_utc(task.updated_at) >= updated_at:
-        return BatchSyncResult(
-            entity=op.entity,
-            action=op.action,
-            id=task.id,
-            status="skipped",
-            reason="Conflict: existing version is newer",
-            current=TaskOut.model_validate(task).model_dump(),
-        )
+    if op.data is None:
+        return {}, _result(op, status="error", reason="Missing data for upsert")
 
-    task.deleted = True
-    task.updated_at = updated_at
-    await db.flush()
+    try:
+        values = handler.coerce(op.data)
+    except ValueError as exc:
+        return {}, _result(op, status="error", reason=str(exc))
 
-    return BatchSyncResult(
-        entity=op.entity,
-        action=op.action,
-        id=task.id,
-        status="applied",
-        current=TaskOut.model_validate(task).model_dump(),
-    )
+    for field_name, model in handler.references.items():
+        ref = values.get(field_name)
+        if ref is not None and ref not in owned_refs.get(model, ()):
+            return {}, _result(op, status="error", reason=f"Referenced '{field_name}' not found")
 
+    return values, None
 
-def _normalize_to_utc(value: datetime) -> datetime:
-    if value.tzinfo is None:
-        return value.replace(tzinfo=timezone.utc)
-    return value.astimezone(timezone.utc)
 
+def _created_at(raw: Any, *, fallback: datetime) -> datetime:
+    if raw is None:
+        return fallback
+    try:
+        value = datetime.fromisoformat(raw.replace("Z", "+00:00")) if isinstance(raw, str) else raw
+        return normalize_to_utc(value)
+    except (TypeError, ValueError, AttributeError):
+        return fallback
 
-def _normalize_optional_dt(value: datetime | None) -> datetime | None:
-    if value is None:
-        return None
-    return _normalize_to_utc(value)
+
+def _result(op: BatchSyncOperation, *, status: str, reason: str | None = None, id: uuid.UUID | None = None, current: dict | None = None) -> BatchSyncResult:
+    return BatchSyncResult(
+        entity=op.entity,
+        action=op.action,
+        id=id or op.id,
+        status=status,
+        reason=reason,
+        current=current,
+    )
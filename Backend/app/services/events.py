@@ -1,16 +1,106 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import Any
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
 from app.core.logging import log
+from app.models.analytics_event import AnalyticsOutboxEvent
+
+_MAX_STRING_LENGTH = 256
+
 
+def publish_event(
+    *,
+    name: str,
+    request_id: str,
+    user_id: str | None = None,
+    payload: dict[str, Any] | None = None,
+    db: AsyncSession | None = None,
+) -> None:
+    """Record an analytics event with a size-capped payload.
 
-def publish_event(*, name: str, request_id: str, user_id: str | None = None, payload: dict[str, Any] | None = None) -> None:
-    # MVP: structured log. Later: outbox/queue -> worker -> Firebase/Amplitude
-    log.info(
-        "analytics_event",
-        event_name=name,
-        request_id=request_id,
-        user_id=user_id,
-        payload=payload or {},
+    With ``db`` the event becomes an outbox row committed together with the
+    caller's business change and shipped later by ``ship_analytics_events``.
+    Callers without a session fall back to a single structured log line.
+    """
+    compact = compact_event_payload(payload or {})
+    if db is None:
+        log.info("analytics_event", event_name=name, request_id=request_id, user_id=user_id, payload=compact)
+        return
+
+    db.add(
+        AnalyticsOutboxEvent(
+            name=name,
+            request_id=str(request_id) if request_id is not None else None,
+            user_id=uuid.UUID(str(user_id)) if user_id else None,
+            payload=compact,
+        )
     )
+
+
+def compact_event_payload(payload: dict[str, Any], *, max_bytes: int | None = None) -> dict[str, Any]:
+    """Keep scalar fields, replace collections with their sizes and cap the encoded size."""
+    max_bytes = max_bytes or settings.ANALYTICS_EVENT_MAX_BYTES
+    compact: dict[str, Any] = {}
+    for key, value in payload.items():
+        if isinstance(value, (list, tuple, set, frozenset)):
+            compact[f"{key}_count"] = len(value)
+        elif isinstance(value, dict):
+            compact[f"{key}_keys"] = len(value)
+        elif value is None or isinstance(value, (bool, int, float)):
+            compact[key] = value
+        else:
+            compact[key] = str(value)[:_MAX_STRING_LENGTH]
+
+    size = len(json.dumps(compact))
+    if size <= max_bytes:
+        return compact
+
+    # drop the largest fields first until the event fits
+    capped = dict(compact)
+    for key in sorted(compact, key=lambda k: len(json.dumps(compact[k])), reverse=True):
+        del capped[key]
+        if len(json.dumps({**capped, "truncated": True})) <= max_bytes:
+            break
+    capped["truncated"] = True
+    return capped
+
+
+class EventSink(ABC):
+    """Destination for shipped analytics events."""
+
+    @abstractmethod
+    async def write(self, events: list[dict[str, Any]]) -> None:  # pragma: no cover - interface contract
+        raise NotImplementedError
+
+
+class LogEventSink(EventSink):
+    async def write(self, events: list[dict[str, Any]]) -> None:
+        log.info("analytics_events_shipped", count=len(events), events=events)
+
+
+class NdjsonFileEventSink(EventSink):
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    async def write(self, events: list[dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+def get_event_sink() -> EventSink:
+    if settings.ANALYTICS_SINK == "ndjson":
+        return NdjsonFileEventSink(settings.ANALYTICS_NDJSON_PATH)
+    return LogEventSink()
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import re
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.finance import FinanceMonthlyRollup, FinanceTransaction
+
+_MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+_RollupKey = tuple[uuid.UUID, str, str, str]
+
+
+def is_valid_month(month: str) -> bool:
+    return bool(_MONTH_RE.match(month))
+
+
+def month_of(value: datetime) -> str:
+    """Rollup bucket of a transaction: its UTC calendar month."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m")
+
+
+def month_range(month: str) -> tuple[datetime, datetime]:
+    year, mon = (int(part) for part in month.split("-"))
+    start = datetime(year, mon, 1, tzinfo=timezone.utc)
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc) if mon == 12 else datetime(year, mon + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+async def month_totals(db: AsyncSession, *, user_id: uuid.UUID, month: str) -> dict[str, Decimal]:
+    """Totals per transaction type from the rollups: one index range read per summary."""
+    res = await db.execute(
+        select(FinanceMonthlyRollup.type, func.sum(FinanceMonthlyRollup.amount))
+        .where(FinanceMonthlyRollup.user_id == user_id, FinanceMonthlyRollup.month == month)
+        .group_by(FinanceMonthlyRollup.type)
+    )
+    return {tx_type: Decimal(total or 0) for tx_type, total in res.all()}
+
+
+async def rebuild_month(db: AsyncSession, *, user_id: uuid.UUID, month: str) -> None:
+    """Recompute one user's month from the transactions (repair / backfill)."""
+    start, end = month_range(month)
+    res = await db.execute(
+        select(
+            FinanceTransaction.type,
+            FinanceTransaction.category,
+            func.sum(FinanceTransaction.amount),
+            func.count(),
+        )
+        .where(
+            FinanceTransaction.user_id == user_id,
+            FinanceTransaction.deleted == False,  # noqa: E712
+            FinanceTransaction.occurred_at >= start,
+            FinanceTransaction.occurred_at < end,
+        )
+        .group_by(FinanceTransaction.type, FinanceTransaction.category)
+    )
+    rows = res.all()
+
+    await db.execute(
+        delete(FinanceMonthlyRollup).where(FinanceMonthlyRollup.user_id == user_id, FinanceMonthlyRollup.month == month)
+    )
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        FinanceMonthlyRollup(
+            user_id=user_id,
+            month=month,
+            type=tx_type,
+            category=category,
+            amount=total,
+            tx_count=count,
+            updated_at=now,
+        )
+        for tx_type, category, total, count in rows
+    )
+    await db.flush()
+
+
+# --- incremental maintenance --------------------------------------------------
+# Every ORM write to a transaction (API routes and batch sync alike) moves its
+# amount between rollup rows inside the same flush, so the rollups commit or roll
+# back together with the transaction. Bulk UPDATE/DELETE statements bypass this;
+# use rebuild_month after those.
+
+
+def _contribution(values: dict[str, Any]) -> tuple[_RollupKey, Decimal] | None:
+    if values["deleted"] or values["occurred_at"] is None or values["amount"] is None:
+        return None
+    key = (values["user_id"], month_of(values["occurred_at"]), values["type"], values["category"])
+    return key, Decimal(str(values["amount"]))
+
+
+_TRACKED = ("user_id", "type", "category", "occurred_at", "amount", "deleted")
+
+
+def _current(obj: FinanceTransaction) -> dict[str, Any]:
+    return {name: getattr(obj, name) for name in _TRACKED}
+
+
+def _previous(obj: FinanceTransaction) -> dict[str, Any]:
+    state = inspect(obj)
+    values = {}
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def collect_deltas(session: Session) -> dict[_RollupKey, tuple[Decimal, int]]:
+    deltas: dict[_RollupKey, list] = defaultdict(lambda: [Decimal(0), 0])
+
+    def _add(contribution: tuple[_RollupKey, Decimal] | None, sign: int) -> None:
+        if contribution is None:
+            return
+        key, amount = contribution
+        deltas[key][0] += sign * amount
+        deltas[key][1] += sign
+
+    for obj in session.new:
+        if isinstance(obj, FinanceTransaction):
+            _add(_contribution(_current(obj)), 1)
+    for obj in session.dirty:
+        if isinstance(obj, FinanceTransaction) and session.is_modified(obj):
+            _add(_contribution(_previous(obj)), -1)
+            _add(_contribution(_current(obj)), 1)
+    for obj in session.deleted:
+        if isinstance(obj, FinanceTransaction):
+            _add(_contribution(_previous(obj)), -1)
+
+    return {key: (amount, count) for key, (amount, count) in deltas.items() if amount or count}
+
+
+def apply_deltas(connection: Connection, deltas: dict[_RollupKey, tuple[Decimal, int]]) -> None:
+    if not deltas:
+        return
+    now = datetime.now(timezone.utc)
+    # sorted keys: concurrent writers lock rollup rows in the same order
+    rows = [
+        {
+            "user_id": user_id,
+            "month": month,
+            "type": tx_type,
+            "category": category,
+            "amount": amount,
+            "tx_count": count,
+            "updated_at": now,
+        }
+        for (user_id, month, tx_type, category), (amount, count) in sorted(deltas.items(), key=lambda item: tuple(map(str, item[0])))
+    ]
+    dialect = postgresql if connection.dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(FinanceMonthlyRollup).values(rows)
+    table = FinanceMonthlyRollup.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.month, table.c.type, table.c.category],
+        set_={
+            "amount": table.c.amount + stmt.excluded.amount,
+            "tx_count": table.c.tx_count + stmt.excluded.tx_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    connection.execute(stmt)
+
+
+def _maintain_rollups(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still describe the flushed changes here
+    apply_deltas(session.connection(), collect_deltas(session))
+
+
+def register_listeners() -> None:
+    if not event.contains(Session, "after_flush", _maintain_rollups):
+        event.listen(Session, "after_flush", _maintain_rollups)
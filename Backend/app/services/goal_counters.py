@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import and_, bindparam, case, event, func, inspect, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.goal import Goal
+from app.models.task import Task
+from app.services.response_cache import mark_changed
+
+_GoalKey = tuple[uuid.UUID, uuid.UUID]
+
+_DONE = "done"
+
+
+def progress_of(total: int, completed: int) -> float:
+    return completed / total if total > 0 else 0.0
+
+
+# --- incremental maintenance --------------------------------------------------
+# Every ORM write to a task (create/update routes, planner decisions and batch
+# sync) moves it between goals' counters inside the same flush, so the counters
+# commit or roll back together with the task. Core writes (the bulk task endpoint)
+# report their changes through apply_task_changes; any other bulk UPDATE bypasses
+# both, and reconcile_goal_counters (background_tasks) repairs the drift.
+
+
+_TRACKED = ("user_id", "goal_id", "status", "deleted")
+
+
+def _contribution(values: dict[str, Any]) -> tuple[_GoalKey, int] | None:
+    if values["deleted"] or values["goal_id"] is None:
+        return None
+    return (values["user_id"], values["goal_id"]), int(values["status"] == _DONE)
+
+
+def _current(obj: Task) -> dict[str, Any]:
+    return {name: getattr(obj, name) for name in _TRACKED}
+
+
+def _previous(obj: Task) -> dict[str, Any]:
+    state = inspect(obj)
+    values = {}
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(obj, name)
+    return values
+
+
+def deltas_between(changes: Iterable[tuple[dict[str, Any] | None, dict[str, Any] | None]]) -> dict[_GoalKey, tuple[int, int]]:
+    """Counter deltas for task ``(before, after)`` values; ``None`` stands for no row."""
+    deltas: dict[_GoalKey, list[int]] = defaultdict(lambda: [0, 0])
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            contribution = _contribution(values) if values is not None else None
+            if contribution is None:
+                continue
+            key, done = contribution
+            deltas[key][0] += sign
+            deltas[key][1] += sign * done
+
+    return {key: (total, completed) for key, (total, completed) in deltas.items() if total or completed}
+
+
+def collect_deltas(session: Session) -> dict[_GoalKey, tuple[int, int]]:
+    changes: list[tuple[dict[str, Any] | None, dict[str, Any] | None]] = []
+    for obj in session.new:
+        if isinstance(obj, Task):
+            changes.append((None, _current(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, Task) and session.is_modified(obj):
+            changes.append((_previous(obj), _current(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            changes.append((_previous(obj), None))
+    return deltas_between(changes)
+
+
+def _counters_update():
+    total = Goal.tasks_total + bindparam("d_total")
+    completed = Goal.tasks_completed + bindparam("d_completed")
+    return (
+        update(Goal.__table__)
+        .where(Goal.id == bindparam("g_id"), Goal.user_id == bindparam("u_id"))
+        .values(
+            tasks_total=total,
+            tasks_completed=completed,
+            progress=case((total > 0, completed * literal(1.0) / total), else_=literal(0.0)),
+            # the goal as listed changed: delta sync and list ETags key off updated_at
+            updated_at=bindparam("now"),
+        )
+    )
+
+
+def apply_deltas(session: Session, connection: Connection, deltas: dict[_GoalKey, tuple[int, int]]) -> None:
+    if not deltas:
+        return
+    # sorted keys: concurrent writers lock goal rows in the same order
+    ordered = sorted(deltas.items(), key=lambda item: (str(item[0][1]), str(item[0][0])))
+    now = datetime.now(timezone.utc)
+    connection.execute(
+        _counters_update(),
+        [
+            {"g_id": goal_id, "u_id": user_id, "d_total": total, "d_completed": completed, "now": now}
+            for (user_id, goal_id), (total, completed) in ordered
+        ],
+    )
+
+    # keep goals already loaded in this session in step without another round-trip
+    for (user_id, goal_id), (total, completed) in ordered:
+        goal = session.identity_map.get(inspect(Goal).identity_key_from_primary_key((goal_id,)))
+        if goal is None or goal.user_id != user_id:
+            continue
+        loaded = inspect(goal).dict
+        if "tasks_total" not in loaded or "tasks_completed" not in loaded:
+            continue
+        new_total = goal.tasks_total + total
+        new_completed = goal.tasks_completed + completed
+        set_committed_value(goal, "tasks_total", new_total)
+        set_committed_value(goal, "tasks_completed", new_completed)
+        set_committed_value(goal, "progress", progress_of(new_total, new_completed))
+        set_committed_value(goal, "updated_at", now)
+
+
+def _maintain_goal_counters(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still describe the flushed changes here
+    apply_deltas(session, session.connection(), collect_deltas(session))
+
+
+def register_listeners() -> None:
+    if not event.contains(Session, "after_flush", _maintain_goal_counters):
+        event.listen(Session, "after_flush", _maintain_goal_counters)
+
+
+async def apply_task_changes(
+    db: AsyncSession, changes: Iterable[tuple[dict[str, Any] | None, dict[str, Any] | None]]
+) -> None:
+    """Move the counters for task rows written with Core statements, which no flush sees."""
+    deltas = deltas_between(changes)
+    if deltas:
+        await db.run_sync(lambda session: apply_deltas(session, session.connection(), deltas))
+
+
+# --- reconciliation -----------------------------------------------------------
+
+
+async def reconcile_batch(db: AsyncSession, *, after: uuid.UUID | None, limit: int) -> tuple[int, int, uuid.UUID | None]:
+    """Recount one keyset batch of goals with a single grouped aggregate and fix the drifted ones.
+
+    Returns how many goals were scanned and repaired and the last goal id scanned,
+    the keyset for the next batch.
+    """
+    live_task = and_(Task.goal_id == Goal.id, Task.user_id == Goal.user_id, Task.deleted == False)  # noqa: E712
+    stmt = (
+        select(
+            Goal.id,
+            Goal.user_id,
+            Goal.tasks_total,
+            Goal.tasks_completed,
+            func.count(Task.id),
+            func.coalesce(func.sum(case((Task.status == _DONE, 1), else_=0)), 0),
+        )
+        .select_from(Goal)
+        .outerjoin(Task, live_task)
+        .where(Goal.deleted == False)  # noqa: E712
+        .group_by(Goal.id, Goal.user_id, Goal.tasks_total, Goal.tasks_completed)
+        .order_by(Goal.id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(Goal.id > after)
+    rows = (await db.execute(stmt)).all()
+    if not rows:
+        return 0, 0, after
+
+    now = datetime.now(timezone.utc)
+    drifted = [
+        {
+            "g_id": goal_id,
+            "seen_total": stored_total,
+            "seen_completed": stored_completed,
+            "total": total,
+            "completed": completed,
+            "p": progress_of(total, completed),
+            "now": now,
+        }
+        for goal_id, _, stored_total, stored_completed, total, completed in rows
+        if (stored_total, stored_completed) != (total, completed)
+    ]
+    if drifted:
+        # only overwrite counters nobody moved since the count; a concurrent
+        # writer's goal is simply left for the next run
+        await db.execute(
+            update(Goal.__table__)
+            .where(
+                Goal.id == bindparam("g_id"),
+                Goal.tasks_total == bindparam("seen_total"),
+                Goal.tasks_completed == bindparam("seen_completed"),
+            )
+            .values(
+                tasks_total=bindparam("total"),
+                tasks_completed=bindparam("completed"),
+                progress=bindparam("p"),
+                updated_at=bindparam("now"),
+            ),
+            drifted,
+        )
+        # the repaired goals read differently now: move their owners' goal list version
+        repaired = {d["g_id"] for d in drifted}
+        for user_id in {row.user_id for row in rows if row.id in repaired}:
+            mark_changed(db.sync_session, user_id, "goal")
+    return len(rows), len(drifted), rows[-1][0]
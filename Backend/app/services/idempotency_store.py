@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.logging import log
+from app.db.session import async_session_maker
+from app.infra.redis_client import get_redis
+from app.repositories import idempotency_repo
+
+
+@dataclass(frozen=True)
+class IdempotencyScope:
+    user_id: str
+    key: str
+    method: str
+    path: str
+
+    @property
+    def redis_key(self) -> str:
+        return f"idem:{self.user_id}:{self.method}:{self.path}:{self.key}"
+
+
+@dataclass(frozen=True)
+class IdempotencySnapshot:
+    status_code: int
+    body: str
+    headers: dict[str, str]
+    media_type: str | None = "application/json"
+
+
+@dataclass(frozen=True)
+class ClaimResult:
+    """``claimed`` -> run the handler; ``snapshot`` -> replay it; neither -> in flight elsewhere."""
+
+    claimed: bool
+    snapshot: IdempotencySnapshot | None = None
+    token: str | None = None
+    # the store holds no durable claim: the handler records the key in its own transaction
+    record_in_db: bool = False
+
+
+@dataclass(frozen=True)
+class IdempotencyContext:
+    """Claim made by the middleware, exposed to handlers as ``request.state.idempotency``."""
+
+    scope: IdempotencyScope
+    record_in_db: bool
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    async def claim_or_fetch(self, scope: IdempotencyScope) -> ClaimResult: ...
+
+    @abstractmethod
+    async def fetch(self, scope: IdempotencyScope) -> IdempotencySnapshot | None: ...
+
+    @abstractmethod
+    async def store(self, scope: IdempotencyScope, snapshot: IdempotencySnapshot, *, token: str | None) -> None: ...
+
+    @abstractmethod
+    async def release(self, scope: IdempotencyScope, *, token: str | None) -> None: ...
+
+
+class DbIdempotencyStore(IdempotencyStore):
+    """Snapshots in ``idempotency_keys``.
+
+    The row is inserted by ``enforce_idempotency`` in the handler's transaction,
+    so the claim commits or rolls back with the business write; the snapshot is
+    attached to it afterwards with a single UPDATE.
+    """
+
+    async def claim_or_fetch(self, scope: IdempotencyScope) -> ClaimResult:
+        snapshot = await self.fetch(scope)
+        if snapshot is not None:
+            return ClaimResult(claimed=False, snapshot=snapshot)
+        return ClaimResult(claimed=True, record_in_db=True)
+
+    async def fetch(self, scope: IdempotencyScope) -> IdempotencySnapshot | None:
+        async with async_session_maker() as db:
+            rec = await idempotency_repo.get(
+                db, user_id=uuid.UUID(scope.user_id), key=scope.key, method=scope.method, path=scope.path
+            )
+        if rec is None or rec.status_code is None or rec.response_body is None:
+            return None
+        return IdempotencySnapshot(
+            status_code=rec.status_code,
+            body=json.dumps(rec.response_body),
+            headers=dict(rec.response_headers or {}),
+        )
+
+    async def store(self, scope: IdempotencyScope, snapshot: IdempotencySnapshot, *, token: str | None) -> None:
+        try:
+            body: Any = json.loads(snapshot.body) if snapshot.body else {}
+        except ValueError:
+            body = {}
+        async with async_session_maker() as db:
+            await idempotency_repo.store_response(
+                db,
+                user_id=uuid.UUID(scope.user_id),
+                key=scope.key,
+                method=scope.method,
+                path=scope.path,
+                status_code=snapshot.status_code,
+                response_body=body if isinstance(body, dict) else {"data": body},
+                response_headers=snapshot.headers,
+            )
+            await db.commit()
+
+    async def release(self, scope: IdempotencyScope, *, token: str | None) -> None:
+        return None
+
+
+# Returns the stored value, or claims the key with an in-flight marker and returns nil.
+_CLAIM_OR_FETCH = """
+local current = redis.call('GET', KEYS[1])
+if current then
+    return current
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return false
+"""
+
+# Stores the snapshot only while the caller's in-flight marker is still there (1),
+# or once it has expired with nobody else claiming the key since (2). Returns 0
+# and leaves the key alone when another request holds or has answered it.
+_STORE = """
+local current = redis.call('GET', KEYS[1])
+if current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+if not current then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 2
+end
+return 0
+"""
+
+# Deletes the in-flight marker only if it still belongs to the caller.
+_RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisIdempotencyStore(IdempotencyStore):
+    """Redis-first snapshots with TTLs; falls back to the DB store when Redis is unavailable."""
+
+    def __init__(self, redis: Redis, *, fallback: IdempotencyStore | None = None) -> None:
+        self.redis = redis
+        self.fallback = fallback or DbIdempotencyStore()
+        self._claim = redis.register_script(_CLAIM_OR_FETCH)
+        self._store = redis.register_script(_STORE)
+        self._release = redis.register_script(_RELEASE)
+
+    async def claim_or_fetch(self, scope: IdempotencyScope) -> ClaimResult:
+        token = json.dumps({"state": "in_flight", "owner": uuid.uuid4().hex})
+        try:
+            current = await self._claim(
+                keys=[scope.redis_key],
+                args=[token, settings.IDEMPOTENCY_INFLIGHT_TTL_SECONDS * 1000],
+            )
+        except RedisError as exc:
+            log.warning("idempotency_redis_unavailable", op="claim", error=str(exc))
+            return await self.fallback.claim_or_fetch(scope)
+
+        if current is None:
+            return ClaimResult(claimed=True, token=token)
+        return ClaimResult(claimed=False, snapshot=_decode(current))
+
+    async def fetch(self, scope: IdempotencyScope) -> IdempotencySnapshot | None:
+        try:
+            return _decode(await self.redis.get(scope.redis_key))
+        except RedisError as exc:
+            log.warning("idempotency_redis_unavailable", op="fetch", error=str(exc))
+            return await self.fallback.fetch(scope)
+
+    async def store(self, scope: IdempotencyScope, snapshot: IdempotencySnapshot, *, token: str | None) -> None:
+        value = json.dumps(
+            {
+                "state": "done",
+                "status_code": snapshot.status_code,
+                "body": snapshot.body,
+                "headers": snapshot.headers,
+                "media_type": snapshot.media_type,
+            }
+        )
+        try:
+            outcome = await self._store(
+                keys=[scope.redis_key],
+                args=[token or "", value, settings.IDEMPOTENCY_TTL_SECONDS * 1000],
+            )
+        except RedisError as exc:
+            log.warning("idempotency_redis_unavailable", op="store", error=str(exc))
+            await self.fallback.store(scope, snapshot, token=token)
+            return
+        if outcome != 1:
+            # the request outlived IDEMPOTENCY_INFLIGHT_TTL_SECONDS; a retry may have run it again
+            log.warning(
+                "idempotency_claim_lost",
+                user_id=scope.user_id,
+                method=scope.method,
+                path=scope.path,
+                stored=outcome == 2,
+            )
+
+    async def release(self, scope: IdempotencyScope, *, token: str | None) -> None:
+        if token is None:
+            return
+        try:
+            await self._release(keys=[scope.redis_key], args=[token])
+        except RedisError as exc:
+            # the in-flight marker expires on its own
+            log.warning("idempotency_redis_unavailable", op="release", error=str(exc))
+
+
+def _decode(raw: str | bytes | None) -> IdempotencySnapshot | None:
+    if raw is None:
+        return None
+    data = json.loads(raw)
+    if data.get("state") != "done":
+        return None
+    return IdempotencySnapshot(
+        status_code=int(data["status_code"]),
+        body=data.get("body") or "",
+        headers=dict(data.get("headers") or {}),
+        media_type=data.get("media_type"),
+    )
+
+
+_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _store
+    if _store is None:
+        if settings.REDIS_URL:
+            _store = RedisIdempotencyStore(get_redis())
+        else:
+            _store = DbIdempotencyStore()
+    return _store
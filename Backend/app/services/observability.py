@@ -41,11 +41,159 @@ def record_push_metric(*, user_id: str, platform: str, status: str, request_id:
     )
 
 
-def record_sync_metric(*, queue_depth: int, processed: int, status: str):
+def record_sync_metric(
+    *, queue_depth: int, processed: int, status: str, failed: int = 0, lag_ms: int | None = None
+):
     log.info(
         "sync_queue_metric",
         queue_depth=queue_depth,
         processed=processed,
+        failed=failed,
+        lag_ms=lag_ms,
         status=status,
         logged_at=datetime.now(timezone.utc).isoformat(),
     )
+
+
+def record_sync_compaction(*, operations: int, compacted: int, request_id: str | None = None):
+    log.info(
+        "sync_compaction",
+        request_id=request_id,
+        operations=operations,
+        compacted=compacted,
+        ratio=round(compacted / operations, 3) if operations else 1.0,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_outbox_metric(*, shipped: int, status: str):
+    log.info(
+        "analytics_outbox_metric",
+        shipped=shipped,
+        status=status,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_reminder_metric(
+    *, claimed: int, sent: int, failed: int, expired: int, lag_ms_max: int, scheduled: int, status: str
+):
+    log.info(
+        "reminder_dispatch_metric",
+        claimed=claimed,
+        sent=sent,
+        failed=failed,
+        expired=expired,
+        lag_ms_max=lag_ms_max,
+        scheduled=scheduled,
+        status=status,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_idempotency_reaper_metric(*, deleted: int, batches: int, duration_ms: int, status: str):
+    log.info(
+        "idempotency_reaper_metric",
+        deleted=deleted,
+        batches=batches,
+        duration_ms=duration_ms,
+        status=status,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_goal_reconcile_metric(*, scanned: int, repaired: int, batches: int, duration_ms: int, status: str):
+    log.info(
+        "goal_reconcile_metric",
+        scanned=scanned,
+        repaired=repaired,
+        batches=batches,
+        duration_ms=duration_ms,
+        status=status,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_tombstone_archive_metric(
+    *, archived: int, by_entity: dict[str, int], batches: int, duration_ms: int, status: str
+):
+    log.info(
+        "tombstone_archive_metric",
+        archived=archived,
+        by_entity=by_entity,
+        batches=batches,
+        duration_ms=duration_ms,
+        status=status,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_request_db_metric(
+    *,
+    request_id: str | None,
+    route: str,
+    method: str,
+    status_code: int | None,
+    statements: int,
+    rows: int,
+    db_ms: float,
+    max_repeats: int,
+):
+    log.info(
+        "request_db_metric",
+        request_id=request_id,
+        route=route,
+        method=method,
+        status_code=status_code,
+        statements=statements,
+        rows=rows,
+        db_ms=db_ms,
+        max_repeats=max_repeats,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_response_cache_metric(
+    *, route: str, lookups: int, l1_hits: int, l2_hits: int, coalesced: int, misses: int, entries: int
+):
+    log.info(
+        "response_cache_metric",
+        route=route,
+        lookups=lookups,
+        l1_hits=l1_hits,
+        l2_hits=l2_hits,
+        coalesced=coalesced,
+        misses=misses,
+        hit_rate=round((lookups - misses) / lookups, 4) if lookups else 0.0,
+        entries=entries,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_password_hash_metric(
+    *, op: str, status: str, pending: int, queue_ms: int | None = None, run_ms: int | None = None
+):
+    log.info(
+        "password_hash_metric",
+        op=op,
+        status=status,
+        pending=pending,
+        queue_ms=queue_ms,
+        run_ms=run_ms,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def record_db_pool_metric(
+    *, pool: str, checkouts: int, wait_ms_max: int, wait_ms_avg: float, checked_out: int, overflow: int
+):
+    log.info(
+        "db_pool_metric",
+        pool=pool,
+        checkouts=checkouts,
+        wait_ms_max=wait_ms_max,
+        wait_ms_avg=wait_ms_avg,
+        checked_out=checked_out,
+        overflow=overflow,
+        logged_at=datetime.now(timezone.utc).isoformat(),
+    )
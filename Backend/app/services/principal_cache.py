@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import log
+from app.db import after_commit
+from app.infra.redis_client import get_redis
+from app.models.subscription_state import SubscriptionState
+from app.models.user import User
+
+# Everything handlers read from ``current_user``; password_hash is deliberately not cached.
+_FIELDS = (
+    "id",
+    "email",
+    "full_name",
+    "timezone",
+    "is_pro",
+    "trial_started_at",
+    "trial_ends_at",
+    "created_at",
+    "updated_at",
+    "deleted",
+)
+_DATETIME_FIELDS = {"trial_started_at", "trial_ends_at", "created_at", "updated_at"}
+
+
+class PrincipalCache:
+    """Authenticated user lookups: in-process TTL LRU in front of an optional Redis tier.
+
+    Handlers get a fresh transient ``User`` per request, so mutating it never
+    leaks into the cache. Entries are evicted when a committed session touched
+    the user or its subscription state; other processes drop their local copy
+    after ``PRINCIPAL_CACHE_TTL_SECONDS`` at the latest.
+    """
+
+    def __init__(self, *, ttl_seconds: float, max_entries: int, redis_ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: OrderedDict[uuid.UUID, tuple[float, dict[str, Any]]] = OrderedDict()
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+
+    async def get(self, user_id: uuid.UUID) -> User | None:
+        fields = self._get_local(user_id)
+        if fields is not None:
+            self._count("l1_hits")
+            return User(**fields)
+
+        fields = await self._get_remote(user_id)
+        if fields is not None:
+            self._count("l2_hits")
+            self._put_local(user_id, fields)
+            return User(**fields)
+
+        self._count("misses")
+        return None
+
+    async def put(self, user: User) -> None:
+        fields = {name: getattr(user, name) for name in _FIELDS}
+        self._put_local(user.id, fields)
+        if self._redis_enabled:
+            try:
+                await get_redis().set(_redis_key(user.id), _encode(fields), ex=self.redis_ttl_seconds)
+            except RedisError as exc:
+                log.warning("principal_cache_redis_unavailable", op="set", error=str(exc))
+
+    async def invalidate(self, user_id: uuid.UUID) -> None:
+        self.evict_local(user_id)
+        if self._redis_enabled:
+            try:
+                await get_redis().delete(_redis_key(user_id))
+            except RedisError as exc:
+                log.warning("principal_cache_redis_unavailable", op="delete", error=str(exc))
+
+    def evict_local(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def _redis_enabled(self) -> bool:
+        return bool(settings.REDIS_URL) and self.redis_ttl_seconds > 0
+
+    def _get_local(self, user_id: uuid.UUID) -> dict[str, Any] | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, fields = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return fields
+
+    def _put_local(self, user_id: uuid.UUID, fields: dict[str, Any]) -> None:
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, fields)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_remote(self, user_id: uuid.UUID) -> dict[str, Any] | None:
+        if not self._redis_enabled:
+            return None
+        try:
+            raw = await get_redis().get(_redis_key(user_id))
+        except RedisError as exc:
+            log.warning("principal_cache_redis_unavailable", op="get", error=str(exc))
+            return None
+        return _decode(raw) if raw else None
+
+    def _count(self, outcome: str) -> None:
+        self.stats[outcome] += 1
+        lookups = sum(self.stats.values())
+        if lookups % settings.PRINCIPAL_CACHE_METRIC_EVERY == 0:
+            log.info("principal_cache_metric", lookups=lookups, entries=len(self._entries), **self.stats)
+
+
+def _redis_key(user_id: uuid.UUID) -> str:
+    return f"principal:{user_id}"
+
+
+def _encode(fields: dict[str, Any]) -> str:
+    data = dict(fields, id=str(fields["id"]))
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            data[name] = data[name].isoformat()
+    return json.dumps(data)
+
+
+def _decode(raw: str) -> dict[str, Any]:
+    data = json.loads(raw)
+    data["id"] = uuid.UUID(data["id"])
+    for name in _DATETIME_FIELDS:
+        if data.get(name):
+            data[name] = datetime.fromisoformat(data[name])
+    return data
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    redis_ttl_seconds=settings.PRINCIPAL_CACHE_REDIS_TTL_SECONDS,
+)
+
+
+# --- invalidation -------------------------------------------------------------
+# Any session that flushes a change to a user or its subscription state marks the
+# user; once the transaction commits the cached principal is dropped.
+
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+def _collect_changed_principals(session: Session, flush_context) -> None:
+    changed = session.info.setdefault(_PENDING_KEY, set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+        elif isinstance(obj, SubscriptionState) and obj.user_id is not None:
+            changed.add(obj.user_id)
+
+
+def _invalidate_changed_principals(session: Session) -> None:
+    changed = session.info.pop(_PENDING_KEY, None)
+    if not changed:
+        return
+    for user_id in changed:
+        principal_cache.evict_local(user_id)
+        if principal_cache._redis_enabled:
+            # awaited by get_db before the response, like the other post-commit Redis writes
+            after_commit.defer(session, principal_cache.invalidate(user_id))
+
+
+def _discard_changed_principals(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+_LISTENERS = (
+    ("after_flush", _collect_changed_principals),
+    ("after_commit", _invalidate_changed_principals),
+    ("after_rollback", _discard_changed_principals),
+)
+
+
+def register_listeners() -> None:
+    for name, listener in _LISTENERS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
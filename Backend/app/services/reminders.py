@@ -0,0 +1,285 @@
+"""Fires ``NotificationTrigger`` reminders at their ``remind_at`` second.
+
+The dispatcher claims unsent triggers due within ``REMINDER_LOOKAHEAD_SECONDS``
+(through the partial ``ix_notification_triggers_due`` index) and leases them
+with ``locked_until`` so concurrent dispatchers never hold the same trigger.
+Claimed triggers wait on an in-memory timer wheel with one-second slots; a
+ticker wakes on each second boundary and hands that second's reminders to the
+push service, at most ``REMINDER_SEND_CONCURRENCY`` at a time. Delivered
+triggers are marked sent in batches. A trigger whose send fails, or whose
+dispatcher dies, is claimed again once its lease runs out.
+
+Triggers overdue by more than ``REMINDER_MAX_LATENESS_SECONDS`` (a backlog left
+by downtime, or from before the dispatcher existed) are marked sent without a
+push: a reminder for something long past is noise, not a reminder.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.logging import log
+from app.models.notification import NotificationTrigger
+from app.services.observability import record_reminder_metric
+from app.services.push_service import PushService, push_service
+from app.services.sync_handlers import normalize_to_utc
+
+
+@dataclass(frozen=True)
+class DueReminder:
+    id: uuid.UUID
+    user_id: uuid.UUID
+    entity: str
+    entity_id: uuid.UUID
+    lead_minutes: int
+    remind_at: datetime
+
+
+class TimerWheel:
+    """Reminders bucketed by the epoch second they fire in.
+
+    ``pop_due`` walks the slots from the last second it fired up to now, so each
+    tick costs one dict lookup per elapsed second however many reminders are
+    waiting. Reminders scheduled for a second that has already fired go into the
+    next one.
+    """
+
+    def __init__(self, *, now: float) -> None:
+        self._slots: dict[int, list[DueReminder]] = defaultdict(list)
+        self._ids: set[uuid.UUID] = set()
+        self._fired_through = math.floor(now)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def schedule(self, reminder: DueReminder) -> bool:
+        if reminder.id in self._ids:
+            return False
+        # round up: a reminder never fires before its remind_at
+        second = max(math.ceil(reminder.remind_at.timestamp()), self._fired_through + 1)
+        self._slots[second].append(reminder)
+        self._ids.add(reminder.id)
+        return True
+
+    def pop_due(self, now: float) -> list[DueReminder]:
+        due: list[DueReminder] = []
+        current = math.floor(now)
+        for second in range(self._fired_through + 1, current + 1):
+            due.extend(self._slots.pop(second, ()))
+        self._fired_through = max(self._fired_through, current)
+        self._ids.difference_update(r.id for r in due)
+        return due
+
+    def drain(self) -> list[DueReminder]:
+        waiting = [r for slot in self._slots.values() for r in slot]
+        self._slots.clear()
+        self._ids.clear()
+        return waiting
+
+
+class ReminderDispatcher:
+    def __init__(self, session_factory: async_sessionmaker, *, push: PushService = push_service) -> None:
+        self._factory = session_factory
+        self._push = push
+        self._wheel = TimerWheel(now=time.time())
+        self._semaphore = asyncio.Semaphore(max(1, settings.REMINDER_SEND_CONCURRENCY))
+        self._inflight: set[asyncio.Task] = set()
+        self._sent: list[uuid.UUID] = []
+        self._claimed = 0
+        self._failed = 0
+        self._expired = 0
+        self._lag_ms_max = 0
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Dispatch until ``stop`` is set, then flush marks and release unfired leases."""
+        claimer = asyncio.create_task(self._claim_loop(stop))
+        try:
+            await self._tick_loop(stop)
+        finally:
+            claimer.cancel()
+            await asyncio.gather(claimer, return_exceptions=True)
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+            async with self._factory() as db:
+                await self._flush(db)
+                await self._release(db, [r.id for r in self._wheel.drain()])
+
+    async def _claim_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                async with self._factory() as db:
+                    await self._flush(db)
+                    self._expired += await self._expire(db, now=datetime.now(timezone.utc))
+                    while True:
+                        claimed = await self._claim(db, now=datetime.now(timezone.utc))
+                        self._claimed += sum(self._wheel.schedule(r) for r in claimed)
+                        if len(claimed) < settings.REMINDER_CLAIM_BATCH_SIZE:
+                            break
+            except Exception as exc:  # keep the wheel ticking; the next pass retries
+                log.warning("reminder_claim_failed", error=str(exc))
+            await _sleep_unless(stop, settings.REMINDER_CLAIM_INTERVAL_SECONDS)
+
+    async def _tick_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            now = time.time()
+            await _sleep_unless(stop, math.floor(now) + 1 - now)
+            for reminder in self._wheel.pop_due(time.time()):
+                task = asyncio.create_task(self._send(reminder))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _claim(self, db: AsyncSession, *, now: datetime) -> list[DueReminder]:
+        candidates = (
+            select(NotificationTrigger.id)
+            .where(
+                NotificationTrigger.sent.is_(False),
+                NotificationTrigger.remind_at >= now - timedelta(seconds=settings.REMINDER_MAX_LATENESS_SECONDS),
+                NotificationTrigger.remind_at <= now + timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS),
+                or_(NotificationTrigger.locked_until.is_(None), NotificationTrigger.locked_until < now),
+            )
+            .order_by(NotificationTrigger.remind_at)
+            .limit(settings.REMINDER_CLAIM_BATCH_SIZE)
+        )
+        if db.bind.dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        # SQLite has no row locks: the UPDATE ... RETURNING itself is atomic under the database write lock
+
+        # the lease outlives the lookahead, so a claimed trigger stays ours until it fires
+        lease = timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS + settings.REMINDER_LEASE_SECONDS)
+        res = await db.execute(
+            update(NotificationTrigger)
+            .where(NotificationTrigger.id.in_(candidates))
+            .values(locked_until=now + lease)
+            .returning(
+                NotificationTrigger.id,
+                NotificationTrigger.user_id,
+                NotificationTrigger.entity,
+                NotificationTrigger.entity_id,
+                NotificationTrigger.lead_minutes,
+                NotificationTrigger.remind_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        rows = res.all()
+        await db.commit()
+        return [
+            DueReminder(
+                id=row.id,
+                user_id=row.user_id,
+                entity=row.entity,
+                entity_id=row.entity_id,
+                lead_minutes=row.lead_minutes,
+                remind_at=normalize_to_utc(row.remind_at),
+            )
+            for row in rows
+        ]
+
+    async def _expire(self, db: AsyncSession, *, now: datetime) -> int:
+        """Mark unleased triggers older than the max lateness sent, in batches; returns how many."""
+        expired = 0
+        while True:
+            stale = (
+                select(NotificationTrigger.id)
+                .where(
+                    NotificationTrigger.sent.is_(False),
+                    NotificationTrigger.remind_at < now - timedelta(seconds=settings.REMINDER_MAX_LATENESS_SECONDS),
+                    or_(NotificationTrigger.locked_until.is_(None), NotificationTrigger.locked_until < now),
+                )
+                .limit(settings.REMINDER_CLAIM_BATCH_SIZE)
+            )
+            res = await db.execute(
+                update(NotificationTrigger)
+                .where(NotificationTrigger.id.in_(stale))
+                .values(sent=True, locked_until=None, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            expired += res.rowcount
+            if res.rowcount < settings.REMINDER_CLAIM_BATCH_SIZE:
+                return expired
+
+    async def _send(self, reminder: DueReminder) -> None:
+        async with self._semaphore:
+            lag_ms = int((time.time() - reminder.remind_at.timestamp()) * 1000)
+            self._lag_ms_max = max(self._lag_ms_max, lag_ms)
+            try:
+                async with self._factory() as db:
+                    await self._push.send_notification(
+                        db,
+                        user_id=reminder.user_id,
+                        title="LifeMerge reminder",
+                        body=_reminder_body(reminder),
+                        data={
+                            "type": "reminder",
+                            "trigger_id": str(reminder.id),
+                            "entity": reminder.entity,
+                            "entity_id": str(reminder.entity_id),
+                        },
+                        collapse_key=f"reminder-{reminder.id}",
+                    )
+            except Exception as exc:  # left unsent: claimed again when the lease runs out
+                self._failed += 1
+                log.warning("reminder_send_failed", trigger_id=str(reminder.id), error=str(exc))
+                return
+            self._sent.append(reminder.id)
+
+    async def _flush(self, db: AsyncSession) -> None:
+        sent, self._sent = self._sent, []
+        now = datetime.now(timezone.utc)
+        try:
+            for start in range(0, len(sent), settings.REMINDER_MARK_BATCH_SIZE):
+                await db.execute(
+                    update(NotificationTrigger)
+                    .where(NotificationTrigger.id.in_(sent[start : start + settings.REMINDER_MARK_BATCH_SIZE]))
+                    .values(sent=True, locked_until=None, updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+        except Exception:
+            # delivered already: keep them for the next flush rather than resending after the lease
+            self._sent[:0] = sent
+            raise
+
+        if self._claimed or sent or self._failed or self._expired:
+            record_reminder_metric(
+                claimed=self._claimed,
+                sent=len(sent),
+                failed=self._failed,
+                expired=self._expired,
+                lag_ms_max=self._lag_ms_max,
+                scheduled=len(self._wheel),
+                status="dispatched",
+            )
+        self._claimed = self._failed = self._expired = self._lag_ms_max = 0
+
+    async def _release(self, db: AsyncSession, trigger_ids: list[uuid.UUID]) -> None:
+        if not trigger_ids:
+            return
+        await db.execute(
+            update(NotificationTrigger)
+            .where(NotificationTrigger.id.in_(trigger_ids), NotificationTrigger.sent.is_(False))
+            .values(locked_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+def _reminder_body(reminder: DueReminder) -> str:
+    if reminder.lead_minutes > 0:
+        return f"Your {reminder.entity} starts in {reminder.lead_minutes} min"
+    return f"Your {reminder.entity} is due now"
+
+
+async def _sleep_unless(stop: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=max(seconds, 0))
+    except asyncio.TimeoutError:
+        pass
@@ -0,0 +1,295 @@
+"""Response cache for read-heavy GET endpoints: in-process TTL LRU in front of Redis.
+
+Entries are keyed by user, route template, normalized query string and the
+user's current version of every entity the response is built from. Writes never
+delete entries: committing a change to a task, subtask, goal, plan, calendar
+event or transaction bumps the user's version of that entity, so later lookups
+use a fresh key and stale entries simply age out. The same versions key the list
+ETags (app.api.conditional). Versions live in Redis when it is configured
+(shared by every worker) and in-process otherwise.
+
+A missing entry is computed once: concurrent requests in this process await the
+same computation, and across processes a short Redis lock lets one worker
+compute while the others poll the shared tier.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Iterable
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import log
+from app.db import after_commit
+from app.infra.redis_client import get_redis
+from app.services.observability import record_response_cache_metric
+
+# which cached entities a committed row change affects, by table; goal progress is
+# derived from tasks, so task writes invalidate goals as well
+_TABLE_ENTITIES: dict[str, tuple[str, ...]] = {
+    "tasks": ("task", "goal"),
+    "subtasks": ("subtask",),
+    "goals": ("goal",),
+    "ai_plan_runs": ("plan",),
+    "calendar_events": ("event",),
+    "finance_transactions": ("finance",),
+}
+
+_LOCK_POLL_SECONDS = 0.05
+
+
+class ResponseCache:
+    def __init__(self, *, ttl_seconds: float, max_entries: int, redis_ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._versions: dict[tuple[str, str], int] = defaultdict(int)
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._epoch = uuid.uuid4().hex[:8]
+        self.stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"l1_hits": 0, "l2_hits": 0, "coalesced": 0, "misses": 0}
+        )
+
+    async def get_or_compute(
+        self,
+        request: Request,
+        *,
+        user_id: uuid.UUID,
+        entities: tuple[str, ...],
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """The JSON-ready payload for this request, computed by ``compute`` on a miss."""
+        route = _route_of(request)
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return jsonable_encoder(await compute())
+
+        key = await self._key(request, route=route, user_id=user_id, entities=entities)
+        payload = self._get_local(key)
+        if payload is not None:
+            self._count(route, "l1_hits")
+            return payload
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(route, "coalesced")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            payload, outcome = await self._load(key, compute)
+            self._count(route, outcome)
+            future.set_result(payload)
+            return payload
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise it; nobody else has to retrieve it
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def versions(self, user_id: uuid.UUID, entities: tuple[str, ...]) -> list[int]:
+        """The user's current version of each entity; every committed write moves it."""
+        return await self._current_versions(user_id, entities)
+
+    async def version_tag(self, user_id: uuid.UUID, entities: tuple[str, ...]) -> str:
+        """The user's current versions of ``entities`` as one opaque tag (list ETags).
+
+        In-process versions restart from zero and differ between workers, so the
+        tag then carries this process's epoch: it never matches one issued elsewhere.
+        """
+        versions, shared = await self._read_versions(user_id, entities)
+        tag = ".".join(map(str, versions))
+        return tag if shared else f"{self._epoch}:{tag}"
+
+    def bump_local(self, user_id: uuid.UUID, entities: Iterable[str]) -> None:
+        for entity in entities:
+            self._versions[(str(user_id), entity)] += 1
+
+    async def bump_remote(self, user_id: uuid.UUID, entities: Iterable[str]) -> None:
+        if not self._redis_enabled:
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for entity in entities:
+                    pipe.incr(_version_key(user_id, entity))
+                await pipe.execute()
+        except RedisError as exc:
+            log.warning("response_cache_redis_unavailable", op="incr", error=str(exc))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions.clear()
+
+    @property
+    def _redis_enabled(self) -> bool:
+        return bool(settings.REDIS_URL) and self.redis_ttl_seconds > 0
+
+    async def _key(self, request: Request, *, route: str, user_id: uuid.UUID, entities: tuple[str, ...]) -> str:
+        versions = await self._current_versions(user_id, entities)
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        digest = hashlib.sha1(f"{route}|{request.url.path}|{query}".encode()).hexdigest()[:20]
+        return f"rc:{user_id}:{'.'.join(map(str, versions))}:{digest}"
+
+    async def _current_versions(self, user_id: uuid.UUID, entities: tuple[str, ...]) -> list[int]:
+        versions, _ = await self._read_versions(user_id, entities)
+        return versions
+
+    async def _read_versions(self, user_id: uuid.UUID, entities: tuple[str, ...]) -> tuple[list[int], bool]:
+        """The versions, and whether they came from Redis (shared by every worker)."""
+        if self._redis_enabled:
+            try:
+                raw = await get_redis().mget([_version_key(user_id, entity) for entity in entities])
+                return [int(value or 0) for value in raw], True
+            except RedisError as exc:
+                log.warning("response_cache_redis_unavailable", op="mget", error=str(exc))
+        return [self._versions[(str(user_id), entity)] for entity in entities], False
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[dict[str, Any]]]) -> tuple[Any, str]:
+        payload = await self._get_remote(key)
+        if payload is not None:
+            self._put_local(key, payload)
+            return payload, "l2_hits"
+
+        if not await self._acquire(key):
+            # another worker is computing this entry: wait for it to land in Redis
+            deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_SECONDS
+            while time.monotonic() < deadline:
+                await asyncio.sleep(_LOCK_POLL_SECONDS)
+                payload = await self._get_remote(key)
+                if payload is not None:
+                    self._put_local(key, payload)
+                    return payload, "coalesced"
+
+        payload = jsonable_encoder(await compute())
+        self._put_local(key, payload)
+        await self._put_remote(key, payload)
+        return payload, "misses"
+
+    async def _acquire(self, key: str) -> bool:
+        if not self._redis_enabled:
+            return True
+        try:
+            ttl_ms = int(settings.RESPONSE_CACHE_LOCK_SECONDS * 1000)
+            return bool(await get_redis().set(f"{key}:lock", "1", nx=True, px=ttl_ms))
+        except RedisError as exc:
+            log.warning("response_cache_redis_unavailable", op="lock", error=str(exc))
+            return True
+
+    def _get_local(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def _put_local(self, key: str, payload: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _get_remote(self, key: str) -> Any | None:
+        if not self._redis_enabled:
+            return None
+        try:
+            raw = await get_redis().get(key)
+        except RedisError as exc:
+            log.warning("response_cache_redis_unavailable", op="get", error=str(exc))
+            return None
+        return json.loads(raw) if raw else None
+
+    async def _put_remote(self, key: str, payload: Any) -> None:
+        if not self._redis_enabled:
+            return
+        try:
+            await get_redis().set(key, json.dumps(payload), ex=self.redis_ttl_seconds)
+        except RedisError as exc:
+            log.warning("response_cache_redis_unavailable", op="set", error=str(exc))
+
+    def _count(self, route: str, outcome: str) -> None:
+        stats = self.stats[route]
+        stats[outcome] += 1
+        lookups = sum(stats.values())
+        if lookups % settings.RESPONSE_CACHE_METRIC_EVERY == 0:
+            record_response_cache_metric(route=route, lookups=lookups, entries=len(self._entries), **stats)
+
+
+def _route_of(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
+
+def _version_key(user_id: uuid.UUID, entity: str) -> str:
+    return f"rcv:{user_id}:{entity}"
+
+
+response_cache = ResponseCache(
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    redis_ttl_seconds=settings.RESPONSE_CACHE_REDIS_TTL_SECONDS,
+)
+
+
+# --- invalidation -------------------------------------------------------------
+# ORM changes are picked up at flush; Core writes (bulk task endpoint, planner
+# and subtask repositories) report theirs with mark_changed. Versions are bumped
+# once the transaction commits: in-process right away, in Redis before get_db
+# hands the response back (app.db.after_commit).
+
+_PENDING_KEY = "response_cache_changed"
+
+
+def mark_changed(session: Session, user_id: uuid.UUID, *entities: str) -> None:
+    changed = session.info.setdefault(_PENDING_KEY, defaultdict(set))
+    changed[user_id].update(entities)
+
+
+def _collect_changed_entities(session: Session, flush_context) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        entities = _TABLE_ENTITIES.get(getattr(obj, "__tablename__", None))
+        user_id = getattr(obj, "user_id", None)
+        if entities and user_id is not None:
+            mark_changed(session, user_id, *entities)
+
+
+def _bump_changed_entities(session: Session) -> None:
+    changed = session.info.pop(_PENDING_KEY, None)
+    if not changed:
+        return
+    for user_id, entities in changed.items():
+        response_cache.bump_local(user_id, entities)
+        if response_cache._redis_enabled:
+            after_commit.defer(session, response_cache.bump_remote(user_id, entities))
+
+
+def _discard_changed_entities(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+_LISTENERS = (
+    ("after_flush", _collect_changed_entities),
+    ("after_commit", _bump_changed_entities),
+    ("after_rollback", _discard_changed_entities),
+)
+
+
+def register_listeners() -> None:
+    for name, listener in _LISTENERS:
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import uuid
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from typing import Any, Callable, ClassVar
+
+from app.models.calendar_event import CalendarEvent
+from app.models.finance import FinanceAccount, FinanceTransaction
+from app.models.goal import Goal
+from app.models.subtask import Subtask
+from app.models.task import Task
+from app.schemas.productivity import CalendarEventOut, FinanceTransactionOut, GoalOut
+from app.schemas.subtasks import SubtaskOut
+from app.schemas.tasks import ALLOWED_STATUSES, TaskOut
+
+
+def normalize_to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _to_datetime(value: Any) -> datetime | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        raise ValueError("datetime expected")
+    return normalize_to_utc(value)
+
+
+def _to_date(value: Any) -> date | None:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _to_uuid(value: Any) -> uuid.UUID | None:
+    if value is None:
+        return None
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _to_uuid_list(value: Any) -> list[uuid.UUID]:
+    return [_to_uuid(v) for v in (value or [])]
+
+
+def _to_int(value: Any) -> int | None:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError("int expected")
+    return int(value)
+
+
+def _to_float(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def _to_str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def _to_bool(value: Any) -> bool:
+    # offline clients send null and 0/1 for flags; the pre-registry sync accepted both
+    return False if value is None else bool(value)
+
+
+class SyncEntityHandler(ABC):
+    """Describes how one entity type is applied by batch sync.
+
+    ``fields`` maps every client-writable attribute to a coercer for raw JSON
+    values; ``references`` lists foreign keys that must point to rows owned by
+    the same user (checked with one bulk query per referenced model).
+    """
+
+    entity: ClassVar[str]
+    model: ClassVar[type]
+    fields: ClassVar[dict[str, Callable[[Any], Any]]]
+    required_on_create: ClassVar[tuple[str, ...]] = ()
+    references: ClassVar[dict[str, type]] = {}
+    defaults: ClassVar[dict[str, Any]] = {}
+
+    def coerce(self, data: dict[str, Any]) -> dict[str, Any]:
+        values: dict[str, Any] = {}
+        for field, coercer in self.fields.items():
+            if field not in data:
+                continue
+            try:
+                values[field] = coercer(data[field])
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid value for '{field}'") from exc
+        return values
+
+    def validate(self, values: dict[str, Any], existing: Any | None) -> str | None:
+        """Return an error reason, or None when the merged values are valid."""
+        return None
+
+    def build(self, *, user_id: uuid.UUID, obj_id: uuid.UUID | None, values: dict[str, Any], created_at: datetime, updated_at: datetime) -> Any:
+        # explicit nulls in the payload must not erase server-side defaults on create
+        explicit = {k: v for k, v in values.items() if v is not None or k not in self.defaults}
+        return self.model(
+            id=obj_id or uuid.uuid4(),
+            user_id=user_id,
+            **{"deleted": False, **self.defaults, **explicit},
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+
+    def apply(self, obj: Any, values: dict[str, Any], *, updated_at: datetime) -> None:
+        for field, value in values.items():
+            setattr(obj, field, value)
+        obj.updated_at = updated_at
+
+    @abstractmethod
+    def serialize(self, obj: Any) -> dict[str, Any]:  # pragma: no cover - interface contract
+        raise NotImplementedError
+
+
+class TaskSyncHandler(SyncEntityHandler):
+    entity = "task"
+    model = Task
+    fields = {
+        "title": _to_str,
+        "description": _to_str,
+        "goal_id": _to_uuid,
+        "due_at": _to_datetime,
+        "priority": _to_int,
+        "estimated_minutes": _to_int,
+        "energy_level": _to_int,
+        "status": _to_str,
+        "deleted": _to_bool,
+    }
+    required_on_create = ("title",)
+    defaults = {"status": "todo"}
+
+    def validate(self, values: dict[str, Any], existing: Any | None) -> str | None:
+        status = values.get("status")
+        if status and status not in ALLOWED_STATUSES:
+            return "Unsupported status value"
+        return None
+
+    def serialize(self, obj: Any) -> dict[str, Any]:
+        return TaskOut.model_validate(obj).model_dump()
+
+
+class CalendarEventSyncHandler(SyncEntityHandler):
+    entity = "event"
+    model = CalendarEvent
+    fields = {
+        "title": _to_str,
+        "start_at": _to_datetime,
+        "end_at": _to_datetime,
+        "recurrence": _to_str,
+        "parallel_with": _to_uuid_list,
+        "deleted": _to_bool,
+    }
+    required_on_create = ("title", "start_at", "end_at")
+
+    def validate(self, values: dict[str, Any], existing: Any | None) -> str | None:
+        start_at = values.get("start_at", getattr(existing, "start_at", None))
+        end_at = values.get("end_at", getattr(existing, "end_at", None))
+        if start_at and end_at and normalize_to_utc(end_at) <= normalize_to_utc(start_at):
+            return "end_at must be after start_at"
+        return None
+
+    def serialize(self, obj: Any) -> dict[str, Any]:
+        out = CalendarEventOut.model_validate(obj, from_attributes=True).model_dump()
+        return {**out, "updated_at": obj.updated_at, "deleted": obj.deleted}
+
+
+class FinanceTransactionSyncHandler(SyncEntityHandler):
+    entity = "finance"
+    model = FinanceTransaction
+    fields = {
+        "account_id": _to_uuid,
+        "type": _to_str,
+        "amount": _to_float,
+        "currency": _to_str,
+        "category": _to_str,
+        "occurred_at": _to_datetime,
+        "recurring": _to_bool,
+        "note": _to_str,
+        "deleted": _to_bool,
+    }
+    required_on_create = ("account_id", "type", "amount", "category", "occurred_at")
+    references = {"account_id": FinanceAccount}
+    defaults = {"currency": "USD", "recurring": False}
+
+    def validate(self, values: dict[str, Any], existing: Any | None) -> str | None:
+        if "type" in values and values["type"] not in {"income", "expense"}:
+            return "Unsupported transaction type"
+        if "amount" in values and (values["amount"] is None or values["amount"] <= 0):
+            return "Amount must be positive"
+        if "currency" in values and (not values["currency"] or len(values["currency"]) != 3):
+            return "Currency must be a 3-letter code"
+        return None
+
+    def serialize(self, obj: Any) -> dict[str, Any]:
+        out = FinanceTransactionOut.model_validate(obj, from_attributes=True).model_dump()
+        return {**out, "account_id": obj.account_id, "updated_at": obj.updated_at, "deleted": obj.deleted}
+
+
+class GoalSyncHandler(SyncEntityHandler):
+    entity = "goal"
+    model = Goal
+    fields = {
+        "title": _to_str,
+        "description": _to_str,
+        "target_date": _to_date,
+        "deleted": _to_bool,
+    }
+    required_on_create = ("title",)
+    defaults = {"progress": 0.0, "tasks_total": 0, "tasks_completed": 0}
+
+    def serialize(self, obj: Any) -> dict[str, Any]:
+        out = GoalOut.model_validate(obj, from_attributes=True).model_dump()
+        return {**out, "updated_at": obj.updated_at, "deleted": obj.deleted}
+
+
+class SubtaskSyncHandler(SyncEntityHandler):
+    entity = "subtask"
+    model = Subtask
+    fields = {
+        "task_id": _to_uuid,
+        "title": _to_str,
+        "done": _to_bool,
+        "deleted": _to_bool,
+    }
+    required_on_create = ("task_id", "title")
+    references = {"task_id": Task}
+    defaults = {"done": False}
+
+    def serialize(self, obj: Any) -> dict[str, Any]:
+        return SubtaskOut.model_validate(obj).model_dump()
+
+
+_HANDLERS: dict[str, SyncEntityHandler] = {
+    handler.entity: handler
+    for handler in (
+        TaskSyncHandler(),
+        CalendarEventSyncHandler(),
+        FinanceTransactionSyncHandler(),
+        GoalSyncHandler(),
+        SubtaskSyncHandler(),
+    )
+}
+
+
+def get_sync_handler(entity: str) -> SyncEntityHandler | None:
+    return _HANDLERS.get(entity)
+
+
+def register_sync_handler(handler: SyncEntityHandler) -> None:
+    _HANDLERS[handler.entity] = handler
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import tasks_repo
+from app.schemas.tasks import TaskBulkOperation, TaskBulkResult, TaskOut
+from app.services.goal_counters import apply_task_changes
+from app.services.response_cache import mark_changed
+from app.services.sync_handlers import normalize_to_utc
+
+
+async def apply_task_bulk(
+    db: AsyncSession, *, user_id: uuid.UUID, operations: list[TaskBulkOperation]
+) -> list[TaskBulkResult]:
+    """Apply create/update/delete operations on a user's tasks with a fixed number of statements.
+
+    Every referenced task is loaded (and on Postgres locked) by one SELECT and the
+    operations are applied in order to those rows in memory. The outcome is written
+    with one INSERT, one executemany UPDATE and one goal counter update, however
+    many operations there are. Each operation gets its own result; a conflicting or
+    invalid one does not stop the rest. Updates and deletes must carry the
+    ``updated_at`` the client last saw and conflict if the task changed since,
+    including by an earlier operation of the same request.
+    """
+    now = datetime.now(timezone.utc)
+    stored = await tasks_repo.get_rows_for_update(
+        db,
+        user_id=user_id,
+        task_ids={op.id for op in operations if op.action != "create" and op.id is not None},
+    )
+    rows = {task_id: dict(row) for task_id, row in stored.items()}
+    created: dict[uuid.UUID, dict[str, Any]] = {}
+    changed: set[uuid.UUID] = set()
+    results: list[TaskBulkResult] = []
+
+    for op in operations:
+        if op.action == "create":
+            if op.data is None or op.data.title is None:
+                results.append(_result(op, status="invalid", reason="data.title is required"))
+                continue
+            row = _new_row(user_id, op, now=now)
+            created[row["id"]] = row
+            results.append(_result(op, status="applied", task_id=row["id"], row=row))
+            continue
+
+        if op.id is None or op.updated_at is None:
+            results.append(_result(op, status="invalid", reason="id and updated_at are required"))
+            continue
+        row = rows.get(op.id)
+        if row is None or row["deleted"]:
+            results.append(_result(op, status="not_found", reason="Task not found"))
+            continue
+        # against the running row: a second operation on the same task must have seen the first
+        if normalize_to_utc(row["updated_at"]) != normalize_to_utc(op.updated_at):
+            results.append(_result(op, status="conflict", reason="Task version conflict", row=row))
+            continue
+
+        if op.action == "update":
+            row.update(op.data.model_dump(exclude_none=True) if op.data else {})
+        else:
+            row["deleted"] = True
+        row["updated_at"] = now
+        changed.add(op.id)
+        results.append(_result(op, status="applied", row=row))
+
+    await tasks_repo.insert_rows(db, list(created.values()))
+    await tasks_repo.update_rows(db, [rows[task_id] for task_id in sorted(changed)])
+    await apply_task_changes(
+        db,
+        [(None, row) for row in created.values()] + [(stored[task_id], rows[task_id]) for task_id in changed],
+    )
+    if created or changed:
+        mark_changed(db.sync_session, user_id, "task", "goal")
+    return results
+
+
+def _new_row(user_id: uuid.UUID, op: TaskBulkOperation, *, now: datetime) -> dict[str, Any]:
+    data = op.data
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "title": data.title,
+        "description": data.description,
+        "status": data.status or "todo",
+        "priority": data.priority,
+        "estimated_minutes": data.estimated_minutes,
+        "energy_level": data.energy_level,
+        "goal_id": data.goal_id,
+        "due_at": data.due_at,
+        "created_at": now,
+        "updated_at": now,
+        "deleted": False,
+    }
+
+
+def _result(
+    op: TaskBulkOperation,
+    *,
+    status: str,
+    reason: str | None = None,
+    task_id: uuid.UUID | None = None,
+    row: dict[str, Any] | None = None,
+) -> TaskBulkResult:
+    return TaskBulkResult(
+        action=op.action,
+        id=task_id or op.id,
+        status=status,
+        reason=reason,
+        task=TaskOut.model_validate(row) if row is not None else None,
+    )
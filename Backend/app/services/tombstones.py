@@ -0,0 +1,167 @@
+"""Archival of soft-deleted rows and the sync horizon that goes with it.
+
+Deleted entities stay in their hot tables as ``deleted = true`` tombstones so
+delta sync (``updated_from``) can report the deletion. Once a tombstone is older
+than ``TOMBSTONE_RETENTION_DAYS`` it is moved, with its child rows, into
+``tombstone_archive``. Before any tombstone is moved the entity's sync horizon is
+raised to the archival cutoff: a client asking for changes since an earlier
+point could miss archived deletions, so it is told to resync from scratch.
+"""
+from __future__ import annotations
+
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, Sequence
+
+from sqlalchemy import Boolean, DateTime, column, delete, insert, select, table, text, true
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.tombstone import SyncHorizon, TombstoneArchive
+from app.services.sync_handlers import normalize_to_utc
+
+
+@dataclass(frozen=True)
+class TombstoneSpec:
+    entity: str  # sync entity name, the key of its horizon
+    table: str
+    children: tuple[tuple[str, str], ...] = ()  # (table, foreign key column) archived with the parent
+
+
+# standalone subtask tombstones go before tasks, which take their remaining subtasks along
+ARCHIVED: tuple[TombstoneSpec, ...] = (
+    TombstoneSpec("subtask", "subtasks"),
+    TombstoneSpec("task", "tasks", children=(("subtasks", "task_id"),)),
+    TombstoneSpec("goal", "goals"),
+    TombstoneSpec("event", "calendar_events"),
+    TombstoneSpec("finance", "finance_transactions"),
+    TombstoneSpec("inbox", "inbox_items"),
+    TombstoneSpec("plan", "ai_plan_runs", children=(("planner_conflicts", "plan_id"), ("planner_slots", "plan_id"))),
+)
+
+
+# --- sync horizon -------------------------------------------------------------
+
+
+async def get_horizon(db: AsyncSession, entity: str) -> datetime | None:
+    res = await db.execute(select(SyncHorizon.horizon).where(SyncHorizon.entity == entity))
+    horizon = res.scalar_one_or_none()
+    return normalize_to_utc(horizon) if horizon is not None else None
+
+
+async def get_horizons(db: AsyncSession) -> dict[str, datetime]:
+    res = await db.execute(select(SyncHorizon.entity, SyncHorizon.horizon))
+    return {entity: normalize_to_utc(horizon) for entity, horizon in res.all()}
+
+
+def predates_horizon(updated_from: datetime | None, horizon: datetime | None) -> bool:
+    """Whether deltas since ``updated_from`` may be missing archived deletions."""
+    if updated_from is None or horizon is None:
+        return False
+    return normalize_to_utc(updated_from) < horizon
+
+
+async def advance_horizon(db: AsyncSession, entity: str, cutoff: datetime) -> datetime:
+    """Move the entity's horizon up to ``cutoff``; it never moves back."""
+    now = datetime.now(timezone.utc)
+    current = await db.get(SyncHorizon, entity, with_for_update=True)
+    if current is None:
+        db.add(SyncHorizon(entity=entity, horizon=cutoff, updated_at=now))
+        await db.flush()
+        return cutoff
+    if normalize_to_utc(current.horizon) < cutoff:
+        current.horizon = cutoff
+        current.updated_at = now
+        await db.flush()
+    return normalize_to_utc(current.horizon)
+
+
+# --- archival -----------------------------------------------------------------
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, memoryview)):
+        return bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+def _payload(names: Sequence[str], values: Sequence[Any]) -> dict[str, Any]:
+    return {name: _jsonable(value) for name, value in zip(names, values)}
+
+
+async def archive_batch(db: AsyncSession, spec: TombstoneSpec, *, cutoff: datetime, limit: int) -> int:
+    """Move up to ``limit`` of the oldest tombstones updated before ``cutoff`` into the archive.
+
+    Rows are read oldest-first over the partial ``(updated_at) WHERE deleted``
+    index, copied whole (``SELECT *``, so no model is needed) and deleted together
+    with their children; the caller commits. Returns how many entities moved.
+    """
+    src = table(
+        spec.table,
+        column("id", UUID(as_uuid=True)),
+        column("user_id", UUID(as_uuid=True)),
+        column("updated_at", DateTime(timezone=True)),
+        column("deleted", Boolean),
+    )
+    stmt = (
+        select(src.c.id, src.c.user_id, src.c.updated_at, text("*"))
+        .select_from(src)
+        .where(src.c.deleted == true(), src.c.updated_at < cutoff)
+        .order_by(src.c.updated_at)
+        .limit(limit)
+    )
+    if db.bind.dialect.name == "postgresql":
+        stmt = stmt.with_for_update(skip_locked=True)
+    res = await db.execute(stmt)
+    names = list(res.keys())[3:]
+    rows = res.all()
+    if not rows:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    owners = {row[0]: (row[1], row[2]) for row in rows}
+    archived = [
+        {
+            "source_table": spec.table,
+            "id": row_id,
+            "user_id": user_id,
+            "deleted_at": deleted_at,
+            "archived_at": now,
+            "payload": _payload(names, values),
+        }
+        for row_id, user_id, deleted_at, *values in rows
+    ]
+
+    ids = list(owners)
+    children = []
+    for child_table, fk in spec.children:
+        child = table(child_table, column("id", UUID(as_uuid=True)), column(fk, UUID(as_uuid=True)))
+        res = await db.execute(select(child.c.id, child.c[fk], text("*")).select_from(child).where(child.c[fk].in_(ids)))
+        child_names = list(res.keys())[2:]
+        for child_id, parent_id, *values in res.all():
+            user_id, deleted_at = owners[parent_id]
+            archived.append(
+                {
+                    "source_table": child_table,
+                    "id": child_id,
+                    "user_id": user_id,
+                    "deleted_at": deleted_at,
+                    "archived_at": now,
+                    "payload": _payload(child_names, values),
+                }
+            )
+        children.append(delete(child).where(child.c[fk].in_(ids)))
+
+    await db.execute(insert(TombstoneArchive.__table__), archived)
+    for stmt in children:
+        await db.execute(stmt)
+    await db.execute(delete(src).where(src.c.id.in_(ids), src.c.deleted == true()))
+    return len(rows)
@@ -0,0 +1,81 @@
+"""Latency of an unrelated endpoint while a burst of logins is hashing passwords.
+
+Compares bcrypt called inline on the event loop with the bounded
+``password_hasher`` executor. Runs in-process through httpx's ASGI transport.
+
+    python -m benchmarks.auth_hashing_load [--logins 20] [--pings 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.security import hash_password, password_hasher, verify_password
+
+
+def _build_app(*, offload: bool, password_hash: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        if offload:
+            ok = await password_hasher.verify("correct horse", password_hash)
+        else:
+            ok = verify_password("correct horse", password_hash)
+        return {"ok": ok}
+
+    @app.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    return app
+
+
+async def _measure(app: FastAPI, *, logins: int, pings: int) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        latencies: list[float] = []
+
+        async def ping_loop() -> None:
+            # fixed-rate schedule measured from the intended start, so time spent
+            # waiting for a blocked event loop counts (no coordinated omission)
+            interval = 0.005
+            origin = time.perf_counter()
+            for i in range(pings):
+                intended = origin + i * interval
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - intended) * 1000)
+
+        burst = [client.post("/login") for _ in range(logins)]
+        await asyncio.gather(ping_loop(), *burst)
+        return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<22} p50={statistics.median(ordered):7.1f}ms  p99={p99:7.1f}ms  max={ordered[-1]:7.1f}ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--pings", type=int, default=200)
+    args = parser.parse_args()
+
+    password_hash = hash_password("correct horse")
+    _report("no logins", await _measure(_build_app(offload=True, password_hash=password_hash), logins=0, pings=args.pings))
+    _report("burst, inline bcrypt", await _measure(_build_app(offload=False, password_hash=password_hash), logins=args.logins, pings=args.pings))
+    _report("burst, executor", await _measure(_build_app(offload=True, password_hash=password_hash), logins=args.logins, pings=args.pings))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Per-request overhead of the HTTP middleware stack.
+
+Runs in-process through httpx's ASGI transport, without a database or Redis:
+the idempotency store is replaced by an in-memory one. Every request uses a
+fresh idempotency key, so the claim + snapshot path is exercised each time.
+
+    python -m benchmarks.middleware_overhead [--requests 500] [--body-kb 1 64 512]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+
+import app.middleware.idempotency_snapshot as idempotency_middleware
+from app.core.security import create_access_token
+from app.middleware.idempotency_snapshot import IdempotencySnapshotMiddleware
+from app.middleware.request_context import RequestContextMiddleware
+from app.services.idempotency_store import ClaimResult, IdempotencyStore
+
+
+class _MemoryStore(IdempotencyStore):
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    async def claim_or_fetch(self, scope):
+        if scope in self.data:
+            return ClaimResult(claimed=False, snapshot=self.data[scope])
+        self.data[scope] = None
+        return ClaimResult(claimed=True)
+
+    async def fetch(self, scope):
+        return self.data.get(scope)
+
+    async def store(self, scope, snapshot, *, token):
+        self.data[scope] = snapshot
+
+    async def release(self, scope, *, token):
+        self.data.pop(scope, None)
+
+
+def _build_app(*, body_kb: int, middlewares: bool) -> FastAPI:
+    app = FastAPI()
+    payload = {"items": ["x" * 1000 for _ in range(body_kb)]}
+
+    @app.post("/echo")
+    async def echo():
+        return payload
+
+    if middlewares:
+        app.add_middleware(RequestContextMiddleware)
+        app.add_middleware(IdempotencySnapshotMiddleware)
+    return app
+
+
+async def _run(app: FastAPI, *, requests: int) -> float:
+    token = create_access_token("bench@example.com", str(uuid.uuid4()))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"Authorization": f"Bearer {token}", "X-Timezone": "UTC"}
+        for _ in range(50):  # warm-up
+            await client.post("/echo", headers={**headers, "X-Request-Id": str(uuid.uuid4())})
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.post("/echo", headers={**headers, "X-Request-Id": str(uuid.uuid4())})
+        return (time.perf_counter() - started) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--body-kb", type=int, nargs="+", default=[1, 64, 512])
+    args = parser.parse_args()
+
+    store = _MemoryStore()
+    idempotency_middleware.get_idempotency_store = lambda: store
+
+    for body_kb in args.body_kb:
+        requests = args.requests
+        bare = await _run(_build_app(body_kb=body_kb, middlewares=False), requests=requests)
+        stacked = await _run(_build_app(body_kb=body_kb, middlewares=True), requests=requests)
+        print(
+            f"body={body_kb:>4}KB  requests={requests:>5}  bare={bare:8.1f}us  "
+            f"with middlewares={stacked:8.1f}us  overhead={stacked - bare:8.1f}us/request"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
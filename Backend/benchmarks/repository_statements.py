@@ -0,0 +1,100 @@
+"""Python time the repositories spend before a list query reaches the driver.
+
+Calls each keyset-paginated list function repeatedly against an empty SQLite
+database and measures, per call, the time from entering the repository function
+to SQLAlchemy handing SQL to the cursor: building the statement, computing its
+cache key, looking up (or compiling) the SQL and setting up the ORM context. Also
+counts how many distinct compiled statements each function produced, i.e.
+compiled-cache misses.
+
+    python -m benchmarks.repository_statements [--calls 2000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import ARRAY, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.db.base import Base
+from app.repositories import calendar_repo, finance_repo, goals_repo, subtasks_repo, tasks_repo
+
+_TABLES = ("users", "tasks", "subtasks", "goals", "calendar_events", "finance_transactions")
+
+_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(type_, compiler, **kw):
+    # calendar_events.parallel_with only needs to exist for the benchmark
+    return "JSON"
+
+
+def _queries(user_id: uuid.UUID):
+    # a different cursor / filter value on every call, as in real traffic
+    def cursor(i: int) -> str:
+        return f"{_NOW.replace(microsecond=i % 1000).isoformat()}|{uuid.UUID(int=i)}"
+
+    return {
+        "tasks.list": lambda db, i: tasks_repo.list(
+            db, user_id=user_id, status="todo", goal_id=None, due_from=None, due_to=None, cursor=cursor(i), limit=50
+        ),
+        "subtasks.list_by_task": lambda db, i: subtasks_repo.list_by_task(
+            db, user_id=user_id, task_id=uuid.UUID(int=i), cursor=cursor(i), limit=50
+        ),
+        "goals.list_by_created": lambda db, i: goals_repo.list_by_created(
+            db, user_id=user_id, updated_from=None, cursor=cursor(i), limit=50
+        ),
+        "calendar.list_by_start": lambda db, i: calendar_repo.list_by_start(
+            db, user_id=user_id, updated_from=None, cursor=cursor(i), limit=50
+        ),
+        "finance.list_transactions": lambda db, i: finance_repo.list_transactions(
+            db, user_id=user_id, account_id=None, updated_from=_NOW, cursor=cursor(i), limit=50
+        ),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[Base.metadata.tables[t] for t in _TABLES]))
+
+    state: dict = {"started": 0.0, "build": None, "compiled": set()}
+
+    def _reached_driver(conn, cursor, statement, parameters, context, executemany):
+        if state["build"] is None:
+            state["build"] = time.perf_counter() - state["started"]
+        state["compiled"].add(id(context.compiled))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _reached_driver)
+    async with AsyncSession(engine) as db:
+        for name, query in _queries(uuid.uuid4()).items():
+            for i in range(50):  # warm-up: first compilation
+                await query(db, i)
+            state["compiled"] = set()
+            samples = []
+            for i in range(args.calls):
+                state["build"] = None
+                state["started"] = time.perf_counter()
+                await query(db, 50 + i)
+                samples.append(state["build"] * 1e6)
+            print(
+                f"{name:<28} p10={statistics.quantiles(samples, n=10)[0]:7.1f}us  "
+                f"median={statistics.median(samples):7.1f}us  compiled statements={len(state['compiled'])}"
+            )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
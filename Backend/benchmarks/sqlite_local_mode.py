@@ -0,0 +1,90 @@
+"""Throughput of the local/single-node SQLite mode through the async ORM stack.
+
+Runs a small task workload (inserts in short transactions, point reads, list
+pages) against a temporary SQLite file, once with a bare ``create_async_engine``
+(a new connection per checkout, SQLite defaults) and once with the engine the
+app builds (pooled connections, WAL + synchronous=NORMAL, statement cache).
+
+    python -m benchmarks.sqlite_local_mode [--tasks 2000] [--reads 2000] [--pages 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.db.base import Base
+from app.db.session import create_engine_for
+from app.models.task import Task
+from app.models.user import User
+from app.repositories import tasks_repo
+
+_TABLES = ("users", "goals", "tasks")
+
+
+async def _workload(engine: AsyncEngine, *, tasks: int, reads: int, pages: int) -> dict[str, float]:
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync: Base.metadata.create_all(sync, tables=[Base.metadata.tables[t] for t in _TABLES]))
+
+    user_id = uuid.uuid4()
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        db.add(User(id=user_id, email=f"{user_id.hex}@bench.local", password_hash="x", timezone="UTC"))
+        await db.commit()
+
+    timings: dict[str, float] = {}
+    task_ids: list[uuid.UUID] = []
+    started = time.perf_counter()
+    for i in range(tasks):
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            task = await tasks_repo.create(db, Task(user_id=user_id, title=f"task {i}"))
+            await db.commit()
+            task_ids.append(task.id)
+    timings["insert"] = (time.perf_counter() - started) / tasks * 1e6
+
+    started = time.perf_counter()
+    for i in range(reads):
+        async with AsyncSession(engine) as db:
+            await tasks_repo.get_by_id(db, task_id=task_ids[i % len(task_ids)], user_id=user_id)
+    timings["get"] = (time.perf_counter() - started) / reads * 1e6
+
+    started = time.perf_counter()
+    for _ in range(pages):
+        async with AsyncSession(engine) as db:
+            await tasks_repo.list(
+                db, user_id=user_id, status=None, goal_id=None, due_from=None, due_to=None, cursor=None, limit=100
+            )
+    timings["list100"] = (time.perf_counter() - started) / pages * 1e6
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, make_engine in (
+            ("bare engine", lambda url: create_async_engine(url)),
+            ("app engine", lambda url: create_engine_for(url, name="bench")),
+        ):
+            url = f"sqlite+aiosqlite:///{Path(tmp) / (label.replace(' ', '_') + '.db')}"
+            engine = make_engine(url)
+            try:
+                timings = await _workload(engine, tasks=args.tasks, reads=args.reads, pages=args.pages)
+            finally:
+                await engine.dispose()
+            print(
+                f"{label:<12} insert+commit={timings['insert']:8.1f}us  get={timings['get']:8.1f}us  "
+                f"list(100)={timings['list100']:8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,11 @@ import uuid
 
 import pytest
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import ARRAY, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.sqlite.aiosqlite import SQLiteDialect_aiosqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 
 # IMPORTANT:
 # Set env BEFORE importing app (settings are read at import time)
@@ -136,3 +141,140 @@ async def auth_header(access_token: str, headers: dict[str, str]) -> dict[str, s
     h = dict(headers)
     h["Authorization"] = f"Bearer {access_token}"
     return h
+
+
+# --- in-process database -----------------------------------------------------
+# Service-level tests run against a throwaway SQLite file with every table of
+# app.models; the Postgres-only column types are rendered as JSON there.
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+# ...and stored and loaded as JSON lists as well
+SQLiteDialect_aiosqlite.colspecs = {**SQLiteDialect_aiosqlite.colspecs, ARRAY: JSON}
+
+
+@pytest.fixture()
+async def db_engine(tmp_path):
+    import app.models  # noqa: F401  (register every table on Base.metadata)
+    from app.db.base import Base
+    from app.db.session import register_listeners
+
+    register_listeners()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture()
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+async def create_user(db: AsyncSession) -> uuid.UUID:
+    from app.models.user import User
+
+    user = User(email=f"u_{uuid.uuid4().hex[:10]}@test.local", password_hash="x", timezone="UTC")
+    db.add(user)
+    await db.commit()
+    return user.id
+
+
+@pytest.fixture()
+async def user_id(db) -> uuid.UUID:
+    return await create_user(db)
+
+
+@pytest.fixture()
+async def api_client(session_factory, user_id, make_headers, monkeypatch):
+    """Client for a bare app serving the given routers on the test database, signed in as ``user_id``.
+
+    app.main needs the full stack; route tests mount only what they exercise.
+    """
+    from fastapi import FastAPI, HTTPException
+    from fastapi.responses import JSONResponse
+
+    from app.api.deps import get_current_user
+    from app.db import session as db_session
+    from app.middleware.request_context import RequestContextMiddleware
+    from app.models.user import User
+
+    monkeypatch.setattr(db_session, "async_session_maker", session_factory)
+    monkeypatch.setattr(db_session, "async_read_session_maker", session_factory)
+    async with session_factory() as session:
+        user = await session.get(User, user_id)
+
+    clients: list[AsyncClient] = []
+
+    def _make(*routers) -> AsyncClient:
+        api = FastAPI()
+        api.add_middleware(RequestContextMiddleware)
+        # like app.main: routes raise err() bodies, sent as they are
+        api.add_exception_handler(
+            HTTPException, lambda request, exc: JSONResponse(exc.detail, status_code=exc.status_code, headers=exc.headers)
+        )
+        for router in routers:
+            api.include_router(router)
+        api.dependency_overrides[get_current_user] = lambda: user
+        ac = AsyncClient(transport=ASGITransport(app=api), base_url="http://test", headers=make_headers(rid="test"))
+        clients.append(ac)
+        return ac
+
+    yield _make
+    for ac in clients:
+        await ac.aclose()
+
+
+@pytest.fixture()
+def no_redis(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "REDIS_URL", None)
+
+
+@pytest.fixture(autouse=True)
+async def _reset_shared_redis():
+    # get_redis() caches one client, bound to the event loop of the test that created it
+    yield
+    from app.infra import redis_client
+
+    client, redis_client._redis = redis_client._redis, None
+    if client is not None:
+        await client.aclose()
+
+
+@pytest.fixture()
+async def redis_client():
+    """A client on the test Redis (docker-compose.test.yml), flushed around the test."""
+    from redis.asyncio import Redis
+    from redis.exceptions import RedisError
+
+    from app.core.config import settings
+
+    if not settings.REDIS_URL:
+        pytest.skip("REDIS_URL is not set")
+    client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        await client.flushdb()
+    except (OSError, RedisError):
+        await client.aclose()
+        pytest.skip("Redis is not available")
+    yield client
+    await client.flushdb()
+    await client.aclose()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.v1 import tasks
+from app.core.config import settings
+from app.models.analytics_event import AnalyticsOutboxEvent
+from app.models.task import Task
+from app.services.background_tasks import ship_analytics_events
+from app.services.events import EventSink, NdjsonFileEventSink, publish_event
+
+
+class RecordingSink(EventSink):
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+
+    async def write(self, events: list[dict]) -> None:
+        self.batches.append(events)
+
+
+async def _outbox(session_factory) -> list[AnalyticsOutboxEvent]:
+    async with session_factory() as session:
+        return list((await session.execute(select(AnalyticsOutboxEvent).order_by(AnalyticsOutboxEvent.created_at))).scalars())
+
+
+async def test_event_commits_and_rolls_back_with_the_business_change(db, user_id, session_factory):
+    db.add(Task(user_id=user_id, title="kept"))
+    publish_event(name="Task_Created", request_id="r1", user_id=str(user_id), payload={"ids": [1, 2]}, db=db)
+    await db.commit()
+
+    db.add(Task(user_id=user_id, title="dropped"))
+    publish_event(name="Task_Created", request_id="r2", user_id=str(user_id), db=db)
+    await db.rollback()
+
+    [event] = await _outbox(session_factory)
+    assert (event.name, event.request_id, event.user_id, event.payload) == ("Task_Created", "r1", user_id, {"ids_count": 2})
+
+
+async def test_bulk_endpoint_writes_its_event_in_the_request_transaction(api_client, user_id, session_factory, no_redis):
+    client = api_client(tasks.router)
+    res = await client.post(
+        "/tasks/bulk",
+        json={"operations": [{"action": "create", "data": {"title": "a"}}], "request_id": uuid.uuid4().hex},
+    )
+    assert res.status_code == 200, res.text
+
+    [event] = await _outbox(session_factory)
+    assert (event.name, event.payload) == ("Tasks_Bulk_Applied", {"created": 1, "updated": 0, "deleted": 0})
+
+
+async def test_shipping_drains_the_outbox_in_batches(db, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_OUTBOX_BATCH_SIZE", 2)
+    for i in range(5):
+        publish_event(name="Ping", request_id=f"r{i}", user_id=str(user_id), payload={"i": i}, db=db)
+    await db.commit()
+    sink = RecordingSink()
+
+    assert await ship_analytics_events(db, sink=sink) == 5
+
+    assert [len(batch) for batch in sink.batches] == [2, 2, 1]
+    assert sorted(event["payload"]["i"] for batch in sink.batches for event in batch) == [0, 1, 2, 3, 4]
+    assert await db.scalar(select(func.count()).select_from(AnalyticsOutboxEvent)) == 0
+
+
+async def test_failed_shipment_keeps_events_for_the_next_run(db, user_id, session_factory):
+    class BrokenSink(EventSink):
+        async def write(self, events):
+            raise OSError("sink down")
+
+    publish_event(name="Ping", request_id="r1", db=db)
+    await db.commit()
+
+    with pytest.raises(OSError):
+        await ship_analytics_events(db, sink=BrokenSink())
+    await db.rollback()
+    assert len(await _outbox(session_factory)) == 1
+
+
+async def test_ndjson_sink_appends_one_line_per_event(tmp_path):
+    sink = NdjsonFileEventSink(tmp_path / "out" / "events.ndjson")
+    await sink.write([{"name": "a"}])
+    await sink.write([{"name": "b"}, {"name": "c"}])
+
+    lines = (tmp_path / "out" / "events.ndjson").read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["a", "b", "c"]
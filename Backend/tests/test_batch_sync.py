@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.models.calendar_event import CalendarEvent
+from app.models.finance import FinanceAccount, FinanceTransaction
+from app.models.goal import Goal
+from app.models.subtask import Subtask
+from app.models.task import Task
+from app.schemas.sync import BatchSyncOperation
+from app.services.batch_sync_service import compact_operations, process_batch_operations
+from app.services.sync_handlers import normalize_to_utc
+from tests.conftest import create_user
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _op(entity: str, *, id: uuid.UUID | None = None, action: str = "upsert", data: dict | None = None, at: int = 0):
+    return BatchSyncOperation(entity=entity, action=action, id=id, data=data, updated_at=T0 + timedelta(minutes=at))
+
+
+async def _sync(db, user_id, *ops):
+    results = await process_batch_operations(db, user_id=user_id, operations=list(ops))
+    await db.commit()
+    return results
+
+
+async def test_task_flags_accept_null_and_ints(db, user_id):
+    first, second = uuid.uuid4(), uuid.uuid4()
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=first, data={"title": "null flag", "deleted": None}),
+        _op("task", id=second, data={"title": "int flag", "deleted": 1}),
+    )
+    assert [r.status for r in results] == ["applied", "applied"]
+
+    rows = {t.id: t for t in (await db.execute(select(Task))).scalars()}
+    assert rows[first].deleted is False
+    assert rows[second].deleted is True
+
+    results = await _sync(db, user_id, _op("task", id=second, data={"deleted": 0}, at=1))
+    assert results[0].status == "applied"
+    await db.refresh(rows[second])
+    assert rows[second].deleted is False
+
+
+async def test_event_upsert_and_validation(db, user_id):
+    event_id = uuid.uuid4()
+    start = T0 + timedelta(days=1)
+    results = await _sync(
+        db,
+        user_id,
+        _op("event", id=event_id, data={"title": "Standup", "start_at": start.isoformat(), "end_at": (start + timedelta(minutes=15)).isoformat()}),
+        _op("event", id=uuid.uuid4(), data={"title": "Backwards", "start_at": start.isoformat(), "end_at": start.isoformat()}),
+    )
+    assert [r.status for r in results] == ["applied", "error"]
+    assert results[1].reason == "end_at must be after start_at"
+
+    # the existing end_at is taken into account when only start_at moves
+    results = await _sync(db, user_id, _op("event", id=event_id, data={"start_at": (start + timedelta(hours=1)).isoformat()}, at=1))
+    assert results[0].status == "error"
+
+    results = await _sync(db, user_id, _op("event", id=event_id, action="delete", at=2))
+    assert results[0].status == "applied"
+    event = await db.get(CalendarEvent, event_id)
+    assert event.deleted is True
+
+
+async def test_finance_transaction_requires_own_account(db, user_id):
+    other_user = await create_user(db)
+    own = FinanceAccount(user_id=user_id, name="Main")
+    foreign = FinanceAccount(user_id=other_user, name="Theirs")
+    db.add_all([own, foreign])
+    await db.commit()
+
+    data = {"type": "expense", "amount": 12.5, "category": "food", "occurred_at": T0.isoformat()}
+    results = await _sync(
+        db,
+        user_id,
+        _op("finance", id=uuid.uuid4(), data={**data, "account_id": str(own.id), "recurring": None}),
+        _op("finance", id=uuid.uuid4(), data={**data, "account_id": str(foreign.id)}),
+        _op("finance", id=uuid.uuid4(), data={**data, "account_id": str(own.id), "amount": -1}),
+    )
+    assert [r.status for r in results] == ["applied", "error", "error"]
+    assert results[1].reason == "Referenced 'account_id' not found"
+    assert results[2].reason == "Amount must be positive"
+
+    tx = (await db.execute(select(FinanceTransaction))).scalar_one()
+    assert tx.currency == "USD"
+    assert tx.recurring is False
+
+
+async def test_goal_create_update_and_stale_skip(db, user_id):
+    goal_id = uuid.uuid4()
+    results = await _sync(db, user_id, _op("goal", id=goal_id, data={"title": "Run", "target_date": "2026-06-01"}, at=5))
+    assert results[0].status == "applied"
+    assert results[0].current["title"] == "Run"
+
+    results = await _sync(
+        db,
+        user_id,
+        _op("goal", id=goal_id, data={"title": "Stale"}, at=1),
+        _op("goal", id=goal_id, data={"title": "Marathon"}, at=6),
+    )
+    assert [r.status for r in results] == ["skipped", "applied"]
+    goal = await db.get(Goal, goal_id)
+    assert goal.title == "Marathon"
+    assert goal.progress == 0.0
+
+
+async def test_subtask_references_task_from_same_batch(db, user_id):
+    task_id, subtask_id = uuid.uuid4(), uuid.uuid4()
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=task_id, data={"title": "Parent"}),
+        _op("subtask", id=subtask_id, data={"task_id": str(task_id), "title": "Child", "done": 1}),
+        _op("subtask", id=uuid.uuid4(), data={"task_id": str(uuid.uuid4()), "title": "Orphan"}),
+    )
+    assert [r.status for r in results] == ["applied", "applied", "error"]
+    assert results[2].reason == "Referenced 'task_id' not found"
+    subtask = await db.get(Subtask, subtask_id)
+    assert subtask.task_id == task_id
+    assert subtask.done is True
+
+
+async def test_ids_owned_by_another_user_are_rejected(db, user_id):
+    other_user = await create_user(db)
+    theirs = Task(user_id=other_user, title="Theirs", status="todo")
+    their_task_for_subtask = Task(user_id=other_user, title="Their parent", status="todo")
+    db.add_all([theirs, their_task_for_subtask])
+    await db.commit()
+
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=theirs.id, data={"title": "Mine now"}, at=60 * 24 * 365),
+        _op("task", id=theirs.id, action="delete", at=60 * 24 * 366),
+        _op("subtask", id=uuid.uuid4(), data={"task_id": str(their_task_for_subtask.id), "title": "Sneaky"}),
+    )
+    assert [r.status for r in results] == ["error", "error", "error"]
+    assert results[0].reason == "Entity id is not available"
+
+    await db.refresh(theirs)
+    assert theirs.title == "Theirs"
+    assert theirs.deleted is False
+
+
+def test_compact_operations_groups_by_entity_and_id_in_first_seen_order():
+    a, b = uuid.uuid4(), uuid.uuid4()
+    ops = [
+        _op("task", id=a, data={"title": "a1"}),
+        _op("goal", id=a, data={"title": "same id, other entity"}),
+        _op("task", id=b, data={"title": "b1"}),
+        _op("task", id=None, data={"title": "no id"}),
+        _op("task", id=a, data={"title": "a2"}, at=1),
+        _op("task", id=None, data={"title": "no id either"}),
+    ]
+    groups = compact_operations(ops)
+    assert [(g.entity, g.id) for g in groups] == [("task", a), ("goal", a), ("task", b), ("task", None), ("task", None)]
+    assert [idx for idx, _ in groups[0].items] == [0, 4]
+    assert [idx for idx, _ in groups[3].items] == [3]
+
+
+async def test_chain_folds_in_order_and_skips_same_timestamp(db, user_id):
+    task_id = uuid.uuid4()
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=task_id, data={"title": "v1", "priority": 1}, at=0),
+        _op("task", id=task_id, data={"title": "v2"}, at=1),
+        _op("task", id=task_id, data={"title": "same second"}, at=1),
+        _op("task", id=task_id, data={"title": "older"}, at=0),
+        _op("task", id=task_id, data={"priority": 3}, at=2),
+    )
+    assert [r.status for r in results] == ["applied", "applied", "skipped", "skipped", "applied"]
+    task = await db.get(Task, task_id)
+    assert (task.title, task.priority) == ("v2", 3)
+    assert normalize_to_utc(task.updated_at) == T0 + timedelta(minutes=2)
+    # every op that touched the row reports it as it stands after the batch
+    assert results[0].current["title"] == "v2"
+    assert results[2].current["priority"] == 3
+
+
+async def test_delete_before_create_is_skipped(db, user_id):
+    task_id = uuid.uuid4()
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=task_id, action="delete", at=0),
+        _op("task", id=task_id, data={"title": "Created"}, at=1),
+        _op("task", id=task_id, action="delete", at=2),
+    )
+    assert [r.status for r in results] == ["skipped", "applied", "applied"]
+    assert results[0].reason == "Task not found"
+    task = await db.get(Task, task_id)
+    assert task.title == "Created"
+    assert task.deleted is True
+
+
+async def test_invalid_op_fails_alone_within_a_chain(db, user_id):
+    task_id = uuid.uuid4()
+    results = await _sync(
+        db,
+        user_id,
+        _op("task", id=task_id, data={"title": "Valid"}, at=0),
+        _op("task", id=task_id, data={"status": "bogus"}, at=1),
+        _op("task", id=task_id, data={"status": "done"}, at=2),
+    )
+    assert [r.status for r in results] == ["applied", "error", "applied"]
+    assert results[1].reason == "Unsupported status value"
+    task = await db.get(Task, task_id)
+    assert (task.title, task.status) == ("Valid", "done")
+
+
+async def test_chain_is_validated_step_by_step(db, user_id):
+    event_id = uuid.uuid4()
+    start = T0 + timedelta(days=1)
+    results = await _sync(
+        db,
+        user_id,
+        # no title yet: creating from this op alone is invalid even though a later op adds one
+        _op("event", id=event_id, data={"start_at": start.isoformat(), "end_at": (start + timedelta(hours=1)).isoformat()}, at=0),
+        _op("event", id=event_id, data={"title": "Lunch", "start_at": start.isoformat(), "end_at": (start + timedelta(hours=1)).isoformat()}, at=1),
+        # end before start in between, fixed by the next op: only this one fails
+        _op("event", id=event_id, data={"end_at": (start - timedelta(hours=1)).isoformat()}, at=2),
+        _op("event", id=event_id, data={"end_at": (start + timedelta(hours=2)).isoformat()}, at=3),
+    )
+    assert [r.status for r in results] == ["error", "applied", "error", "applied"]
+    assert results[0].reason == "Missing required fields for create: title"
+    event = await db.get(CalendarEvent, event_id)
+    assert normalize_to_utc(event.end_at) == start + timedelta(hours=2)
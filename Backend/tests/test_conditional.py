@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from app.api.v1 import productivity, tasks
+from app.schemas.sync import BatchSyncOperation
+from app.services.batch_sync_service import process_batch_operations
+from app.services.response_cache import ResponseCache
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+async def _sync(db, user_id, entity, *, id, data, at):
+    op = BatchSyncOperation(entity=entity, action="upsert", id=id, data=data, updated_at=T0 + timedelta(minutes=at))
+    [result] = await process_batch_operations(db, user_id=user_id, operations=[op])
+    await db.commit()
+    assert result.status == "applied", result
+
+
+async def _get(client, path, etag=None):
+    return await client.get(path, headers={"If-None-Match": etag} if etag else {})
+
+
+async def test_unchanged_list_revalidates_with_304(api_client, db, user_id, no_redis):
+    await _sync(db, user_id, "task", id=uuid.uuid4(), data={"title": "a"}, at=0)
+    client = api_client(tasks.router)
+
+    first = await _get(client, "/tasks")
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = await _get(client, "/tasks", first.headers["ETag"])
+    assert again.status_code == 304
+    assert again.headers["ETag"] == first.headers["ETag"]
+    # another page of the same collection has its own tag
+    assert (await _get(client, "/tasks?limit=1", first.headers["ETag"])).status_code == 200
+
+
+async def test_edit_stamped_older_than_the_newest_row_changes_the_etag(api_client, db, user_id, no_redis):
+    older, newest = uuid.uuid4(), uuid.uuid4()
+    await _sync(db, user_id, "task", id=older, data={"title": "older"}, at=0)
+    await _sync(db, user_id, "task", id=newest, data={"title": "newest"}, at=60)
+    client = api_client(tasks.router)
+    etag = (await _get(client, "/tasks")).headers["ETag"]
+
+    # an offline edit keeps the client's updated_at: neither max(updated_at) nor the count moves
+    await _sync(db, user_id, "task", id=older, data={"title": "edited offline"}, at=30)
+
+    res = await _get(client, "/tasks", etag)
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert "edited offline" in {item["title"] for item in res.json()["items"]}
+
+
+async def test_event_list_etag_follows_offline_edits(api_client, db, user_id, no_redis):
+    older, newest = uuid.uuid4(), uuid.uuid4()
+    span = {"start_at": (T0 + timedelta(days=1)).isoformat(), "end_at": (T0 + timedelta(days=1, hours=1)).isoformat()}
+    await _sync(db, user_id, "event", id=older, data={"title": "older", **span}, at=0)
+    await _sync(db, user_id, "event", id=newest, data={"title": "newest", **span}, at=60)
+    client = api_client(productivity.router)
+    first = await _get(client, "/productivity/calendar/events")
+    assert first.status_code == 200, first.text
+    etag = first.headers["ETag"]
+
+    await _sync(db, user_id, "event", id=older, data={"title": "edited offline"}, at=30)
+
+    assert (await _get(client, "/productivity/calendar/events", etag)).status_code == 200
+
+
+async def test_revalidation_runs_no_query(api_client, db, db_engine, user_id, no_redis):
+    await _sync(db, user_id, "task", id=uuid.uuid4(), data={"title": "a"}, at=0)
+    client = api_client(tasks.router)
+    etag = (await _get(client, "/tasks")).headers["ETag"]
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        assert (await _get(client, "/tasks", etag)).status_code == 304
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", capture)
+    assert statements == []
+
+
+async def test_in_process_version_tags_never_match_another_worker(user_id, no_redis):
+    worker_a = ResponseCache(ttl_seconds=1, max_entries=1, redis_ttl_seconds=0)
+    worker_b = ResponseCache(ttl_seconds=1, max_entries=1, redis_ttl_seconds=0)
+    worker_b.bump_local(user_id, ("task",))
+    worker_a.bump_local(user_id, ("task",))
+
+    # same version number, different data behind it (or a restarted worker)
+    assert await worker_a.version_tag(user_id, ("task",)) != await worker_b.version_tag(user_id, ("task",))
+    assert await worker_a.version_tag(user_id, ("task",)) == await worker_a.version_tag(user_id, ("task",))
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.models.finance import FinanceAccount, FinanceMonthlyRollup, FinanceTransaction
+from app.services.finance_rollups import month_totals, rebuild_month
+
+JAN = datetime(2026, 1, 10, tzinfo=timezone.utc)
+FEB = datetime(2026, 2, 3, tzinfo=timezone.utc)
+
+
+async def _rollups(db, user_id, month):
+    res = await db.execute(
+        select(FinanceMonthlyRollup.type, FinanceMonthlyRollup.category, FinanceMonthlyRollup.amount, FinanceMonthlyRollup.tx_count)
+        .where(FinanceMonthlyRollup.user_id == user_id, FinanceMonthlyRollup.month == month, FinanceMonthlyRollup.tx_count > 0)
+        .order_by(FinanceMonthlyRollup.type, FinanceMonthlyRollup.category)
+    )
+    return [(t, c, Decimal(str(a)), n) for t, c, a, n in res.all()]
+
+
+async def _assert_matches_rebuild(db, user_id, month):
+    incremental = await _rollups(db, user_id, month)
+    await rebuild_month(db, user_id=user_id, month=month)
+    assert incremental == await _rollups(db, user_id, month)
+    return incremental
+
+
+async def test_rollups_follow_updates_deletes_and_month_moves(db, user_id):
+    account = FinanceAccount(user_id=user_id)
+    db.add(account)
+    await db.flush()
+    food = FinanceTransaction(user_id=user_id, account_id=account.id, type="expense", amount=10, currency="USD", category="food", occurred_at=JAN)
+    rent = FinanceTransaction(user_id=user_id, account_id=account.id, type="expense", amount=500, currency="USD", category="rent", occurred_at=JAN)
+    salary = FinanceTransaction(user_id=user_id, account_id=account.id, type="income", amount=900, currency="USD", category="job", occurred_at=JAN)
+    db.add_all([food, rent, salary])
+    await db.commit()
+
+    food.amount = 25
+    salary.category = "bonus"
+    await db.commit()
+    assert await _assert_matches_rebuild(db, user_id, "2026-01") == [
+        ("expense", "food", Decimal("25.00"), 1),
+        ("expense", "rent", Decimal("500.00"), 1),
+        ("income", "bonus", Decimal("900.00"), 1),
+    ]
+
+    rent.occurred_at = FEB
+    food.deleted = True
+    await db.commit()
+    assert await _assert_matches_rebuild(db, user_id, "2026-01") == [("income", "bonus", Decimal("900.00"), 1)]
+    assert await _assert_matches_rebuild(db, user_id, "2026-02") == [("expense", "rent", Decimal("500.00"), 1)]
+
+    await db.delete(salary)
+    await db.commit()
+    assert await month_totals(db, user_id=user_id, month="2026-01") == {"income": Decimal("0")}
+    assert await month_totals(db, user_id=user_id, month="2026-02") == {"expense": Decimal("500")}
+
+
+async def test_rolled_back_writes_leave_rollups_alone(db, user_id):
+    account = FinanceAccount(user_id=user_id)
+    db.add(account)
+    await db.commit()
+    db.add(FinanceTransaction(user_id=user_id, account_id=account.id, type="expense", amount=10, currency="USD", category="food", occurred_at=JAN))
+    await db.flush()
+    await db.rollback()
+
+    assert await _rollups(db, user_id, "2026-01") == []
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.models.goal import Goal
+from app.models.task import Task
+from app.services.background_tasks import reconcile_goal_counters
+
+
+async def _counters(db, goal):
+    goal_id = goal.id if isinstance(goal, Goal) else goal
+    res = await db.execute(select(Goal.tasks_total, Goal.tasks_completed, Goal.progress).where(Goal.id == goal_id))
+    return tuple(res.one())
+
+
+async def test_counters_follow_goal_and_status_changes(db, user_id):
+    first = Goal(user_id=user_id, title="First")
+    second = Goal(user_id=user_id, title="Second")
+    db.add_all([first, second])
+    await db.flush()
+    a = Task(user_id=user_id, title="a", goal_id=first.id)
+    b = Task(user_id=user_id, title="b", goal_id=first.id, status="done")
+    db.add_all([a, b])
+    await db.commit()
+    assert await _counters(db, first) == (2, 1, 0.5)
+
+    a.status = "done"
+    await db.commit()
+    assert await _counters(db, first) == (2, 2, 1.0)
+
+    # moving a done task carries its completion along
+    b.goal_id = second.id
+    await db.commit()
+    assert await _counters(db, first) == (1, 1, 1.0)
+    assert await _counters(db, second) == (1, 1, 1.0)
+
+    a.status = "todo"
+    b.deleted = True
+    await db.commit()
+    assert await _counters(db, first) == (1, 0, 0.0)
+    assert await _counters(db, second) == (0, 0, 0.0)
+
+    await db.delete(a)
+    await db.commit()
+    assert await _counters(db, first) == (0, 0, 0.0)
+
+
+async def test_rolled_back_task_writes_leave_counters_alone(db, user_id):
+    goal = Goal(user_id=user_id, title="Goal")
+    db.add(goal)
+    await db.commit()
+    goal_id = goal.id
+
+    db.add(Task(user_id=user_id, title="a", goal_id=goal_id))
+    await db.flush()
+    await db.rollback()
+
+    assert await _counters(db, goal_id) == (0, 0, 0.0)
+
+
+async def test_reconcile_repairs_drift_left_by_bulk_updates(db, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "GOAL_RECONCILE_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "GOAL_RECONCILE_PAUSE_SECONDS", 0)
+    goals = [Goal(user_id=user_id, title=f"g{i}") for i in range(3)]
+    db.add_all(goals)
+    await db.flush()
+    db.add_all([Task(user_id=user_id, title="t", goal_id=goal.id) for goal in goals])
+    await db.commit()
+
+    # a bulk UPDATE bypasses the flush listener
+    await db.execute(update(Task).where(Task.goal_id == goals[2].id).values(status="done"))
+    await db.execute(update(Goal).where(Goal.id == goals[0].id).values(tasks_total=7))
+    await db.commit()
+
+    assert await reconcile_goal_counters(db) == 2
+    assert [await _counters(db, goal) for goal in goals] == [(1, 0, 0.0), (1, 0, 0.0), (1, 1, 1.0)]
+    assert await reconcile_goal_counters(db) == 0
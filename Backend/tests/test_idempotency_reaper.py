@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.idempotency import IdempotencyKey
+from app.services import background_tasks
+from app.services.background_tasks import reap_idempotency_keys
+
+
+@pytest.fixture()
+def metrics(monkeypatch) -> list[dict]:
+    recorded: list[dict] = []
+    monkeypatch.setattr(background_tasks, "record_idempotency_reaper_metric", lambda **fields: recorded.append(fields))
+    monkeypatch.setattr(settings, "IDEMPOTENCY_REAP_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "IDEMPOTENCY_REAP_PAUSE_SECONDS", 0)
+    return recorded
+
+
+async def _keys(db, user_id, *, expired: int, live: int) -> None:
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        IdempotencyKey(user_id=user_id, key=f"k{i}", method="POST", path="/v1/tasks", expires_at=now + offset)
+        for i, offset in enumerate([timedelta(hours=-1)] * expired + [timedelta(hours=1)] * live)
+    )
+    await db.commit()
+
+
+async def _remaining(db) -> list[str]:
+    return sorted((await db.execute(select(IdempotencyKey.key))).scalars())
+
+
+async def test_expired_keys_are_deleted_in_chunks(db, user_id, metrics):
+    await _keys(db, user_id, expired=7, live=2)
+
+    assert await reap_idempotency_keys(db) == 7
+
+    assert await _remaining(db) == ["k7", "k8"]
+    assert [(m["deleted"], m["batches"], m["status"]) for m in metrics] == [(7, 3, "reaped")]
+
+
+async def test_run_stops_after_max_batches_and_leaves_the_rest(db, user_id, metrics, monkeypatch):
+    monkeypatch.setattr(settings, "IDEMPOTENCY_REAP_MAX_BATCHES", 2)
+    await _keys(db, user_id, expired=7, live=0)
+
+    assert await reap_idempotency_keys(db) == 6
+    assert len(await _remaining(db)) == 1
+    assert await reap_idempotency_keys(db) == 1
+    assert await reap_idempotency_keys(db) == 0
+
+    assert [(m["deleted"], m["batches"], m["status"]) for m in metrics] == [(6, 2, "reaped"), (1, 1, "reaped"), (0, 1, "idle")]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from httpx import ASGITransport, AsyncClient
+
+from app.api.idempotency import enforce_idempotency
+from app.core.config import settings
+from app.db.session import get_db
+from app.middleware import idempotency_snapshot
+from app.middleware.idempotency_snapshot import IdempotencySnapshotMiddleware
+from app.services.idempotency_store import (
+    ClaimResult,
+    DbIdempotencyStore,
+    IdempotencyScope,
+    IdempotencySnapshot,
+    IdempotencyStore,
+    RedisIdempotencyStore,
+)
+from app.repositories import idempotency_repo
+
+SCOPE = IdempotencyScope(user_id="user-1", key="key-1", method="POST", path="/v1/tasks")
+SNAPSHOT = IdempotencySnapshot(status_code=200, body='{"data": 1}', headers={"X-Request-Id": "r1"})
+
+
+class RecordingStore(IdempotencyStore):
+    """Stands in for the DB store behind an unreachable Redis."""
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.snapshot: IdempotencySnapshot | None = None
+
+    async def claim_or_fetch(self, scope):
+        self.calls.append("claim")
+        return ClaimResult(claimed=True, record_in_db=True)
+
+    async def fetch(self, scope):
+        self.calls.append("fetch")
+        return self.snapshot
+
+    async def store(self, scope, snapshot, *, token):
+        self.calls.append("store")
+        self.snapshot = snapshot
+
+    async def release(self, scope, *, token):
+        self.calls.append("release")
+
+
+async def test_claim_store_and_replay(redis_client):
+    store = RedisIdempotencyStore(redis_client)
+
+    first = await store.claim_or_fetch(SCOPE)
+    assert first.claimed and first.token
+
+    # a duplicate sees the in-flight marker: neither claimed nor a snapshot
+    duplicate = await store.claim_or_fetch(SCOPE)
+    assert not duplicate.claimed and duplicate.snapshot is None
+    assert 0 < await redis_client.pttl(SCOPE.redis_key) <= settings.IDEMPOTENCY_INFLIGHT_TTL_SECONDS * 1000
+
+    await store.store(SCOPE, SNAPSHOT, token=first.token)
+    replay = await store.claim_or_fetch(SCOPE)
+    assert replay.snapshot == SNAPSHOT
+    assert await store.fetch(SCOPE) == SNAPSHOT
+    assert settings.IDEMPOTENCY_INFLIGHT_TTL_SECONDS * 1000 < await redis_client.pttl(SCOPE.redis_key)
+    assert await redis_client.pttl(SCOPE.redis_key) <= settings.IDEMPOTENCY_TTL_SECONDS * 1000
+
+
+async def test_release_only_drops_own_marker(redis_client):
+    store = RedisIdempotencyStore(redis_client)
+    claim = await store.claim_or_fetch(SCOPE)
+
+    await store.release(SCOPE, token="someone else")
+    assert await redis_client.exists(SCOPE.redis_key)
+
+    await store.release(SCOPE, token=claim.token)
+    assert not await redis_client.exists(SCOPE.redis_key)
+    assert (await store.claim_or_fetch(SCOPE)).claimed
+
+
+async def test_store_after_lost_claim_keeps_the_new_owners_snapshot(redis_client):
+    store = RedisIdempotencyStore(redis_client)
+    slow = await store.claim_or_fetch(SCOPE)
+
+    # the in-flight marker expires and a retry claims and answers the key
+    await redis_client.delete(SCOPE.redis_key)
+    retry = await store.claim_or_fetch(SCOPE)
+    assert retry.claimed
+    retry_snapshot = IdempotencySnapshot(status_code=201, body='{"data": 2}', headers={})
+    await store.store(SCOPE, retry_snapshot, token=retry.token)
+
+    await store.store(SCOPE, SNAPSHOT, token=slow.token)
+    assert await store.fetch(SCOPE) == retry_snapshot
+
+
+async def test_store_after_expired_claim_fills_an_empty_key(redis_client):
+    store = RedisIdempotencyStore(redis_client)
+    slow = await store.claim_or_fetch(SCOPE)
+    await redis_client.delete(SCOPE.redis_key)
+
+    await store.store(SCOPE, SNAPSHOT, token=slow.token)
+    assert await store.fetch(SCOPE) == SNAPSHOT
+
+
+async def test_falls_back_when_redis_is_down():
+    unreachable = Redis.from_url("redis://127.0.0.1:1/0", decode_responses=True)
+    fallback = RecordingStore()
+    store = RedisIdempotencyStore(unreachable, fallback=fallback)
+    try:
+        claim = await store.claim_or_fetch(SCOPE)
+        assert claim.claimed and claim.record_in_db
+        await store.store(SCOPE, SNAPSHOT, token=claim.token)
+        assert await store.fetch(SCOPE) == SNAPSHOT
+        assert fallback.calls == ["claim", "store", "fetch"]
+    finally:
+        await unreachable.aclose()
+
+
+@pytest.fixture()
+def handler_calls():
+    return []
+
+
+@pytest.fixture()
+def make_app(handler_calls):
+    async def create(request):
+        handler_calls.append(request.headers["X-Idempotency-Key"])
+        await asyncio.sleep(0.1)
+        return JSONResponse({"data": len(handler_calls)})
+
+    def _make():
+        inner = IdempotencySnapshotMiddleware(Starlette(routes=[Route("/things", create, methods=["POST"])]))
+
+        async def app(scope, receive, send):
+            scope.setdefault("state", {})["user_id"] = "user-1"
+            await inner(scope, receive, send)
+
+        return app
+
+    return _make
+
+
+async def _post(app, key: str):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post("/things", headers={"X-Idempotency-Key": key, "X-Request-Id": "r"})
+
+
+async def test_duplicates_coalesce_in_process_and_across_processes(redis_client, monkeypatch, make_app, handler_calls):
+    store = RedisIdempotencyStore(redis_client)
+    monkeypatch.setattr(idempotency_snapshot, "get_idempotency_store", lambda: store)
+    worker_a, worker_b = make_app(), make_app()
+
+    responses = await asyncio.gather(_post(worker_a, "k"), _post(worker_a, "k"), _post(worker_b, "k"))
+
+    assert handler_calls == ["k"]
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert {r.content for r in responses} == {json.dumps({"data": 1}, separators=(",", ":")).encode()}
+
+    # a later retry is replayed from the stored snapshot
+    again = await _post(worker_b, "k")
+    assert again.json() == {"data": 1}
+    assert handler_calls == ["k"]
+
+
+# --- DB store (no Redis, or Redis down) ----------------------------------------
+
+
+@pytest.fixture()
+def db_store(session_factory, monkeypatch):
+    from app.db import session as db_session
+    from app.services import idempotency_store
+
+    monkeypatch.setattr(db_session, "async_session_maker", session_factory)
+    monkeypatch.setattr(idempotency_store, "async_session_maker", session_factory)
+    store = DbIdempotencyStore()
+    monkeypatch.setattr(idempotency_snapshot, "get_idempotency_store", lambda: store)
+    return store
+
+
+@pytest.fixture()
+def make_db_app(user_id, handler_calls):
+    """Workers whose handler records the key through enforce_idempotency, as the API routes do."""
+
+    def _make():
+        api = FastAPI()
+
+        @api.post("/things")
+        async def create(request: Request, db: AsyncSession = Depends(get_db)):
+            key = request.headers["X-Idempotency-Key"]
+            await enforce_idempotency(request, SimpleNamespace(id=user_id), db, request_id=None, idempotency_key=key)
+            handler_calls.append(key)
+            await asyncio.sleep(0.1)
+            await db.commit()
+            return {"data": len(handler_calls)}
+
+        inner = IdempotencySnapshotMiddleware(api)
+
+        async def app(scope, receive, send):
+            scope.setdefault("state", {})["user_id"] = str(user_id)
+            await inner(scope, receive, send)
+
+        return app
+
+    return _make
+
+
+async def test_db_store_coalesces_duplicates_in_process(db_store, make_db_app, handler_calls):
+    worker = make_db_app()
+
+    responses = await asyncio.gather(_post(worker, "k"), _post(worker, "k"), _post(worker, "k"))
+
+    assert handler_calls == ["k"]
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert (await _post(worker, "k")).json() == {"data": 1}
+    assert handler_calls == ["k"]
+
+
+async def test_db_store_keeps_the_winners_snapshot_across_processes(db_store, make_db_app, handler_calls):
+    worker_a, worker_b = make_db_app(), make_db_app()
+
+    responses = await asyncio.gather(_post(worker_a, "k"), _post(worker_b, "k"))
+
+    # both workers claim through the DB store; the idempotency_keys insert picks one
+    assert sorted(r.status_code for r in responses) == [200, 409]
+    assert handler_calls == ["k"]
+    for worker in (worker_a, worker_b):
+        retry = await _post(worker, "k")
+        assert retry.status_code == 200 and retry.json() == {"data": 1}
+
+
+async def test_db_store_first_snapshot_wins(db_store, db, user_id):
+    scope = IdempotencyScope(user_id=str(user_id), key="k", method="POST", path="/things")
+    assert await idempotency_repo.claim(db, user_id=user_id, key="k", method="POST", path="/things")
+    await db.commit()
+
+    await db_store.store(scope, SNAPSHOT, token=None)
+    await db_store.store(scope, IdempotencySnapshot(status_code=409, body='{"error": 1}', headers={}), token=None)
+
+    stored = await db_store.fetch(scope)
+    assert (stored.status_code, json.loads(stored.body)) == (200, {"data": 1})
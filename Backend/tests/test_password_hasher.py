@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.api.v1 import auth
+from app.core.security import PasswordHasher, PasswordHasherBusy, hash_password
+from app.middleware import rate_limit
+from app.middleware.rate_limit import _LocalBuckets
+
+
+async def test_saturated_hasher_rejects_and_drains_back_to_zero():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    stored = hash_password("StrongPassw0rd!")
+
+    running = asyncio.create_task(hasher.verify("StrongPassw0rd!", stored))
+    await asyncio.sleep(0)  # the task takes its slot before handing bcrypt to the pool
+    assert hasher.pending == 1
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("another")
+    assert hasher.pending == 1
+
+    assert await running is True
+    assert hasher.pending == 0
+    # capacity is back once the queued hash finishes
+    assert await hasher.verify("wrong", stored) is False
+    assert hasher.pending == 0
+
+
+async def test_busy_hasher_answers_503_with_retry_after(api_client, monkeypatch, no_redis):
+    monkeypatch.setattr(rate_limit, "_local", _LocalBuckets(max_keys=100))
+
+    async def busy(db, email, password):
+        raise PasswordHasherBusy()
+
+    monkeypatch.setattr(auth, "authenticate_user", busy)
+    client = api_client(auth.router)
+
+    res = await client.post("/auth/login", json={"email": "u@example.com", "password": "x", "device_id": "d"})
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+    assert res.json()["error"]["code"] == "auth_busy"
+    assert res.json()["error"]["details"] == {"retry_after_seconds": 1}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event, func, select
+
+# the planner domain package (app.domain.models, app.domain.repositories) is not in
+# every checkout; the repository cannot be imported without it
+planner_repository = pytest.importorskip("app.infrastructure.repositories.planner_repository")
+
+SQLPlannerPlan = planner_repository.SQLPlannerPlan
+SQLPlannerSlot = planner_repository.SQLPlannerSlot
+SQLPlannerConflict = planner_repository.SQLPlannerConflict
+
+NOW = datetime(2026, 1, 15, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+async def planner_tables(db_engine):
+    tables = [SQLPlannerPlan.__table__, SQLPlannerSlot.__table__, SQLPlannerConflict.__table__]
+    async with db_engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: SQLPlannerPlan.metadata.create_all(sync_conn, tables=tables))
+
+
+@pytest.fixture()
+def statements(db_engine):
+    captured: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _capture)
+    yield captured
+    event.remove(db_engine.sync_engine, "before_cursor_execute", _capture)
+
+
+def _plan(user_id: uuid.UUID, *, plan_id: uuid.UUID, slots: int, conflicts: int, version: int = 1):
+    slot_list = [
+        SimpleNamespace(
+            slot_id=uuid.uuid4(),
+            task_id=None,
+            title=f"slot {i}",
+            description=None,
+            start_at=NOW + timedelta(hours=i),
+            end_at=NOW + timedelta(hours=i, minutes=30),
+            created_at=None,
+            updated_at=None,
+        )
+        for i in range(slots)
+    ]
+    return SimpleNamespace(
+        plan_id=plan_id,
+        user_id=user_id,
+        plan_request_id=uuid.uuid4(),
+        status="completed",
+        version=version,
+        source="ai",
+        request_payload={},
+        response_payload={},
+        created_at=None,
+        updated_at=None,
+        deleted=False,
+        slots=slot_list,
+        conflicts=[
+            SimpleNamespace(
+                conflict_id=uuid.uuid4(),
+                slot_id=slot_list[0].slot_id if slot_list else None,
+                reason="overlap",
+                severity="warning",
+                details=None,
+                related_task_id=None,
+                created_at=None,
+            )
+            for _ in range(conflicts)
+        ],
+    )
+
+
+async def _count(db, model, plan_id: uuid.UUID) -> int:
+    return (await db.execute(select(func.count()).select_from(model).where(model.plan_id == plan_id))).scalar_one()
+
+
+async def test_save_replaces_slots_and_conflicts_in_a_fixed_number_of_statements(
+    planner_tables, db, user_id, statements, no_redis
+):
+    repo = planner_repository.SQLPlannerRepository(db)
+    plan_id = uuid.uuid4()
+
+    statements.clear()
+    await repo.save(_plan(user_id, plan_id=plan_id, slots=40, conflicts=3))
+    # upsert, two deletes, one INSERT for the slots and one for the conflicts
+    assert len(statements) == 5, statements
+    await db.commit()
+
+    statements.clear()
+    await repo.save(_plan(user_id, plan_id=plan_id, slots=2, conflicts=0, version=2))
+    assert len(statements) == 4, statements
+    await db.commit()
+
+    assert await _count(db, SQLPlannerSlot, plan_id) == 2
+    assert await _count(db, SQLPlannerConflict, plan_id) == 0
+    stored = (await db.execute(select(SQLPlannerPlan.version).where(SQLPlannerPlan.id == plan_id))).scalar_one()
+    assert stored == 2
+
+
+async def test_save_bumps_the_cached_plan_version(planner_tables, db, user_id, no_redis):
+    from app.services.response_cache import response_cache
+
+    before = await response_cache.versions(user_id, ("plan",))
+    await planner_repository.SQLPlannerRepository(db).save(_plan(user_id, plan_id=uuid.uuid4(), slots=1, conflicts=0))
+    await db.commit()
+
+    assert await response_cache.versions(user_id, ("plan",)) == [before[0] + 1]
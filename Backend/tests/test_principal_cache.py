@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from app.db import after_commit
+from app.models.subscription_state import SubscriptionState
+from app.models.user import User
+from app.services import principal_cache as principal_cache_module
+from app.services.principal_cache import PrincipalCache
+
+
+@pytest.fixture()
+def cache(monkeypatch) -> PrincipalCache:
+    cache = PrincipalCache(ttl_seconds=30, max_entries=100, redis_ttl_seconds=300)
+    monkeypatch.setattr(principal_cache_module, "principal_cache", cache)
+    return cache
+
+
+async def _cached_user(db, user_id, cache) -> User:
+    user = await db.get(User, user_id)
+    await cache.put(user)
+    return user
+
+
+async def test_lookups_return_a_fresh_copy(db, user_id, cache, no_redis):
+    await _cached_user(db, user_id, cache)
+
+    first = await cache.get(user_id)
+    first.full_name = "mutated by a handler"
+    second = await cache.get(user_id)
+
+    assert second is not first
+    assert second.full_name != "mutated by a handler"
+    assert cache.stats["l1_hits"] == 2
+
+
+async def test_committed_user_change_evicts_the_entry(db, user_id, cache, no_redis):
+    user = await _cached_user(db, user_id, cache)
+
+    user.timezone = "Europe/Berlin"
+    await db.commit()
+
+    assert await cache.get(user_id) is None
+
+
+async def test_committed_subscription_change_evicts_the_entry(db, user_id, cache, no_redis):
+    await _cached_user(db, user_id, cache)
+
+    db.add(SubscriptionState(user_id=user_id, plan="pro"))
+    await db.commit()
+
+    assert await cache.get(user_id) is None
+
+
+async def test_rolled_back_change_keeps_the_entry(db, user_id, cache, no_redis):
+    user = await _cached_user(db, user_id, cache)
+
+    user.timezone = "Europe/Berlin"
+    await db.flush()
+    await db.rollback()
+
+    assert (await cache.get(user_id)).timezone == "UTC"
+
+
+async def test_redis_copy_is_shared_and_dropped_before_the_session_is_done(db, user_id, cache, redis_client, monkeypatch):
+    monkeypatch.setattr(principal_cache_module, "get_redis", lambda: redis_client)
+    user = await _cached_user(db, user_id, cache)
+
+    # another worker: empty L1, served from Redis
+    other = PrincipalCache(ttl_seconds=30, max_entries=100, redis_ttl_seconds=300)
+    assert (await other.get(user_id)).email == user.email
+    assert other.stats["l2_hits"] == 1
+
+    after_commit.collect(db)
+    user.timezone = "Europe/Berlin"
+    await db.commit()
+    await after_commit.drain(db)
+
+    assert await redis_client.exists(f"principal:{user_id}") == 0
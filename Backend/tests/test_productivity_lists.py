@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api.v1 import productivity
+from app.models.calendar_event import CalendarEvent
+from app.models.finance import FinanceAccount, FinanceTransaction
+from app.models.goal import Goal
+
+T0 = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+# several rows share a sort value: paging has to fall back on the id
+OFFSETS_HOURS = [0, 0, 0, 1, 1, 2, -1]
+
+
+async def _goals(db, user_id) -> list[uuid.UUID]:
+    goals = [Goal(user_id=user_id, title=f"g{i}", created_at=T0 + timedelta(hours=h)) for i, h in enumerate(OFFSETS_HOURS)]
+    db.add_all(goals)
+    db.add(Goal(user_id=user_id, title="gone", created_at=T0, deleted=True))
+    await db.commit()
+    return [g.id for g in goals]
+
+
+async def _events(db, user_id) -> list[uuid.UUID]:
+    events = [
+        CalendarEvent(
+            user_id=user_id,
+            title=f"e{i}",
+            start_at=T0 + timedelta(hours=h),
+            end_at=T0 + timedelta(hours=h, minutes=30),
+            parallel_with=[],
+        )
+        for i, h in enumerate(OFFSETS_HOURS)
+    ]
+    db.add_all(events)
+    await db.commit()
+    return [e.id for e in events]
+
+
+async def _transactions(db, user_id) -> list[uuid.UUID]:
+    account = FinanceAccount(user_id=user_id)
+    db.add(account)
+    await db.commit()
+    txs = [
+        FinanceTransaction(
+            user_id=user_id,
+            account_id=account.id,
+            type="expense",
+            amount=10,
+            currency="USD",
+            category="food",
+            occurred_at=T0 + timedelta(hours=h),
+        )
+        for h in OFFSETS_HOURS
+    ]
+    db.add_all(txs)
+    await db.commit()
+    return [t.id for t in txs]
+
+
+COLLECTIONS = [
+    ("/productivity/goals", _goals),
+    ("/productivity/calendar/events", _events),
+    ("/productivity/finance/transactions", _transactions),
+]
+collections = pytest.mark.parametrize("path,seed", COLLECTIONS, ids=["goals", "events", "transactions"])
+
+
+def _ids(res) -> list[str]:
+    assert res.status_code == 200, res.text
+    return [item["id"] for item in res.json()["items"]]
+
+
+@collections
+async def test_pages_concatenate_to_the_whole_list_across_ties(api_client, db, user_id, no_redis, path, seed):
+    expected = await seed(db, user_id)
+    client = api_client(productivity.router)
+
+    seen: list[str] = []
+    cursor = None
+    for _ in range(len(expected)):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        res = await client.get(path, params=params)
+        seen += _ids(res)
+        cursor = res.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert len(seen) == len(set(seen))
+    assert set(seen) == {str(i) for i in expected}
+
+
+@collections
+async def test_no_cursor_and_no_limit_returns_every_row(api_client, db, user_id, no_redis, path, seed):
+    expected = await seed(db, user_id)
+    client = api_client(productivity.router)
+
+    res = await client.get(path)
+
+    assert sorted(_ids(res)) == sorted(str(i) for i in expected)
+    assert res.json()["next_cursor"] is None
+    # streamed in the same order the pages use
+    paged = await client.get(path, params={"limit": 100})
+    assert _ids(res) == _ids(paged)
+
+
+@collections
+async def test_unreadable_cursor_starts_from_the_first_page(api_client, db, user_id, no_redis, path, seed):
+    await seed(db, user_id)
+    client = api_client(productivity.router)
+
+    first = await client.get(path, params={"limit": 3})
+    garbled = await client.get(path, params={"limit": 3, "cursor": "not-a-cursor"})
+
+    assert _ids(garbled) == _ids(first)
+    assert garbled.json()["next_cursor"] == first.json()["next_cursor"]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import ARRAY, event, select
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from app.core.config import settings
+from app.db.base import Base
+from app.models.notification import NotificationTrigger
+from app.repositories import calendar_repo, finance_repo, goals_repo, subtasks_repo, tasks_repo
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(type_, compiler, **kw):
+    # calendar_events.parallel_with only needs to exist for the plan checks
+    return "JSON"
+
+
+_TABLES = ["users", "tasks", "subtasks", "goals", "calendar_events", "finance_accounts", "finance_transactions", "notification_triggers"]
+
+USER_ID = uuid.uuid4()
+TASK_ID = uuid.uuid4()
+NOW = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
+
+async def _list_tasks(db):
+    await tasks_repo.list(db, user_id=USER_ID, status=None, goal_id=None, due_from=None, due_to=None, cursor=None, limit=50)
+
+
+async def _list_tasks_due(db):
+    await tasks_repo.list(
+        db, user_id=USER_ID, status=None, goal_id=None, due_from=NOW, due_to=NOW + timedelta(days=7), cursor=None, limit=50
+    )
+
+
+async def _list_subtasks(db):
+    await subtasks_repo.list_by_task(db, user_id=USER_ID, task_id=TASK_ID, cursor=None, limit=50)
+
+
+async def _list_goals(db):
+    await goals_repo.list_by_created(db, user_id=USER_ID, updated_from=None, cursor=None, limit=50)
+
+
+async def _list_events(db):
+    await calendar_repo.list_by_start(db, user_id=USER_ID, updated_from=None, cursor=None, limit=50)
+
+
+async def _list_transactions(db):
+    await finance_repo.list_transactions_by_occurred(db, user_id=USER_ID, updated_from=None, cursor=None, limit=50)
+
+
+async def _list_reminders(db):
+    await db.execute(
+        select(NotificationTrigger)
+        .where(
+            NotificationTrigger.user_id == USER_ID,
+            NotificationTrigger.entity == "task",
+            NotificationTrigger.entity_id == TASK_ID,
+        )
+        .order_by(NotificationTrigger.updated_at.desc(), NotificationTrigger.id.desc())
+        .limit(51)
+    )
+
+
+HOT_QUERIES = [
+    ("tasks", _list_tasks, "ix_tasks_user_live_updated"),
+    ("tasks_due_window", _list_tasks_due, "ix_tasks_user_live_due"),
+    ("subtasks", _list_subtasks, "ix_subtasks_task_live_updated"),
+    ("goals", _list_goals, "ix_goals_user_live_created"),
+    ("calendar_events", _list_events, "ix_calendar_events_user_live_start"),
+    ("finance_transactions", _list_transactions, "ix_finance_transactions_user_live_occurred"),
+    ("reminders", _list_reminders, "ix_notification_triggers_entity"),
+]
+
+
+async def _explain(engine, query) -> str:
+    captured: list[tuple[str, object]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        async with AsyncSession(engine) as db:
+            if engine.dialect.name == "postgresql":
+                # empty test tables make a seq scan cheapest; only usability of the index matters here
+                await (await db.connection()).exec_driver_sql("SET enable_seqscan = off")
+            captured.clear()
+            await query(db)
+            statement, parameters = captured[-1]
+            conn = await db.connection()
+            prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+            rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+@pytest.fixture()
+async def sqlite_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[Base.metadata.tables[t] for t in _TABLES]))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def postgres_engine():
+    if not settings.DATABASE_URL.startswith("postgresql"):
+        pytest.skip("DATABASE_URL is not Postgres")
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("SELECT 1")
+    except (OSError, DBAPIError, OperationalError):
+        await engine.dispose()
+        pytest.skip("Postgres is not available")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("name,query,index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+async def test_hot_query_uses_index_sqlite(sqlite_engine, name, query, index):
+    plan = await _explain(sqlite_engine, query)
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    # the index must also deliver the ORDER BY (a due window is a range scan, sorted afterwards)
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan or name == "tasks_due_window", plan
+
+
+@pytest.mark.parametrize("name,query,index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+async def test_hot_query_uses_index_postgres(postgres_engine, name, query, index):
+    plan = await _explain(postgres_engine, query)
+    assert index in plan, plan
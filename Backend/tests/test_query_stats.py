@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.db import query_stats
+from app.middleware import query_stats as query_stats_middleware
+from app.middleware.query_stats import QueryStatsMiddleware
+from app.models.user import User
+
+
+class RecordingLog:
+    def __init__(self) -> None:
+        self.warnings: list[tuple[str, dict]] = []
+
+    def warning(self, event: str, **fields) -> None:
+        self.warnings.append((event, fields))
+
+
+@pytest.fixture()
+def instrumented(db_engine):
+    query_stats.instrument(db_engine)
+    return db_engine
+
+
+@pytest.fixture()
+def recorded(monkeypatch):
+    metrics: list[dict] = []
+    monkeypatch.setattr(query_stats_middleware, "record_request_db_metric", lambda **fields: metrics.append(fields))
+    return metrics
+
+
+@pytest.fixture()
+def warnings(monkeypatch):
+    recording = RecordingLog()
+    monkeypatch.setattr(query_stats, "log", recording)
+    return recording.warnings
+
+
+def _users(n: int) -> list[dict]:
+    return [
+        {"id": uuid.uuid4(), "email": f"u_{uuid.uuid4().hex[:10]}@test.local", "password_hash": "x", "timezone": "UTC"}
+        for _ in range(n)
+    ]
+
+
+def _app(session_factory) -> AsyncClient:
+    api = FastAPI()
+
+    @api.get("/things/{n}")
+    async def things(n: int):
+        # n reads of one shape, then one multi-row insert
+        async with session_factory() as db:
+            for _ in range(n):
+                await db.execute(select(User.id).where(User.email == "nobody"))
+            await db.execute(insert(User.__table__), _users(3))
+            await db.commit()
+        return {"n": n}
+
+    app = QueryStatsMiddleware(api)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def test_request_totals_are_reported_per_route(instrumented, session_factory, recorded):
+    async with _app(session_factory) as client:
+        res = await client.get("/things/2", headers={"X-Request-Id": "r-1"})
+    assert res.status_code == 200
+
+    [metric] = recorded
+    assert metric["request_id"] == "r-1"
+    assert metric["route"] == "/things/{n}"
+    assert (metric["method"], metric["status_code"]) == ("GET", 200)
+    # two reads, one executemany INSERT, and the session's COMMIT is not a cursor statement
+    assert metric["statements"] == 3
+    assert metric["rows"] == 3
+    assert metric["max_repeats"] == 2
+    assert metric["db_ms"] > 0
+
+
+async def test_in_lists_and_executemany_count_as_one_shape(instrumented, db, user_id):
+    token = query_stats.begin(request_id="r", scope={"path": "/x"})
+    try:
+        for size in (1, 2, 5):
+            await db.execute(select(User.id).where(User.id.in_([user_id] + [uuid.uuid4() for _ in range(size - 1)])))
+        await db.execute(insert(User.__table__), _users(4))
+    finally:
+        stats = query_stats.end(token)
+
+    assert stats.statements == 4
+    assert sorted(stats.shapes.values()) == [1, 3]
+    assert stats.rows == 4
+
+
+async def test_repeated_statement_is_logged_once(instrumented, db, warnings, monkeypatch):
+    monkeypatch.setattr(settings, "DB_REPEATED_STATEMENT_WARN", 3)
+    token = query_stats.begin(request_id="r-n1", scope={"path": "/goals"})
+    try:
+        for _ in range(7):
+            await db.execute(select(User.id).where(User.email == "nobody"))
+    finally:
+        query_stats.end(token)
+
+    [(event, fields)] = warnings
+    assert event == "db_repeated_statement"
+    assert (fields["request_id"], fields["route"], fields["count"]) == ("r-n1", "/goals", 3)
+    assert fields["statement"].startswith("SELECT users.id")
+
+
+async def test_stats_do_not_leak_across_requests(instrumented, session_factory, db, recorded):
+    async with _app(session_factory) as client:
+        await asyncio.gather(
+            client.get("/things/5", headers={"X-Request-Id": "five"}),
+            client.get("/things/1", headers={"X-Request-Id": "one"}),
+        )
+
+    assert {m["request_id"]: m["statements"] for m in recorded} == {"five": 6, "one": 2}
+    # the request's context is gone once it is answered: later statements count nowhere
+    assert query_stats.current() is None
+    await db.execute(select(User.id))
+    assert query_stats.current() is None and len(recorded) == 2
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from starlette.responses import PlainTextResponse
+
+from app.core.security import create_access_token
+from app.middleware import rate_limit
+from app.middleware.rate_limit import RateLimitMiddleware, _LocalBuckets, redis_rate_limit
+
+
+async def _ok(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def _client(app) -> AsyncClient:
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test", headers={"X-Request-Id": "rid"})
+
+
+def _auth(user_id: uuid.UUID) -> dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(subject='u@test.local', user_id=str(user_id))}"}
+
+
+@pytest.fixture(autouse=True)
+def fresh_local_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_local", _LocalBuckets(max_keys=100))
+
+
+async def test_exhausted_bucket_answers_429_with_retry_after(no_redis):
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    async with _client(RateLimitMiddleware(_ok, limit=2, window_seconds=60)) as client:
+        statuses = [(await client.get("/x", headers=_auth(alice))).status_code for _ in range(2)]
+        rejected = await client.get("/x", headers=_auth(alice))
+        other = await client.get("/x", headers=_auth(bob))
+
+    assert statuses == [200, 200]
+    assert rejected.status_code == 429
+    # 2 tokens per 60 s: the next one arrives within 30 s
+    assert 0 < int(rejected.headers["Retry-After"]) <= 30
+    assert rejected.json()["error"]["code"] == "rate_limited"
+    assert rejected.json()["error"]["details"]["retry_after_seconds"] == int(rejected.headers["Retry-After"])
+    assert rejected.headers["X-Request-Id"] == "rid"
+    assert other.status_code == 200
+
+
+async def test_paths_outside_the_prefix_are_not_limited(no_redis):
+    async with _client(RateLimitMiddleware(_ok, limit=1, window_seconds=60, path_prefix="/v1")) as client:
+        assert [(await client.get("/health")).status_code for _ in range(3)] == [200, 200, 200]
+        assert [(await client.get("/v1/tasks")).status_code for _ in range(2)] == [200, 429]
+
+
+async def test_shared_bucket_limits_across_workers(redis_client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: redis_client)
+    user_id = uuid.uuid4()
+    workers = [RateLimitMiddleware(_ok, limit=2, window_seconds=60) for _ in range(3)]
+
+    statuses = []
+    for worker in workers:
+        # every worker has its own process-local buckets
+        monkeypatch.setattr(rate_limit, "_local", _LocalBuckets(max_keys=100))
+        async with _client(worker) as client:
+            res = await client.get("/x", headers=_auth(user_id))
+        statuses.append(res.status_code)
+
+    assert statuses == [200, 200, 429]
+    assert 0 < int(res.headers["Retry-After"]) <= 30
+    assert workers[2].limiter.stats["rejected_redis"] == 1
+
+
+async def test_route_dependency_sets_retry_after(no_redis):
+    api = FastAPI()
+
+    @api.post("/login", dependencies=[redis_rate_limit(key_prefix="test:login", limit=1, window_seconds=10)])
+    async def login():
+        return {"ok": True}
+
+    async with _client(_with_request_id(api)) as client:
+        first = await client.post("/login")
+        second = await client.post("/login")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert 0 < int(second.headers["Retry-After"]) <= 10
+
+
+def _with_request_id(app):
+    async def wrapped(scope, receive, send):
+        scope.setdefault("state", {})["request_id"] = "rid"
+        await app(scope, receive, send)
+
+    return wrapped
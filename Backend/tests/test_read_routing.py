@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core.security import create_access_token
+from app.db import session as db_session
+from app.db.base import Base
+from app.models.task import Task
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+
+
+def _request(user_id: uuid.UUID | None) -> Request:
+    headers = []
+    if user_id is not None:
+        token = create_access_token(subject="test@test.local", user_id=str(user_id))
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture()
+async def engines(tmp_path, monkeypatch):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Base.metadata.tables["users"], Base.metadata.tables["tasks"]])
+    monkeypatch.setattr(db_session, "engine", primary)
+    monkeypatch.setattr(db_session, "read_engine", replica)
+    monkeypatch.setattr(db_session, "async_session_maker", async_sessionmaker(primary, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(db_session, "async_read_session_maker", async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(db_session, "recent_writers", db_session.RecentWriters(window_seconds=30))
+    yield primary, replica
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def _read_engine_for(request: Request):
+    async for session in db_session.get_read_db(request):
+        return session.bind
+
+
+async def _write(request: Request, statement) -> None:
+    dependency = db_session.get_db(request)
+    session = await anext(dependency)
+    await session.execute(statement)
+    await session.commit()
+    await dependency.aclose()
+
+
+async def test_reads_go_to_the_replica_until_the_user_writes(engines, no_redis):
+    primary, replica = engines
+    user_id = uuid.uuid4()
+
+    assert await _read_engine_for(_request(user_id)) is replica
+    await _write(_request(user_id), update(Task).where(Task.user_id == user_id).values(title="x"))
+
+    assert await _read_engine_for(_request(user_id)) is primary
+    assert await _read_engine_for(_request(uuid.uuid4())) is replica
+    assert await _read_engine_for(_request(None)) is replica
+
+
+async def test_reads_alone_do_not_pin_the_user_to_the_primary(engines, no_redis):
+    _, replica = engines
+    user_id = uuid.uuid4()
+
+    await _write(_request(user_id), select(Task).where(Task.user_id == user_id))
+
+    assert await _read_engine_for(_request(user_id)) is replica
+
+
+async def test_core_statements_flag_the_session_as_written(engines, no_redis):
+    user_id = uuid.uuid4()
+    dependency = db_session.get_db(_request(user_id))
+    session = await anext(dependency)
+
+    await session.execute(select(Task).where(Task.user_id == user_id))
+    assert not session.info.get(db_session._WROTE_KEY)
+    await session.execute(update(Task).where(Task.user_id == user_id).values(title="x"))
+    assert session.info.get(db_session._WROTE_KEY)
+
+    await session.rollback()
+    assert not session.info.get(db_session._WROTE_KEY)
+    await dependency.aclose()
+
+
+async def test_redis_marker_is_set_before_the_dependency_returns(engines, redis_client, monkeypatch):
+    monkeypatch.setattr(db_session, "get_redis", lambda: redis_client)
+    user_id = uuid.uuid4()
+
+    await _write(_request(user_id), update(Task).where(Task.user_id == user_id).values(title="x"))
+
+    assert await redis_client.pttl(f"ryw:{user_id}") > 0
+    # another worker, without the in-process mark, still routes to the primary
+    monkeypatch.setattr(db_session, "recent_writers", db_session.RecentWriters(window_seconds=30))
+    assert await _read_engine_for(_request(user_id)) is engines[0]
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.notification import NotificationTrigger
+from app.services.reminders import DueReminder, ReminderDispatcher, TimerWheel
+
+
+def _reminder(at: float, *, reminder_id: uuid.UUID | None = None) -> DueReminder:
+    return DueReminder(
+        id=reminder_id or uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        entity="task",
+        entity_id=uuid.uuid4(),
+        lead_minutes=0,
+        remind_at=datetime.fromtimestamp(at, tz=timezone.utc),
+    )
+
+
+class FakePush:
+    def __init__(self, *, failing: set[uuid.UUID] = frozenset()) -> None:
+        self.failing = failing
+        self.sent: list[dict] = []
+
+    async def send_notification(self, db, **kwargs) -> None:
+        if uuid.UUID(kwargs["data"]["trigger_id"]) in self.failing:
+            raise RuntimeError("push provider down")
+        self.sent.append(kwargs)
+
+
+async def _trigger(db, user_id: uuid.UUID, *, remind_at: datetime, sent: bool = False, locked_until: datetime | None = None):
+    trigger = NotificationTrigger(
+        user_id=user_id,
+        entity="task",
+        entity_id=uuid.uuid4(),
+        remind_at=remind_at,
+        sent=sent,
+        locked_until=locked_until,
+    )
+    db.add(trigger)
+    await db.commit()
+    return trigger.id
+
+
+async def _rows(session_factory, ids) -> dict[uuid.UUID, NotificationTrigger]:
+    async with session_factory() as db:
+        rows = (await db.execute(select(NotificationTrigger).where(NotificationTrigger.id.in_(ids)))).scalars()
+        return {row.id: row for row in rows}
+
+
+def test_timer_wheel_fires_reminders_at_the_second_after_remind_at():
+    wheel = TimerWheel(now=99.0)
+    early, late = _reminder(100.2), _reminder(102.0)
+    assert wheel.schedule(early)
+    assert wheel.schedule(late)
+    assert len(wheel) == 2
+
+    # never before remind_at: 100.2 rounds up to second 101
+    assert wheel.pop_due(100.9) == []
+    assert wheel.pop_due(101.0) == [early]
+    # a tick that skips seconds still collects everything in between
+    assert wheel.pop_due(103.5) == [late]
+    assert len(wheel) == 0
+
+
+def test_timer_wheel_dedupes_and_defers_reminders_for_fired_seconds():
+    wheel = TimerWheel(now=100.0)
+    reminder = _reminder(105.0)
+    assert wheel.schedule(reminder)
+    # a re-claim of a trigger already on the wheel is ignored
+    assert not wheel.schedule(_reminder(105.0, reminder_id=reminder.id))
+    assert len(wheel) == 1
+
+    wheel.pop_due(110.0)
+    overdue = _reminder(90.0)
+    wheel.schedule(overdue)
+    assert wheel.pop_due(110.5) == []
+    assert wheel.pop_due(111.0) == [overdue]
+
+    waiting = _reminder(120.0)
+    wheel.schedule(waiting)
+    assert wheel.drain() == [waiting]
+    assert len(wheel) == 0
+
+
+async def test_claim_leases_due_triggers_once(session_factory, db, user_id):
+    now = datetime.now(timezone.utc)
+    due = await _trigger(db, user_id, remind_at=now + timedelta(seconds=30))
+    expired_lease = await _trigger(db, user_id, remind_at=now - timedelta(seconds=5), locked_until=now - timedelta(seconds=1))
+    await _trigger(db, user_id, remind_at=now + timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS + 60))
+    await _trigger(db, user_id, remind_at=now, sent=True)
+    await _trigger(db, user_id, remind_at=now, locked_until=now + timedelta(minutes=5))
+
+    dispatcher = ReminderDispatcher(session_factory, push=FakePush())
+    async with session_factory() as session:
+        claimed = await dispatcher._claim(session, now=now)
+        assert {r.id for r in claimed} == {due, expired_lease}
+        # a second dispatcher (or pass) finds them leased
+        assert await dispatcher._claim(session, now=now) == []
+
+    rows = await _rows(session_factory, [due, expired_lease])
+    lease = timedelta(seconds=settings.REMINDER_LOOKAHEAD_SECONDS + settings.REMINDER_LEASE_SECONDS)
+    for row in rows.values():
+        assert row.locked_until.replace(tzinfo=timezone.utc) == now + lease
+        assert row.sent is False
+
+
+async def test_flush_marks_delivered_triggers_sent_and_keeps_failed_ones_leased(session_factory, db, user_id):
+    now = datetime.now(timezone.utc)
+    ok = await _trigger(db, user_id, remind_at=now)
+    broken = await _trigger(db, user_id, remind_at=now)
+    push = FakePush(failing={broken})
+    dispatcher = ReminderDispatcher(session_factory, push=push)
+
+    async with session_factory() as session:
+        claimed = await dispatcher._claim(session, now=now)
+    for reminder in claimed:
+        await dispatcher._send(reminder)
+    assert [call["collapse_key"] for call in push.sent] == [f"reminder-{ok}"]
+    assert dispatcher._failed == 1
+
+    async with session_factory() as session:
+        await dispatcher._flush(session)
+    assert dispatcher._sent == []
+
+    rows = await _rows(session_factory, [ok, broken])
+    assert rows[ok].sent is True and rows[ok].locked_until is None
+    # claimed again once the lease runs out
+    assert rows[broken].sent is False and rows[broken].locked_until is not None
+
+
+async def test_release_returns_unfired_triggers_to_the_pool(session_factory, db, user_id):
+    now = datetime.now(timezone.utc)
+    waiting = await _trigger(db, user_id, remind_at=now + timedelta(seconds=60))
+    delivered = await _trigger(db, user_id, remind_at=now, sent=True, locked_until=now + timedelta(minutes=5))
+    dispatcher = ReminderDispatcher(session_factory, push=FakePush())
+
+    async with session_factory() as session:
+        assert [r.id for r in await dispatcher._claim(session, now=now)] == [waiting]
+        await dispatcher._release(session, [waiting, delivered])
+        # released triggers are claimable right away by another dispatcher
+        assert [r.id for r in await dispatcher._claim(session, now=now)] == [waiting]
+
+    rows = await _rows(session_factory, [delivered])
+    assert rows[delivered].locked_until is not None
+
+
+async def test_triggers_past_max_lateness_expire_without_a_push(session_factory, db, user_id):
+    now = datetime.now(timezone.utc)
+    lateness = timedelta(seconds=settings.REMINDER_MAX_LATENESS_SECONDS)
+    backlog = [await _trigger(db, user_id, remind_at=now - timedelta(days=d)) for d in (1, 30)]
+    late = await _trigger(db, user_id, remind_at=now - lateness + timedelta(seconds=30))
+    # another dispatcher holds it: its lease decides, not this pass
+    leased = await _trigger(db, user_id, remind_at=now - timedelta(days=2), locked_until=now + timedelta(minutes=1))
+    push = FakePush()
+    dispatcher = ReminderDispatcher(session_factory, push=push)
+
+    async with session_factory() as session:
+        assert await dispatcher._expire(session, now=now) == 2
+        assert [r.id for r in await dispatcher._claim(session, now=now)] == [late]
+
+    rows = await _rows(session_factory, [*backlog, leased])
+    assert all(rows[t].sent and rows[t].locked_until is None for t in backlog)
+    assert rows[leased].sent is False
+    assert push.sent == []
+
+
+async def test_claim_skips_triggers_past_max_lateness(session_factory, db, user_id):
+    now = datetime.now(timezone.utc)
+    await _trigger(db, user_id, remind_at=now - timedelta(seconds=settings.REMINDER_MAX_LATENESS_SECONDS + 1))
+    dispatcher = ReminderDispatcher(session_factory, push=FakePush())
+
+    async with session_factory() as session:
+        assert await dispatcher._claim(session, now=now) == []
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app.api.v1 import subtasks
+from app.models.subtask import Subtask
+from app.models.task import Task
+from app.services import response_cache as response_cache_module
+
+
+@pytest.fixture()
+async def task_id(db, user_id) -> uuid.UUID:
+    task = Task(user_id=user_id, title="Parent")
+    db.add(task)
+    await db.flush()
+    db.add(Subtask(user_id=user_id, task_id=task.id, title="first", done=False))
+    await db.commit()
+    return task.id
+
+
+async def _list(client, task_id):
+    res = await client.get("/subtasks", params={"task_id": str(task_id)})
+    assert res.status_code == 200, res.text
+    return res.json()["items"]
+
+
+async def test_patch_invalidates_cached_subtask_list(api_client, task_id, no_redis):
+    client = api_client(subtasks.router)
+    [item] = await _list(client, task_id)
+    assert item["done"] is False
+
+    res = await client.patch(f"/subtasks/{item['id']}", json={"done": True, "title": "renamed", "request_id": "r1"})
+    assert res.status_code == 200, res.text
+
+    [item] = await _list(client, task_id)
+    assert (item["done"], item["title"]) == (True, "renamed")
+
+
+async def test_redis_version_is_bumped_before_the_response(api_client, task_id, user_id, redis_client, monkeypatch):
+    monkeypatch.setattr(response_cache_module, "get_redis", lambda: redis_client)
+    client = api_client(subtasks.router)
+    [item] = await _list(client, task_id)
+    assert await redis_client.get(f"rcv:{user_id}:subtask") is None
+
+    res = await client.patch(f"/subtasks/{item['id']}", json={"done": True, "request_id": "r1"})
+    assert res.status_code == 200, res.text
+
+    assert await redis_client.get(f"rcv:{user_id}:subtask") == "1"
+    [item] = await _list(client, task_id)
+    assert item["done"] is True
+
+
+async def test_rolled_back_writes_keep_the_cached_list(api_client, task_id, user_id, db, no_redis):
+    client = api_client(subtasks.router)
+    await _list(client, task_id)
+    versions = dict(response_cache_module.response_cache._versions)
+
+    db.add(Subtask(user_id=user_id, task_id=task_id, title="dropped", done=False))
+    await db.flush()
+    await db.rollback()
+
+    assert dict(response_cache_module.response_cache._versions) == versions
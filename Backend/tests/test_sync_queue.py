@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.sync_operation import SyncOperation
+from app.models.task import Task
+from app.services.background_tasks import _claim_sync_operations, _run_sync_group, process_sync_queue
+
+NOW = datetime.now(timezone.utc)
+LEASE = timedelta(seconds=settings.SYNC_LEASE_SECONDS)
+
+
+async def _enqueue(db, user_id, *, title: str, task_id: uuid.UUID | None = None) -> SyncOperation:
+    task_id = task_id or uuid.uuid4()
+    op = SyncOperation(
+        user_id=user_id,
+        entity="task",
+        action="upsert",
+        payload={"entity": "task", "action": "upsert", "id": str(task_id), "updated_at": NOW.isoformat(), "data": {"title": title}},
+        scheduled_at=NOW - timedelta(hours=1),
+    )
+    db.add(op)
+    await db.commit()
+    return op
+
+
+async def _stored(session_factory, op_id):
+    async with session_factory() as session:
+        return await session.get(SyncOperation, op_id)
+
+
+async def test_leased_operations_are_not_claimed_twice(db, user_id):
+    op = await _enqueue(db, user_id, title="a")
+
+    [claimed] = await _claim_sync_operations(db, now=NOW, limit=10)
+    assert (claimed.id, claimed.attempts) == (op.id, 1)
+    assert await _claim_sync_operations(db, now=NOW + LEASE - timedelta(seconds=1), limit=10) == []
+
+    # a crashed worker's lease runs out and the row is claimable again
+    [reclaimed] = await _claim_sync_operations(db, now=NOW + LEASE + timedelta(seconds=1), limit=10)
+    assert (reclaimed.id, reclaimed.attempts) == (op.id, 2)
+
+
+async def test_worker_that_lost_its_lease_neither_applies_nor_releases(db, user_id, session_factory):
+    task_id = uuid.uuid4()
+    op = await _enqueue(db, user_id, title="late", task_id=task_id)
+    stale = await _claim_sync_operations(db, now=NOW - LEASE - timedelta(seconds=5), limit=10)
+    current = await _claim_sync_operations(db, now=NOW, limit=10)
+    assert [r.id for r in current] == [op.id]
+
+    assert await _run_sync_group(session_factory, stale) == [False]
+
+    stored = await _stored(session_factory, op.id)
+    assert (stored.status, stored.locked) == ("pending", True)
+    async with session_factory() as session:
+        assert await session.get(Task, task_id) is None
+
+    # the current lease holder completes it
+    assert await _run_sync_group(session_factory, current) == [True]
+    stored = await _stored(session_factory, op.id)
+    assert (stored.status, stored.locked, stored.locked_until) == ("done", False, None)
+
+
+async def test_queue_applies_operations_and_reschedules_failures(db, user_id, session_factory):
+    good = await _enqueue(db, user_id, title="applied")
+    bad = SyncOperation(
+        user_id=user_id, entity="task", action="upsert", payload={"entity": "task", "updated_at": "not a date"},
+        scheduled_at=NOW - timedelta(hours=1),
+    )
+    db.add(bad)
+    await db.commit()
+
+    await process_sync_queue(db, session_factory=session_factory)
+
+    assert (await _stored(session_factory, good.id)).status == "done"
+    failed = await _stored(session_factory, bad.id)
+    assert (failed.status, failed.attempts, failed.locked) == ("error", 1, False)
+    assert failed.scheduled_at.replace(tzinfo=timezone.utc) > NOW
+    async with session_factory() as session:
+        titles = (await session.execute(select(Task.title).where(Task.user_id == user_id))).scalars().all()
+    assert titles == ["applied"]
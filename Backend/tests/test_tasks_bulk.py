@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api.v1 import tasks
+from app.models.goal import Goal
+from app.models.task import Task
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+async def goal_id(db, user_id) -> uuid.UUID:
+    goal = Goal(user_id=user_id, title="Goal")
+    db.add(goal)
+    await db.commit()
+    return goal.id
+
+
+async def _task(db, user_id, **values) -> Task:
+    task = Task(user_id=user_id, title="t", created_at=T0, updated_at=T0, **values)
+    db.add(task)
+    await db.commit()
+    return task
+
+
+async def _bulk(client, *operations):
+    res = await client.post("/tasks/bulk", json={"operations": list(operations), "request_id": uuid.uuid4().hex})
+    assert res.status_code == 200, res.text
+    return res.json()["results"]
+
+
+async def _goal_counters(session_factory, goal_id):
+    async with session_factory() as session:
+        res = await session.execute(select(Goal.tasks_total, Goal.tasks_completed, Goal.progress).where(Goal.id == goal_id))
+        return tuple(res.one())
+
+
+async def test_mixed_operations_apply_in_one_request(api_client, db, user_id, goal_id, session_factory, no_redis):
+    kept = await _task(db, user_id, goal_id=goal_id)
+    dropped = await _task(db, user_id, goal_id=goal_id, status="done")
+    client = api_client(tasks.router)
+
+    results = await _bulk(
+        client,
+        {"action": "create", "data": {"title": "new", "goal_id": str(goal_id), "status": "done"}},
+        {"action": "update", "id": str(kept.id), "updated_at": T0.isoformat(), "data": {"title": "renamed"}},
+        {"action": "delete", "id": str(dropped.id), "updated_at": T0.isoformat()},
+    )
+
+    assert [(r["action"], r["status"]) for r in results] == [("create", "applied"), ("update", "applied"), ("delete", "applied")]
+    async with session_factory() as session:
+        rows = {t.id: t for t in (await session.execute(select(Task).where(Task.user_id == user_id))).scalars()}
+    created_id = uuid.UUID(results[0]["id"])
+    assert rows[created_id].title == "new"
+    assert rows[kept.id].title == "renamed"
+    assert rows[dropped.id].deleted is True
+    # +1 done created, -1 done deleted: one open and one done task remain
+    assert await _goal_counters(session_factory, goal_id) == (2, 1, 0.5)
+
+
+async def test_stale_and_missing_tasks_fail_alone(api_client, db, user_id, no_redis):
+    task = await _task(db, user_id)
+    gone = await _task(db, user_id, deleted=True)
+    client = api_client(tasks.router)
+
+    results = await _bulk(
+        client,
+        {"action": "update", "id": str(task.id), "updated_at": "2025-12-31T00:00:00Z", "data": {"title": "x"}},
+        {"action": "delete", "id": str(gone.id), "updated_at": T0.isoformat()},
+        {"action": "delete", "id": str(uuid.uuid4()), "updated_at": T0.isoformat()},
+        {"action": "update", "id": str(task.id)},
+        {"action": "create", "data": {"description": "no title"}},
+    )
+
+    assert [r["status"] for r in results] == ["conflict", "not_found", "not_found", "invalid", "invalid"]
+    assert results[0]["task"]["title"] == "t"
+
+
+async def test_repeated_task_is_checked_against_the_earlier_operation(api_client, db, user_id, goal_id, session_factory, no_redis):
+    task = await _task(db, user_id, goal_id=goal_id)
+    client = api_client(tasks.router)
+
+    results = await _bulk(
+        client,
+        {"action": "update", "id": str(task.id), "updated_at": T0.isoformat(), "data": {"status": "done"}},
+        # still carries the version the first operation replaced
+        {"action": "update", "id": str(task.id), "updated_at": T0.isoformat(), "data": {"status": "todo"}},
+        {"action": "delete", "id": str(task.id), "updated_at": T0.isoformat()},
+    )
+
+    assert [r["status"] for r in results] == ["applied", "conflict", "conflict"]
+    assert results[1]["task"]["status"] == "done"
+    async with session_factory() as session:
+        stored = await session.get(Task, task.id)
+    assert (stored.status, stored.deleted) == ("done", False)
+    assert await _goal_counters(session_factory, goal_id) == (1, 1, 1.0)
+
+    second = await _bulk(
+        client,
+        {"action": "delete", "id": str(task.id), "updated_at": results[0]["task"]["updated_at"]},
+        {"action": "delete", "id": str(task.id), "updated_at": results[0]["task"]["updated_at"]},
+    )
+    assert [r["status"] for r in second] == ["applied", "not_found"]
+    assert await _goal_counters(session_factory, goal_id) == (0, 0, 0.0)
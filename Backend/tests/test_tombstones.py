@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.api.v1 import productivity
+from app.models.subtask import Subtask
+from app.models.task import Task
+from app.models.tombstone import TombstoneArchive
+from app.services.tombstones import ARCHIVED, advance_horizon, archive_batch, get_horizon
+
+NOW = datetime.now(timezone.utc)
+CUTOFF = NOW - timedelta(days=30)
+TASKS = next(spec for spec in ARCHIVED if spec.table == "tasks")
+
+
+async def _task(db, user_id, *, deleted: bool, age_days: int, subtasks: int = 0) -> Task:
+    stamp = NOW - timedelta(days=age_days)
+    task = Task(user_id=user_id, title=f"t{age_days}", deleted=deleted, created_at=stamp, updated_at=stamp)
+    db.add(task)
+    await db.flush()
+    db.add_all(Subtask(user_id=user_id, task_id=task.id, title=f"s{i}", done=False, deleted=i == 1) for i in range(subtasks))
+    await db.commit()
+    return task
+
+
+async def test_archive_moves_old_tombstones_with_their_children(db, user_id):
+    old = await _task(db, user_id, deleted=True, age_days=40, subtasks=2)
+    older = await _task(db, user_id, deleted=True, age_days=50)
+    recent = await _task(db, user_id, deleted=True, age_days=5)
+    live = await _task(db, user_id, deleted=False, age_days=60, subtasks=1)
+
+    # oldest first, at most ``limit`` per batch
+    assert await archive_batch(db, TASKS, cutoff=CUTOFF, limit=1) == 1
+    await db.commit()
+    assert await archive_batch(db, TASKS, cutoff=CUTOFF, limit=10) == 1
+    await db.commit()
+    assert await archive_batch(db, TASKS, cutoff=CUTOFF, limit=10) == 0
+
+    remaining = set((await db.execute(select(Task.id))).scalars())
+    assert remaining == {recent.id, live.id}
+    assert set((await db.execute(select(Subtask.task_id))).scalars()) == {live.id}
+
+    archive = (await db.execute(select(TombstoneArchive).order_by(TombstoneArchive.archived_at))).scalars().all()
+    assert [(a.source_table, a.id) for a in archive[:1]] == [("tasks", older.id)]
+    moved = {(a.source_table, a.payload["title"]) for a in archive}
+    assert moved == {("tasks", "t50"), ("tasks", "t40"), ("subtasks", "s0"), ("subtasks", "s1")}
+    assert {a.user_id for a in archive} == {user_id}
+    assert next(a for a in archive if a.id == old.id).payload["deleted"] in (True, 1)
+
+
+async def test_horizon_only_moves_forward(db):
+    assert await get_horizon(db, "goal") is None
+    assert await advance_horizon(db, "goal", CUTOFF) == CUTOFF
+    assert await advance_horizon(db, "goal", CUTOFF - timedelta(days=1)) == CUTOFF
+    await db.commit()
+    assert await get_horizon(db, "goal") == CUTOFF
+
+
+async def test_delta_sync_from_before_the_horizon_requires_a_full_resync(api_client, db, no_redis):
+    await advance_horizon(db, "goal", CUTOFF)
+    await db.commit()
+    client = api_client(productivity.router)
+
+    stale = await client.get("/productivity/goals", params={"updated_from": (CUTOFF - timedelta(days=1)).isoformat()})
+    assert stale.status_code == 410
+    assert stale.json()["error"]["code"] == "full_resync_required"
+    assert stale.json()["error"]["details"]["entity"] == "goal"
+
+    fresh = await client.get("/productivity/goals", params={"updated_from": (CUTOFF + timedelta(days=1)).isoformat()})
+    assert fresh.status_code == 200
+    assert (await client.get("/productivity/goals")).status_code == 200